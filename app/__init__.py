@@ -4,25 +4,69 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 
 from config import config
+from app.utils.archive import Archive
+from app.utils.cache import Cache
+from app.utils.events import Events
+from app.utils.idempotency import Idempotency
+from app.utils.json_provider import create_json_provider
+from app.utils.profiling import Profiler
+from app.utils.replicas import Replicas, RoutingSession
+from app.utils.sqlite import apply_pragmas, engine_options
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
+cache = Cache()
+profiler = Profiler()
+idempotency = Idempotency()
+replicas = Replicas()
+events = Events()
+archive = Archive()
 
 def create_app(config_name):
-    """Factory function to create Flask application instance."""
+    """
+    Factory function to create Flask application instance, configured by the
+    name of an entry in `config` or by a config class.
+    """
     app = Flask(__name__)
-    app.config.from_object(config[config_name])
+    app.config.from_object(config[config_name] if isinstance(config_name, str) else config_name)
+    app.json = create_json_provider(app)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    )
 
-    # Enable CORS for frontend dev server
-    CORS(app, origins=["http://localhost:5173"])
+    # Enable CORS for frontend dev server, exposing the pagination headers
+    CORS(app, origins=["http://localhost:5173"], expose_headers=["Link", "X-Next-Cursor"])
 
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_pragmas(engine, app.config.get('SQLITE_PRAGMAS', {}))
     migrate.init_app(app, db)
+    replicas.init_app(app)
+    
+    from app.utils.shards import shards
+    shards.init_app(app)
+    cache.init_app(app)
+    profiler.init_app(app, db)
+    idempotency.init_app(app)
+    events.init_app(app)
+    archive.init_app(app)
+    
+    from app.services.write_behind import check_in_writer
+    check_in_writer.init_app(app)
     
     # Register blueprints
-    from app.api import habits_bp, check_ins_bp
+    from app.api import habits_bp, check_ins_bp, stats_bp
     app.register_blueprint(habits_bp, url_prefix='/habits')
     app.register_blueprint(check_ins_bp, url_prefix='/habits')
+    app.register_blueprint(stats_bp, url_prefix='/habits')
+    
+    # Register CLI commands
+    from app.commands import bitmaps_cli, check_ins_cli, shards_cli, streaks_cli
+    app.cli.add_command(streaks_cli)
+    app.cli.add_command(bitmaps_cli)
+    app.cli.add_command(shards_cli)
+    app.cli.add_command(check_ins_cli)
     
     @app.route('/health')
     def health_check():
@@ -2,5 +2,6 @@ from flask import Blueprint
 
 habits_bp = Blueprint('habits', __name__)
 check_ins_bp = Blueprint('check_ins', __name__)
+stats_bp = Blueprint('stats', __name__)
 
-from app.api import habits, check_ins
\ No newline at end of file
+from app.api import habits, check_ins, stats
\ No newline at end of file
@@ -0,0 +1,96 @@
+from flask import request, jsonify
+
+from app.services.async_check_in_service import AsyncCheckInService
+from app.services.async_habit_service import AsyncHabitService
+from app.utils.dates import dated, utc_today
+from app.utils.http import conditional_headers, is_not_modified, make_etag
+from app.utils.pagination import next_page_headers
+
+habit_service = AsyncHabitService()
+check_in_service = AsyncCheckInService()
+
+# Async counterparts of the blueprint views, keyed by Flask endpoint name
+views = {}
+
+def async_view(endpoint):
+    """Register a coroutine as the async implementation of a Flask endpoint."""
+    def register(view):
+        views[endpoint] = view
+        return view
+    return register
+
+@async_view('habits.get_habits')
+async def get_habits(session):
+    """Get a page of habits."""
+    count, max_id, last_modified = await habit_service.get_collection_version(session)
+    # current_streak depends on the date, so the representation changes daily.
+    # No Last-Modified: deleting a habit does not move max(updated_at), only the ETag
+    etag = make_etag('habits', count, max_id, last_modified, utc_today(), request.query_string)
+    if is_not_modified(etag):
+        return '', 304, conditional_headers(etag)
+    
+    result, status_code = await habit_service.get_all_habits(session, request.args)
+    if status_code != 200:
+        return jsonify(result), status_code
+    headers = {**conditional_headers(etag), **next_page_headers(result['next_cursor'])}
+    return jsonify(result['items']), status_code, headers
+
+@async_view('habits.get_habit')
+async def get_habit(session, habit_id):
+    """Get a specific habit by ID."""
+    last_modified = await habit_service.get_version(session, habit_id)
+    if not last_modified:
+        return jsonify({'error': 'Habit not found'}), 404
+    today = utc_today()
+    etag = make_etag('habit', habit_id, last_modified, today)
+    last_modified = dated(last_modified, today)
+    if is_not_modified(etag, last_modified):
+        return '', 304, conditional_headers(etag, last_modified)
+    
+    habit = await habit_service.get_habit_by_id(session, habit_id)
+    if not habit:
+        return jsonify({'error': 'Habit not found'}), 404
+    return jsonify(habit), 200, conditional_headers(etag, last_modified)
+
+@async_view('check_ins.get_check_ins')
+async def get_check_ins(session, habit_id):
+    """Get a page of check-ins for a habit, newest first."""
+    last_modified = await habit_service.get_version(session, habit_id)
+    if not last_modified:
+        return jsonify({'error': 'Habit not found'}), 404
+    # Each check-in embeds its habit, whose current_streak depends on the date
+    today = utc_today()
+    etag = make_etag('check_ins', habit_id, last_modified, today, request.query_string)
+    last_modified = dated(last_modified, today)
+    if is_not_modified(etag, last_modified):
+        return '', 304, conditional_headers(etag, last_modified)
+    
+    result, status_code = await check_in_service.get_check_ins_by_habit(session, habit_id, request.args)
+    if status_code != 200:
+        return jsonify(result), status_code
+    headers = {**conditional_headers(etag, last_modified), **next_page_headers(result['next_cursor'])}
+    return jsonify(result['items']), status_code, headers
+
+@async_view('check_ins.get_day')
+async def get_day(session, habit_id, day):
+    """Check whether a habit was checked in on a given day."""
+    result, status_code = await check_in_service.get_day(session, habit_id, day)
+    return jsonify(result), status_code
+
+@async_view('check_ins.get_streaks')
+async def get_streaks(session, habit_id):
+    """Get streaks for a habit."""
+    result, status_code = await check_in_service.get_streaks(session, habit_id)
+    return jsonify(result), status_code
+
+@async_view('check_ins.get_streaks_for_habits')
+async def get_streaks_for_habits(session):
+    """Get streaks for many habits (?ids=1,2,3) or for all of them."""
+    result, status_code = await check_in_service.get_streaks_for_habits(session, request.args)
+    return jsonify(result), status_code
+
+@async_view('check_ins.get_streak_summary')
+async def get_streak_summary(session, habit_id):
+    """Get current and longest streak for a habit."""
+    result, status_code = await check_in_service.get_streak_summary(session, habit_id)
+    return jsonify(result), status_code
@@ -1,16 +1,39 @@
-from flask import request, jsonify
+import json
+
+from flask import current_app, request, jsonify, url_for
 from app.api import check_ins_bp
 from app.services.check_in_service import CheckInService
+from app.services.habit_service import HabitService
+from app.utils.dates import dated, utc_today
+from app.utils.http import conditional_headers, is_not_modified, make_etag
+from app.utils.idempotency import idempotent
+from app.utils.pagination import next_page_headers
 
 check_in_service = CheckInService()
+habit_service = HabitService()
 
 @check_ins_bp.route('/<int:habit_id>/check-ins', methods=['GET'])
 def get_check_ins(habit_id):
-    """Get all check-ins for a habit."""
-    result, status_code = check_in_service.get_check_ins_by_habit(habit_id)
-    return jsonify(result), status_code
+    """Get a page of check-ins for a habit, newest first."""
+    # Every check-in write touches the habit, so its timestamp versions the listing
+    last_modified = habit_service.get_version(habit_id)
+    if not last_modified:
+        return jsonify({'error': 'Habit not found'}), 404
+    # Each check-in embeds its habit, whose current_streak depends on the date
+    today = utc_today()
+    etag = make_etag('check_ins', habit_id, last_modified, today, request.query_string)
+    last_modified = dated(last_modified, today)
+    if is_not_modified(etag, last_modified):
+        return '', 304, conditional_headers(etag, last_modified)
+    
+    result, status_code = check_in_service.get_check_ins_by_habit(habit_id, request.args)
+    if status_code != 200:
+        return jsonify(result), status_code
+    headers = {**conditional_headers(etag, last_modified), **next_page_headers(result['next_cursor'])}
+    return jsonify(result['items']), status_code, headers
 
 @check_ins_bp.route('/<int:habit_id>/check-ins', methods=['POST'])
+@idempotent
 def create_check_in(habit_id):
     """Create a new check-in for a habit."""
     if not request.is_json:
@@ -18,16 +41,69 @@ def create_check_in(habit_id):
     
     data = request.get_json()
     result, status_code = check_in_service.create_check_in(habit_id, data)
+    if status_code == 202:
+        location = url_for('check_ins.get_queued_check_in', habit_id=habit_id, ticket=result['ticket'])
+        return jsonify(result), status_code, {'Location': location}
+    return jsonify(result), status_code
+
+@check_ins_bp.route('/<int:habit_id>/check-ins/queued/<ticket>', methods=['GET'])
+def get_queued_check_in(habit_id, ticket):
+    """Get the outcome of a check-in accepted in write-behind mode."""
+    result, status_code = check_in_service.get_queued_check_in(habit_id, ticket)
+    return jsonify(result), status_code
+
+@check_ins_bp.route('/<int:habit_id>/check-ins/bulk', methods=['POST'])
+def bulk_create_check_ins(habit_id):
+    """Create many check-ins for a habit from a JSON array or NDJSON body."""
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        rows = []
+        for line_number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                return jsonify({'error': f'Invalid JSON on line {line_number}'}), 400
+    elif request.is_json:
+        rows = request.get_json()
+        if not isinstance(rows, list):
+            return jsonify({'error': 'Request body must be a JSON array'}), 400
+    else:
+        return jsonify({'error': 'Request must be JSON or NDJSON'}), 400
+    
+    max_rows = current_app.config['CHECK_IN_BULK_MAX_ROWS']
+    if len(rows) > max_rows:
+        return jsonify({'error': f'At most {max_rows} check-ins can be imported per request'}), 413
+    
+    result, status_code = check_in_service.bulk_create_check_ins(habit_id, rows)
     return jsonify(result), status_code
 
 @check_ins_bp.route('/<int:habit_id>/check-ins/<int:check_in_id>', methods=['DELETE'])
 def delete_check_in(habit_id, check_in_id):
     """Delete a check-in."""
-    result, status_code = check_in_service.delete_check_in(check_in_id)
+    result, status_code = check_in_service.delete_check_in(habit_id, check_in_id)
+    return jsonify(result), status_code
+
+@check_ins_bp.route('/<int:habit_id>/days/<day>', methods=['GET'])
+def get_day(habit_id, day):
+    """Check whether a habit was checked in on a given day."""
+    result, status_code = check_in_service.get_day(habit_id, day)
     return jsonify(result), status_code
 
 @check_ins_bp.route('/<int:habit_id>/streaks', methods=['GET'])
 def get_streaks(habit_id):
     """Get streaks for a habit."""
     result, status_code = check_in_service.get_streaks(habit_id)
+    return jsonify(result), status_code
+
+@check_ins_bp.route('/streaks', methods=['GET'])
+def get_streaks_for_habits():
+    """Get streaks for many habits (?ids=1,2,3) or for all of them."""
+    result, status_code = check_in_service.get_streaks_for_habits(request.args)
+    return jsonify(result), status_code
+
+@check_ins_bp.route('/<int:habit_id>/streaks/summary', methods=['GET'])
+def get_streak_summary(habit_id):
+    """Get current and longest streak for a habit."""
+    result, status_code = check_in_service.get_streak_summary(habit_id)
     return jsonify(result), status_code
\ No newline at end of file
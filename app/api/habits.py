@@ -1,22 +1,47 @@
-from flask import request, jsonify
+from flask import Response, current_app, request, jsonify, stream_with_context
+from app import events
 from app.api import habits_bp
+from app.services.export_service import ExportService
 from app.services.habit_service import HabitService
+from app.utils.dates import dated, utc_today
+from app.utils.http import conditional_headers, is_not_modified, make_etag
+from app.utils.pagination import next_page_headers
 
 habit_service = HabitService()
+export_service = ExportService()
 
 @habits_bp.route('', methods=['GET'])
 def get_habits():
-    """Get all habits."""
-    habits = habit_service.get_all_habits()
-    return jsonify(habits)
+    """Get a page of habits."""
+    count, max_id, last_modified = habit_service.get_collection_version()
+    # current_streak depends on the date, so the representation changes daily.
+    # No Last-Modified: deleting a habit does not move max(updated_at), only the ETag
+    etag = make_etag('habits', count, max_id, last_modified, utc_today(), request.query_string)
+    if is_not_modified(etag):
+        return '', 304, conditional_headers(etag)
+    
+    result, status_code = habit_service.get_all_habits(request.args)
+    if status_code != 200:
+        return jsonify(result), status_code
+    headers = {**conditional_headers(etag), **next_page_headers(result['next_cursor'])}
+    return jsonify(result['items']), status_code, headers
 
 @habits_bp.route('/<int:habit_id>', methods=['GET'])
 def get_habit(habit_id):
     """Get a specific habit by ID."""
+    last_modified = habit_service.get_version(habit_id)
+    if not last_modified:
+        return jsonify({'error': 'Habit not found'}), 404
+    today = utc_today()
+    etag = make_etag('habit', habit_id, last_modified, today)
+    last_modified = dated(last_modified, today)
+    if is_not_modified(etag, last_modified):
+        return '', 304, conditional_headers(etag, last_modified)
+    
     habit = habit_service.get_habit_by_id(habit_id)
     if not habit:
         return jsonify({'error': 'Habit not found'}), 404
-    return jsonify(habit)
+    return jsonify(habit), 200, conditional_headers(etag, last_modified)
 
 @habits_bp.route('', methods=['POST'])
 def create_habit():
@@ -42,4 +67,37 @@ def update_habit(habit_id):
 def delete_habit(habit_id):
     """Delete a habit."""
     result, status_code = habit_service.delete_habit(habit_id)
-    return jsonify(result), status_code
\ No newline at end of file
+    return jsonify(result), status_code
+
+@habits_bp.route('/export', methods=['GET'])
+def export_habits():
+    """Stream all habits and their check-ins as NDJSON or CSV."""
+    export_format = request.args.get('format', 'ndjson')
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    result, status_code = export_service.export_history(export_format, batch_size)
+    if status_code != 200:
+        return jsonify(result), status_code
+    
+    chunks, mimetype = result
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=habits.{export_format}'}
+    )
+
+@habits_bp.route('/events', methods=['GET'])
+def stream_events():
+    """Stream habit and check-in changes as Server-Sent Events, optionally for one habit (?habit_id=)."""
+    habit_id = request.args.get('habit_id', type=int)
+    subscription = events.subscribe(habit_id)
+    if subscription is None:
+        return jsonify({'error': 'Too many event stream clients'}), 503
+    
+    response = Response(
+        stream_with_context(events.stream(subscription, current_app.config['EVENTS_HEARTBEAT_SECONDS'])),
+        mimetype='text/event-stream',
+        # Proxies such as nginx must pass events through as they are written
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(lambda: events.unsubscribe(subscription))
+    return response
@@ -0,0 +1,29 @@
+from flask import request, jsonify
+from app.api import stats_bp
+from app.services.stats_service import StatsService
+
+stats_service = StatsService()
+
+@stats_bp.route('/<int:habit_id>/stats', methods=['GET'])
+def get_stats(habit_id):
+    """Get completion and streak statistics for a habit."""
+    result, status_code = stats_service.get_summary(habit_id)
+    return jsonify(result), status_code
+
+@stats_bp.route('/<int:habit_id>/stats/rolling', methods=['GET'])
+def get_rolling_completion(habit_id):
+    """Get rolling completion rates for a habit."""
+    result, status_code = stats_service.get_rolling_completion(habit_id, request.args)
+    return jsonify(result), status_code
+
+@stats_bp.route('/<int:habit_id>/stats/heatmap', methods=['GET'])
+def get_heatmap(habit_id):
+    """Get a calendar heatmap bitmap for a habit."""
+    result, status_code = stats_service.get_heatmap(habit_id, request.args)
+    return jsonify(result), status_code
+
+@stats_bp.route('/<int:habit_id>/stats/periods', methods=['GET'])
+def get_period_aggregates(habit_id):
+    """Get weekly or monthly aggregates for a habit."""
+    result, status_code = stats_service.get_period_aggregates(habit_id, request.args)
+    return jsonify(result), status_code
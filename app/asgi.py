@@ -0,0 +1,111 @@
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from app import create_app, db
+from app.utils.async_db import create_async_engine
+
+class AsyncReadApp:
+    """
+    ASGI application for the async deployment mode.
+
+    GET requests for the habit and check-in read endpoints are served by the
+    coroutines in app.api.async_views on an AsyncSession, so one process can
+    keep many of them waiting on the database at once. Every other request
+    goes to the Flask app in a worker thread. Async views run inside a Flask
+    request context, so `request`, the cache and the request hooks behave as
+    they do for the blueprint views.
+    """
+
+    def __init__(self, flask_app, engine):
+        from asgiref.wsgi import WsgiToAsgi
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.api.async_views import views
+
+        self.flask_app = flask_app
+        self.engine = engine
+        self.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        self.views = views
+        self.wsgi = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            view, view_args = self.match(scope['path'])
+            if view is not None:
+                return await self.dispatch(view, view_args, scope, send)
+        await self.wsgi(scope, receive, send)
+
+    def match(self, path):
+        """Find the async view for a path using the Flask app's URL map."""
+        adapter = self.flask_app.url_map.bind('localhost')
+        try:
+            endpoint, view_args = adapter.match(path, method='GET')
+        except HTTPException:
+            return None, None
+        return self.views.get(endpoint), view_args
+
+    async def dispatch(self, view, view_args, scope, send):
+        """Run an async view inside a Flask request context and send its response."""
+        flask_app = self.flask_app
+        with flask_app.request_context(_environ(scope)):
+            try:
+                response = flask_app.preprocess_request()
+                if response is None:
+                    async with self.session_factory() as session:
+                        response = await view(session, **view_args)
+                response = flask_app.process_response(flask_app.make_response(response))
+            except Exception as e:
+                response = flask_app.make_response(flask_app.handle_exception(e))
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in response.headers.items()
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+    async def lifespan(self, receive, send):
+        """Dispose of the async engine's connections on shutdown."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+def _environ(scope):
+    """Build the WSGI environ of a bodyless ASGI HTTP request."""
+    server = scope.get('server') or ('localhost', 80)
+    builder = EnvironBuilder(
+        path=scope['path'],
+        base_url=f"{scope.get('scheme', 'http')}://{server[0]}:{server[1]}{scope.get('root_path', '')}",
+        query_string=scope['query_string'].decode('latin-1'),
+        method=scope['method'],
+        headers=[(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']],
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+def create_asgi_app(config_name):
+    """Create the Flask app and wrap it in the async read path."""
+    flask_app = create_app(config_name)
+    if flask_app.config.get('SQLALCHEMY_SHARD_URIS'):
+        raise RuntimeError('The async read path does not support sharding; serve the WSGI app instead')
+    with flask_app.app_context():
+        # Flask-SQLAlchemy has already resolved relative SQLite paths against the instance folder
+        url = db.engine.url
+    engine = create_async_engine(
+        url,
+        flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+        flask_app.config.get('SQLITE_PRAGMAS', {})
+    )
+    return AsyncReadApp(flask_app, engine)
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import cache, db
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.bitmap_repository import BitmapRepository
+from app.repositories.streak_repository import StreakRepository
+from app.utils.shards import pin_shard, shard_set
+
+streaks_cli = AppGroup('streaks', help='Manage the persisted streak index.')
+bitmaps_cli = AppGroup('bitmaps', help='Manage the per-habit day bitmaps.')
+shards_cli = AppGroup('shards', help='Manage the shard databases.')
+check_ins_cli = AppGroup('check-ins', help='Manage stored check-ins.')
+
+def on_each_shard(rebuild, habit_id):
+    """Run a rebuild on the shard of one habit, or on every shard in turn."""
+    if habit_id is not None:
+        pin_shard(habit_id)
+        return rebuild(habit_id)
+    written = 0
+    for index in range(shard_set().count):
+        pin_shard(index=index)
+        written += rebuild(None)
+        db.session.expunge_all()
+    return written
+
+@streaks_cli.command('rebuild')
+@click.option('--habit-id', type=int, default=None, help='Only rebuild streaks for this habit.')
+def rebuild_streaks(habit_id):
+    """Rebuild streak segments from existing check-ins."""
+    written = on_each_shard(StreakRepository.rebuild, habit_id)
+    cache.clear()
+    click.echo(f'Rebuilt streak index ({written} segments).')
+
+
+@bitmaps_cli.command('rebuild')
+@click.option('--habit-id', type=int, default=None, help='Only rebuild the bitmap of this habit.')
+def rebuild_bitmaps(habit_id):
+    """Rebuild day bitmaps from existing check-ins."""
+    written = on_each_shard(BitmapRepository.rebuild, habit_id)
+    cache.clear()
+    click.echo(f'Rebuilt day bitmaps ({written} habits).')
+
+
+@shards_cli.command('init')
+def init_shards():
+    """Create the tables on every shard database."""
+    engines = shard_set().engines
+    for engine in engines:
+        db.metadata.create_all(engine)
+    click.echo(f'Created tables on {len(engines)} shards.')
+
+
+@check_ins_cli.command('archive')
+@click.option('--older-than-days', type=int, default=None,
+              help='Archive check-ins older than this many days (default CHECK_IN_ARCHIVE_AFTER_DAYS).')
+@click.option('--habit-id', type=int, default=None, help='Only archive check-ins of this habit.')
+def archive_check_ins(older_than_days, habit_id):
+    """Move old check-ins from the database to the columnar archive."""
+    days = older_than_days if older_than_days is not None else current_app.config['CHECK_IN_ARCHIVE_AFTER_DAYS']
+    before = date.today() - timedelta(days=days)
+    archived = on_each_shard(lambda current_id: CheckInRepository.archive_older_than(before, current_id), habit_id)
+    click.echo(f'Archived {archived} check-ins dated before {before.isoformat()}.')
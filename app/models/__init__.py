@@ -1,2 +1,5 @@
 from app.models.habit import Habit
-from app.models.check_in import CheckIn
\ No newline at end of file
+from app.models.check_in import CheckIn
+from app.models.streak import Streak
+from app.models.habit_bitmap import HabitBitmap
+from app.models.id_block import IdBlock
\ No newline at end of file
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from app import db
+from app.utils.dates import utc_today
 
 class Habit(db.Model):
     """Model representing a habit to be tracked."""
@@ -12,12 +13,35 @@ class Habit(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Streak counters, maintained by StreakRepository.refresh_summary
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    latest_streak_days = db.Column(db.Integer, nullable=False, default=0)
+    latest_streak_last = db.Column(db.Date, nullable=True)
+    
     # Relationship with CheckIn model
     check_ins = db.relationship('CheckIn', back_populates='habit', cascade='all, delete-orphan')
+    streaks = db.relationship('Streak', back_populates='habit', cascade='all, delete-orphan',
+                              order_by='Streak.first')
+    bitmap = db.relationship('HabitBitmap', back_populates='habit', uselist=False,
+                             cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        # Serves max(updated_at) and count() of the collection version from the index alone
+        db.Index('ix_habits_updated_at', 'updated_at'),
+    )
     
     def __repr__(self):
         return f'<Habit {self.name}>'
     
+    @property
+    def current_streak(self):
+        """Length of the streak that is still alive (checked in today or yesterday)."""
+        if not self.latest_streak_last:
+            return 0
+        if self.latest_streak_last < utc_today() - timedelta(days=1):
+            return 0
+        return self.latest_streak_days
+    
     def to_dict(self):
         """Convert habit to dictionary."""
         return {
@@ -25,5 +49,7 @@ class Habit(db.Model):
             'name': self.name,
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak or 0
         }
\ No newline at end of file
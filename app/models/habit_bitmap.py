@@ -0,0 +1,26 @@
+from app import db
+from app.utils.bitmap import DayBitmap
+
+class HabitBitmap(db.Model):
+    """Model storing one bit per calendar day of a habit's check-in history."""
+    
+    __tablename__ = 'habit_bitmaps'
+    
+    habit_id = db.Column(db.Integer, db.ForeignKey('habits.id'), primary_key=True)
+    origin = db.Column(db.Date, nullable=True)
+    bits = db.Column(db.LargeBinary, nullable=False, default=b'')
+    
+    # Relationship with Habit model
+    habit = db.relationship('Habit', back_populates='bitmap')
+    
+    def __repr__(self):
+        return f'<HabitBitmap for habit_id={self.habit_id} from {self.origin}>'
+    
+    def to_bitmap(self):
+        """Convert the stored row into a DayBitmap."""
+        return DayBitmap(self.origin, self.bits or b'')
+    
+    def update_from(self, bitmap):
+        """Store the contents of a DayBitmap."""
+        self.origin = bitmap.origin
+        self.bits = bytes(bitmap.bits)
@@ -0,0 +1,12 @@
+from app import db
+
+class IdBlock(db.Model):
+    """Model storing the next unreserved block of IDs of a sharded table."""
+    
+    __tablename__ = 'id_blocks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    next_block = db.Column(db.Integer, nullable=False)
+    
+    def __repr__(self):
+        return f'<IdBlock {self.name} next={self.next_block}>'
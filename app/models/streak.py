@@ -0,0 +1,33 @@
+from app import db
+
+class Streak(db.Model):
+    """Model representing a run of consecutive check-in days for a habit."""
+    
+    __tablename__ = 'streaks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    habit_id = db.Column(db.Integer, db.ForeignKey('habits.id'), nullable=False)
+    first = db.Column(db.Date, nullable=False)
+    last = db.Column(db.Date, nullable=False)
+    days = db.Column(db.Integer, nullable=False)
+    
+    # Relationship with Habit model
+    habit = db.relationship('Habit', back_populates='streaks')
+    
+    __table_args__ = (
+        db.UniqueConstraint('habit_id', 'first', name='uix_streak_habit_first'),
+        db.Index('ix_streaks_habit_last', 'habit_id', 'last'),
+        # Lets refresh_summary read a habit's longest streak from the index
+        db.Index('ix_streaks_habit_days', 'habit_id', 'days'),
+    )
+    
+    def __repr__(self):
+        return f'<Streak for habit_id={self.habit_id} {self.first}..{self.last}>'
+    
+    def to_dict(self):
+        """Convert streak to dictionary."""
+        return {
+            'first': self.first.isoformat() if self.first else None,
+            'last': self.last.isoformat() if self.last else None,
+            'days': self.days
+        }
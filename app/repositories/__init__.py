@@ -1,2 +1,6 @@
 from app.repositories.habit_repository import HabitRepository
-from app.repositories.check_in_repository import CheckInRepository
\ No newline at end of file
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.streak_repository import StreakRepository
+from app.repositories.bitmap_repository import BitmapRepository
+from app.repositories.async_habit_repository import AsyncHabitRepository
+from app.repositories.async_check_in_repository import AsyncCheckInRepository
@@ -0,0 +1,47 @@
+from app.models.habit import Habit
+from app.models.habit_bitmap import HabitBitmap
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.streak_repository import StreakRepository
+from app.utils.bitmap import DayBitmap
+
+class AsyncCheckInRepository:
+    """
+    Check-in and streak reads for the async deployment mode.
+    
+    Runs the statements built by CheckInRepository and StreakRepository on an
+    AsyncSession passed in by the caller, so both modes issue the same SQL.
+    """
+    
+    @staticmethod
+    async def get_page(session, habit_id, limit, date_from=None, date_to=None, after=None):
+        """Get one page of check-ins for a habit; see CheckInRepository.get_page."""
+        result = await session.execute(
+            CheckInRepository.page_statement(habit_id, limit, date_from, date_to, after)
+        )
+        check_ins = result.scalars().all()
+        archived = CheckInRepository.get_archived(habit_id, limit + 1, date_from, date_to, after)
+        if not archived:
+            return check_ins
+        habit = check_ins[0].habit if check_ins else await session.get(Habit, habit_id)
+        return CheckInRepository.merge_archived(check_ins, archived, habit, limit + 1)
+    
+    @staticmethod
+    async def get_bitmap(session, habit_id):
+        """Get the day bitmap of a habit's check-ins."""
+        row = await session.get(HabitBitmap, habit_id)
+        return row.to_bitmap() if row else DayBitmap()
+    
+    @staticmethod
+    async def get_streaks(session, habit_id):
+        """Get streaks for a habit from the persisted streak index."""
+        result = await session.execute(StreakRepository.habit_statement(habit_id))
+        return [
+            {"first": streak.first, "last": streak.last, "days": streak.days}
+            for streak in result.scalars()
+        ]
+    
+    @staticmethod
+    async def get_streaks_for_habits(session, habit_ids=None):
+        """Get streaks for many habits, or all of them, with a single query."""
+        result = await session.execute(StreakRepository.habits_statement(habit_ids))
+        return StreakRepository.group_by_habit(result)
@@ -0,0 +1,44 @@
+from app.models.habit import Habit
+from app.repositories.habit_repository import HabitRepository
+
+class AsyncHabitRepository:
+    """
+    Habit reads for the async deployment mode.
+    
+    Runs the statements built by HabitRepository on an AsyncSession passed
+    in by the caller, so both modes issue exactly the same SQL.
+    """
+    
+    @staticmethod
+    async def get_page(session, limit, after_id=None, field_names=None, include_check_ins=False):
+        """Get one page of habits; see HabitRepository.page_statement."""
+        result = await session.execute(
+            HabitRepository.page_statement(limit, after_id, field_names, include_check_ins)
+        )
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_detail(session, habit_id):
+        """Get a habit with its check-ins, or None if it does not exist."""
+        result = await session.execute(HabitRepository.detail_statement(habit_id))
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_by_id(session, habit_id):
+        """Get habit by ID, without its relationships."""
+        return await session.get(Habit, habit_id)
+    
+    @staticmethod
+    async def exists(session, habit_id):
+        """Check whether a habit exists with an EXISTS query, without loading it."""
+        return (await session.execute(HabitRepository.exists_statement(habit_id))).scalar()
+    
+    @staticmethod
+    async def get_version(session, habit_id):
+        """Get a habit's last modification time, or None if it does not exist."""
+        return (await session.execute(HabitRepository.version_statement(habit_id))).scalar_one_or_none()
+    
+    @staticmethod
+    async def get_collection_version(session):
+        """Get the habit count, highest ID and latest modification time of all habits."""
+        return tuple((await session.execute(HabitRepository.collection_version_statement())).one())
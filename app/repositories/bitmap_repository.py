@@ -0,0 +1,75 @@
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import archive, db
+from app.models.check_in import CheckIn
+from app.models.habit import Habit
+from app.models.habit_bitmap import HabitBitmap
+from app.utils.bitmap import DayBitmap
+
+class BitmapRepository:
+    """
+    Repository for the per-habit day bitmaps.
+    
+    Like the streak index, bitmaps are derived from check-ins and the
+    incremental methods only stage changes so they commit with the check-in.
+    """
+    
+    @staticmethod
+    def get(habit_id):
+        """Get a habit's day bitmap; habits without check-ins get an empty one."""
+        row = db.session.get(HabitBitmap, habit_id)
+        return row.to_bitmap() if row else DayBitmap()
+    
+    @staticmethod
+    def add_day(habit_id, day):
+        """Set a checked-in day in the habit's bitmap."""
+        row = db.session.get(HabitBitmap, habit_id)
+        if row is None:
+            row = HabitBitmap(habit_id=habit_id)
+            db.session.add(row)
+        bitmap = row.to_bitmap()
+        bitmap.add(day)
+        row.update_from(bitmap)
+    
+    @staticmethod
+    def remove_day(habit_id, day):
+        """Clear a day in the habit's bitmap."""
+        row = db.session.get(HabitBitmap, habit_id)
+        if row is not None:
+            bitmap = row.to_bitmap()
+            bitmap.remove(day)
+            row.update_from(bitmap)
+    
+    @staticmethod
+    def replace_for_habit(habit_id):
+        """Stage a bitmap rebuilt from all of the habit's check-ins, archived ones included."""
+        dates = db.session.execute(
+            select(CheckIn.date).where(CheckIn.habit_id == habit_id)
+        ).scalars().all()
+        dates += archive.dates(habit_id)
+        row = db.session.get(HabitBitmap, habit_id)
+        if row is None:
+            row = HabitBitmap(habit_id=habit_id)
+            db.session.add(row)
+        row.update_from(DayBitmap.from_dates(dates))
+    
+    @staticmethod
+    def rebuild(habit_id=None):
+        """
+        Rebuild bitmaps from check-ins, for one habit or all of them.
+        Returns the number of bitmaps written.
+        """
+        if habit_id is None:
+            habit_ids = db.session.execute(select(Habit.id)).scalars().all()
+        else:
+            habit_ids = [habit_id]
+        
+        try:
+            for current_id in habit_ids:
+                BitmapRepository.replace_for_habit(current_id)
+            db.session.commit()
+            return len(habit_ids)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
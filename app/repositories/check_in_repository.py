@@ -1,29 +1,145 @@
-from sqlalchemy import func, and_, text
+from sqlalchemy import and_, or_, delete, select
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app import db
+from app import archive, db
 from app.models.check_in import CheckIn
+from app.models.habit import Habit
+from app.repositories.bitmap_repository import BitmapRepository
+from app.repositories.streak_repository import StreakRepository
+from app.utils.db import dialect_insert
+from app.utils.replicas import replica_read
+from app.utils.shards import PartialShardWriteError, allocate_ids, fan_out, is_sharded, pin_shard, shard_for
 
 class CheckInRepository:
     """Repository for check-in data access operations."""
     
+    # Bulk inserts of up to this many new days update the streak index and
+    # bitmap day by day instead of recomputing them for the whole habit
+    INCREMENTAL_INDEX_MAX_ROWS = 16
+    
     @staticmethod
+    @replica_read
     def get_by_habit_id(habit_id):
-        """Get all check-ins for a habit."""
-        return CheckIn.query.filter_by(habit_id=habit_id).order_by(CheckIn.date.desc()).all()
+        """Get all check-ins for a habit, newest first, including archived ones."""
+        pin_shard(habit_id)
+        check_ins = CheckIn.query.filter_by(habit_id=habit_id).order_by(CheckIn.date.desc()).all()
+        return CheckInRepository.merge_archived(check_ins, CheckInRepository.get_archived(habit_id))
+    
+    @staticmethod
+    def page_statement(habit_id, limit, date_from=None, date_to=None, after=None):
+        """
+        Build the query for one page of check-ins for a habit, newest first,
+        keyset-paginated on (date, id). `after` is the (date, id) of the last row
+        of the previous page. The habit each check-in serializes is joined in.
+        Selects one extra row so callers can tell whether another page exists.
+        """
+        stmt = select(CheckIn).where(CheckIn.habit_id == habit_id).options(joinedload(CheckIn.habit))
+        if date_from:
+            stmt = stmt.where(CheckIn.date >= date_from)
+        if date_to:
+            stmt = stmt.where(CheckIn.date <= date_to)
+        if after:
+            after_date, after_id = after
+            stmt = stmt.where(or_(
+                CheckIn.date < after_date,
+                and_(CheckIn.date == after_date, CheckIn.id < after_id)
+            ))
+        return stmt.order_by(CheckIn.date.desc(), CheckIn.id.desc()).limit(limit + 1)
+    
+    @staticmethod
+    @replica_read
+    def get_page(habit_id, limit, date_from=None, date_to=None, after=None):
+        """
+        Get one page of check-ins for a habit; see page_statement. Archived
+        check-ins are merged into the page in the same order.
+        """
+        pin_shard(habit_id)
+        check_ins = db.session.execute(
+            CheckInRepository.page_statement(habit_id, limit, date_from, date_to, after)
+        ).scalars().all()
+        archived = CheckInRepository.get_archived(habit_id, limit + 1, date_from, date_to, after)
+        if not archived:
+            return check_ins
+        habit = check_ins[0].habit if check_ins else db.session.get(Habit, habit_id)
+        return CheckInRepository.merge_archived(check_ins, archived, habit, limit + 1)
+    
+    @staticmethod
+    def get_archived(habit_id, limit=None, date_from=None, date_to=None, after=None):
+        """
+        Get a habit's archived check-ins, newest first, filtered like page_statement.
+        They are built from the archive segment and never added to the session.
+        """
+        segment = archive.segment(habit_id)
+        if segment is None:
+            return []
+        return [
+            CheckIn(habit_id=habit_id, **row)
+            for row in segment.newest(limit, date_from, date_to, after)
+        ]
+    
+    @staticmethod
+    def merge_archived(check_ins, archived, habit=None, limit=None):
+        """
+        Merge archived check-ins into check-ins from the table, newest first by (date, id).
+        Rows caught in both while being archived are kept once. With `habit`, it is set
+        on the archived check-ins so they serialize like the ones loaded with their habit.
+        """
+        if not archived:
+            return check_ins
+        ids = {check_in.id for check_in in check_ins}
+        archived = [check_in for check_in in archived if check_in.id not in ids]
+        if habit is not None:
+            for check_in in archived:
+                # Sets the relationship without cascading the check-in into the session
+                set_committed_value(check_in, 'habit', habit)
+        merged = sorted([*check_ins, *archived], key=lambda check_in: (check_in.date, check_in.id), reverse=True)
+        return merged[:limit] if limit is not None else merged
+    
+    @staticmethod
+    @replica_read
+    def get_bitmap(habit_id):
+        """Get the day bitmap of a habit's check-ins."""
+        pin_shard(habit_id)
+        return BitmapRepository.get(habit_id)
     
     @staticmethod
+    @replica_read
     def get_by_id(check_in_id):
-        """Get check-in by ID."""
-        return CheckIn.query.get(check_in_id)
+        """Get check-in by ID, looking it up on every shard when sharded."""
+        if not is_sharded():
+            return CheckIn.query.get(check_in_id)
+        found = [check_in for check_in in fan_out(lambda session: session.get(CheckIn, check_in_id)) if check_in]
+        return found[0] if found else None
     
     @staticmethod
     def create(check_in_data):
-        """Create a new check-in."""
-        check_in = CheckIn(**check_in_data)
-        db.session.add(check_in)
+        """
+        Create a new check-in. Returns None without raising when the habit
+        already has a check-in on that date, via ON CONFLICT on uix_habit_date
+        or, for archived dates, a lookup in the habit's archive segment.
+        """
+        if 'date' in check_in_data and archive.contains(check_in_data['habit_id'], check_in_data['date']):
+            return None
+        check_in_id, = allocate_ids(CheckIn)
+        if check_in_id is not None:
+            check_in_data = {**check_in_data, 'id': check_in_id}
+        pin_shard(check_in_data['habit_id'])
+        stmt = (
+            dialect_insert(CheckIn)
+            .values(**check_in_data)
+            .on_conflict_do_nothing(index_elements=['habit_id', 'date'])
+            .returning(CheckIn)
+        )
         try:
+            check_in = db.session.scalars(stmt).first()
+            if check_in is None:
+                db.session.rollback()
+                return None
+            StreakRepository.add_day(check_in.habit_id, check_in.date)
+            StreakRepository.refresh_summary(check_in.habit_id)
+            BitmapRepository.add_day(check_in.habit_id, check_in.date)
             db.session.commit()
             return check_in
         except SQLAlchemyError as e:
@@ -31,58 +147,224 @@ class CheckInRepository:
             raise e
     
     @staticmethod
-    def delete(check_in_id):
-        """Delete a check-in."""
-        check_in = CheckIn.query.get(check_in_id)
-        if not check_in:
-            return False
+    def stage_bulk_create(habit_id, rows, ids=None):
+        """
+        Insert many check-ins for a habit without committing, updating the
+        streak index and bitmap in the same transaction. A few new days are
+        applied incrementally; larger imports recompute the habit's indexes.
+        Rows whose date already exists are skipped via ON CONFLICT on uix_habit_date.
+        When sharded, `ids` are the pre-allocated IDs of the rows (see
+        allocate_ids), and they are allocated here if not given.
+        Returns a mapping of inserted date to check-in ID.
+        """
+        if not rows:
+            return {}
         
-        db.session.delete(check_in)
+        values = [
+            {'habit_id': habit_id, 'date': row['date'], 'notes': row.get('notes')}
+            for row in rows
+        ]
+        if is_sharded():
+            for value, check_in_id in zip(values, ids or allocate_ids(CheckIn, len(values))):
+                value['id'] = check_in_id
+        segment = archive.segment(habit_id)
+        if segment is not None:
+            # uix_habit_date only covers the table, so archived dates are skipped here
+            values = [value for value in values if not segment.contains(value['date'])]
+            if not values:
+                return {}
+        pin_shard(habit_id)
+        stmt = (
+            dialect_insert(CheckIn)
+            .on_conflict_do_nothing(index_elements=['habit_id', 'date'])
+            .returning(CheckIn.id, CheckIn.date)
+        )
+        inserted = {row.date: row.id for row in db.session.execute(stmt, values)}
+        if len(inserted) > CheckInRepository.INCREMENTAL_INDEX_MAX_ROWS:
+            StreakRepository.replace_for_habit(habit_id)
+            BitmapRepository.replace_for_habit(habit_id)
+        elif inserted:
+            for day in sorted(inserted):
+                StreakRepository.add_day(habit_id, day)
+                BitmapRepository.add_day(habit_id, day)
+            StreakRepository.refresh_summary(habit_id)
+        return inserted
+    
+    @staticmethod
+    def bulk_create(habit_id, rows):
+        """
+        Insert many check-ins for a habit in a single transaction.
+        Returns a mapping of inserted date to check-in ID.
+        """
+        try:
+            inserted = CheckInRepository.stage_bulk_create(habit_id, rows)
+            db.session.commit()
+            return inserted
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
+    @staticmethod
+    def bulk_create_many(rows_by_habit):
+        """
+        Insert check-ins for several habits in a single transaction, so they
+        share one commit. Returns a mapping of habit ID to {date: check-in ID}.
+        When sharded, there is one transaction per shard, committed in turn; if
+        one fails, PartialShardWriteError carries what earlier shards committed.
+        """
+        if is_sharded():
+            return CheckInRepository._bulk_create_sharded(rows_by_habit)
         try:
+            inserted = {
+                habit_id: CheckInRepository.stage_bulk_create(habit_id, rows)
+                for habit_id, rows in rows_by_habit.items()
+            }
             db.session.commit()
-            return True
+            return inserted
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
+    @staticmethod
+    def _bulk_create_sharded(rows_by_habit):
+        # IDs are allocated before any shard starts writing, since allocating
+        # needs the write lock of shard 0
+        ids = {habit_id: allocate_ids(CheckIn, len(rows)) for habit_id, rows in rows_by_habit.items()}
+        by_shard = {}
+        for habit_id in rows_by_habit:
+            by_shard.setdefault(shard_for(habit_id), []).append(habit_id)
+        
+        inserted = {}
+        for index, habit_ids in sorted(by_shard.items()):
+            pin_shard(index=index)
+            try:
+                for habit_id in habit_ids:
+                    inserted[habit_id] = CheckInRepository.stage_bulk_create(
+                        habit_id, rows_by_habit[habit_id], ids[habit_id]
+                    )
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                for habit_id in habit_ids:
+                    inserted.pop(habit_id, None)
+                raise PartialShardWriteError(inserted, e) from e
+            # Objects of one shard must not be flushed to the next
+            db.session.expunge_all()
+        return {habit_id: inserted[habit_id] for habit_id in rows_by_habit}
+    
+    @staticmethod
+    def delete(habit_id, check_in_id):
+        """
+        Delete a habit's check-in with a single DELETE ... RETURNING, or by
+        rewriting the habit's archive segment when the check-in is archived.
+        Returns False when no check-in with that ID belongs to the habit.
+        """
+        stmt = (
+            delete(CheckIn)
+            .where(CheckIn.id == check_in_id, CheckIn.habit_id == habit_id)
+            .returning(CheckIn.date)
+            .execution_options(synchronize_session=False)
+        )
+        pin_shard(habit_id)
+        try:
+            day = db.session.execute(stmt).scalar_one_or_none()
+            if day is not None:
+                StreakRepository.remove_day(habit_id, day)
+                StreakRepository.refresh_summary(habit_id)
+                BitmapRepository.remove_day(habit_id, day)
+                db.session.commit()
+                return True
+            db.session.rollback()
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
+        return CheckInRepository._delete_archived(habit_id, check_in_id)
+    
+    @staticmethod
+    def _delete_archived(habit_id, check_in_id):
+        # The database lock is only taken inside the archive lock, as when archiving
+        with archive.lock(habit_id):
+            segment = archive.segment(habit_id)
+            day = segment.find(check_in_id) if segment is not None else None
+            if day is None:
+                return False
+            pending = None
+            try:
+                pending = archive.stage(habit_id, removed=[check_in_id])
+                StreakRepository.remove_day(habit_id, day)
+                StreakRepository.refresh_summary(habit_id)
+                BitmapRepository.remove_day(habit_id, day)
+                pending.publish()
+                db.session.commit()
+                return True
+            except (SQLAlchemyError, OSError) as e:
+                db.session.rollback()
+                if pending is not None:
+                    pending.discard()
+                raise e
+    
+    @staticmethod
+    def archive_older_than(before, habit_id=None):
+        """
+        Move check-ins dated before `before` out of the check_ins table into
+        their habit's archive segment, one habit and transaction at a time.
+        The streak index and bitmaps already hold the archived days and are
+        left untouched. Returns the number of check-ins archived.
+        """
+        stmt = select(CheckIn.habit_id).where(CheckIn.date < before).distinct()
+        if habit_id is not None:
+            stmt = stmt.where(CheckIn.habit_id == habit_id)
+        archived = 0
+        for current_id in db.session.execute(stmt).scalars().all():
+            # Held until the delete commits, so concurrent rewrites of the
+            # segment cannot interleave with this one
+            with archive.lock(current_id):
+                pending = None
+                try:
+                    rows = db.session.execute(
+                        delete(CheckIn)
+                        .where(CheckIn.habit_id == current_id, CheckIn.date < before)
+                        .returning(CheckIn.id, CheckIn.date, CheckIn.notes, CheckIn.created_at)
+                        .execution_options(synchronize_session=False)
+                    ).mappings().all()
+                    # The segment is swapped in just before the delete commits; a row
+                    # briefly in both tiers is read once, see merge_archived
+                    pending = archive.stage(current_id, added=[dict(row) for row in rows])
+                    pending.publish()
+                    db.session.commit()
+                except (SQLAlchemyError, OSError) as e:
+                    db.session.rollback()
+                    if pending is not None:
+                        pending.discard()
+                    raise e
+            archived += len(rows)
+        return archived
     
-    def get_streaks(self, habit_id: int) -> list[dict]:
+    @staticmethod
+    @replica_read
+    def get_streaks(habit_id: int) -> list[dict]:
         """
-        Get streaks for a habit using a SQL query with window functions.
+        Get streaks for a habit from the persisted streak index.
         A streak is defined as consecutive days with check-ins.
         Returns a list of dictionaries with 'first', 'last', and 'days' keys.
         """
-        from sqlalchemy import text
-
-        sql = text("""
-            WITH ordered AS (
-                SELECT
-                    date,
-                    ROW_NUMBER() OVER (ORDER BY date) AS rn
-                FROM check_ins
-                WHERE habit_id = :habit_id
-            ),
-            groups AS (
-                SELECT
-                    date,
-                    DATE(julianday(date) - rn) AS grp
-                FROM ordered
-            )
-            SELECT
-                MIN(date) AS first,
-                MAX(date) AS last,
-                COUNT(*) AS days
-            FROM groups
-            GROUP BY grp
-            ORDER BY first
-        """)
-        result = db.session.execute(sql, {"habit_id": habit_id})
-        from datetime import datetime
-        streaks = [
-            {
-                "first": datetime.strptime(row.first, "%Y-%m-%d").date() if isinstance(row.first, str) else row.first,
-                "last": datetime.strptime(row.last, "%Y-%m-%d").date() if isinstance(row.last, str) else row.last,
-                "days": row.days
-            }
-            for row in result
+        pin_shard(habit_id)
+        return [
+            {"first": streak.first, "last": streak.last, "days": streak.days}
+            for streak in StreakRepository.get_by_habit_id(habit_id)
         ]
-        return streaks
\ No newline at end of file
+    
+    @staticmethod
+    @replica_read
+    def get_streaks_for_habits(habit_ids=None) -> dict[int, list[dict]]:
+        """
+        Get streaks for many habits, or all of them, with a single query per shard.
+        Returns a dict mapping each existing habit ID to its streaks.
+        """
+        if not is_sharded():
+            return StreakRepository.get_by_habit_ids(habit_ids)
+        stmt = StreakRepository.habits_statement(habit_ids)
+        merged = {}
+        for streaks in fan_out(lambda session: StreakRepository.group_by_habit(session.execute(stmt))):
+            merged.update(streaks)
+        return dict(sorted(merged.items()))
\ No newline at end of file
@@ -1,24 +1,216 @@
-from app import db
+import heapq
+from collections import namedtuple
+from itertools import groupby
+from operator import attrgetter
+
+from app import archive, db
 from app.models.habit import Habit
+from app.models.check_in import CheckIn
+from sqlalchemy import exists, func, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, load_only, selectinload
+
+from app.utils.replicas import replica_read
+from app.utils.shards import allocate_ids, fan_out, is_sharded, merge_sorted, pin_shard, shard_set
+
+# Row of iter_history, for check-ins read from the archive
+HistoryRow = namedtuple('HistoryRow', (
+    'id', 'name', 'description', 'created_at', 'updated_at',
+    'check_in_id', 'check_in_date', 'check_in_notes', 'check_in_created_at'
+))
 
 class HabitRepository:
     """Repository for habit data access operations."""
     
+    # Columns backing each serialized habit field, used for load_only projections
+    FIELD_COLUMNS = {
+        'id': ('id',),
+        'name': ('name',),
+        'description': ('description',),
+        'created_at': ('created_at',),
+        'updated_at': ('updated_at',),
+        'current_streak': ('latest_streak_days', 'latest_streak_last'),
+        'longest_streak': ('longest_streak',),
+    }
+    
     @staticmethod
+    @replica_read
     def get_all():
-        """Get all habits."""
-        return Habit.query.all()
+        """Get all habits, ordered by ID, from every shard."""
+        return merge_sorted(
+            fan_out(lambda session: session.execute(select(Habit).order_by(Habit.id)).scalars().all()),
+            key=attrgetter('id')
+        )
+    
+    @staticmethod
+    def page_statement(limit, after_id=None, field_names=None, include_check_ins=False):
+        """
+        Build the query for one page of habits ordered by ID, keyset-paginated on the
+        primary key. Only the columns behind `field_names` are loaded when given, and
+        check-ins are eager-loaded with a single extra SELECT ... IN query when requested.
+        Selects one extra row so callers can tell whether another page exists.
+        """
+        stmt = select(Habit)
+        if field_names:
+            columns = {'id'}.union(*(HabitRepository.FIELD_COLUMNS[name] for name in field_names))
+            stmt = stmt.options(load_only(*(getattr(Habit, column) for column in sorted(columns))))
+        if include_check_ins:
+            stmt = stmt.options(selectinload(Habit.check_ins))
+        if after_id is not None:
+            stmt = stmt.where(Habit.id > after_id)
+        return stmt.order_by(Habit.id).limit(limit + 1)
+    
+    @staticmethod
+    def detail_statement(habit_id):
+        """Build the query for one habit with its check-ins eager-loaded."""
+        return select(Habit).where(Habit.id == habit_id).options(selectinload(Habit.check_ins))
+    
+    @staticmethod
+    def exists_statement(habit_id):
+        """Build an EXISTS query for a habit."""
+        return select(exists().where(Habit.id == habit_id))
+    
+    @staticmethod
+    def version_statement(habit_id):
+        """Build the query for a habit's last modification time."""
+        return select(Habit.updated_at).where(Habit.id == habit_id)
+    
+    @staticmethod
+    def collection_version_statement():
+        """Build the query for the habit count, highest ID and latest modification time."""
+        return select(func.count(Habit.id), func.max(Habit.id), func.max(Habit.updated_at))
+    
+    @staticmethod
+    @replica_read
+    def get_page(limit, after_id=None, field_names=None, include_check_ins=False):
+        """
+        Get one page of habits; see page_statement. Every shard returns its
+        own first page and the pages are merged by ID.
+        """
+        stmt = HabitRepository.page_statement(limit, after_id, field_names, include_check_ins)
+        pages = fan_out(lambda session: session.execute(stmt).scalars().all())
+        return merge_sorted(pages, key=attrgetter('id'))[:limit + 1]
     
     @staticmethod
+    @replica_read
     def get_by_id(habit_id):
         """Get habit by ID."""
+        pin_shard(habit_id)
         return Habit.query.get(habit_id)
     
+    @staticmethod
+    @replica_read
+    def get_detail(habit_id):
+        """Get a habit with its check-ins, or None if it does not exist."""
+        pin_shard(habit_id)
+        return db.session.execute(HabitRepository.detail_statement(habit_id)).scalar_one_or_none()
+    
+    @staticmethod
+    def exists(habit_id):
+        """Check whether a habit exists with an EXISTS query, without loading it."""
+        pin_shard(habit_id)
+        return db.session.execute(HabitRepository.exists_statement(habit_id)).scalar()
+    
+    @staticmethod
+    def existing_ids(habit_ids):
+        """Get the subset of the given habit IDs that exist, in one query per shard."""
+        stmt = select(Habit.id).where(Habit.id.in_(habit_ids))
+        return set().union(*fan_out(lambda session: session.execute(stmt).scalars().all()))
+    
+    @staticmethod
+    @replica_read
+    def get_version(habit_id):
+        """Get a habit's last modification time, or None if it does not exist."""
+        pin_shard(habit_id)
+        return db.session.execute(HabitRepository.version_statement(habit_id)).scalar_one_or_none()
+    
+    @staticmethod
+    @replica_read
+    def get_collection_version():
+        """Get the habit count, highest ID and latest modification time of all habits."""
+        stmt = HabitRepository.collection_version_statement()
+        versions = fan_out(lambda session: session.execute(stmt).one())
+        if len(versions) == 1:
+            return tuple(versions[0])
+        max_ids = [max_id for _, max_id, _ in versions if max_id is not None]
+        updated = [last_modified for _, _, last_modified in versions if last_modified is not None]
+        return (
+            sum(count for count, _, _ in versions),
+            max(max_ids) if max_ids else None,
+            max(updated) if updated else None
+        )
+    
+    @staticmethod
+    def iter_history(batch_size):
+        """
+        Stream every habit joined with its check-ins as plain rows, ordered by habit and date.
+        Rows are fetched from a server-side cursor `batch_size` at a time, so memory
+        use does not depend on the number of rows. Habits without check-ins yield a
+        single row whose check-in columns are None. With several shards, their
+        streams are merged by habit ID. Archived check-ins are merged into their habit's rows.
+        """
+        stmt = (
+            select(
+                Habit.id,
+                Habit.name,
+                Habit.description,
+                Habit.created_at,
+                Habit.updated_at,
+                CheckIn.id.label('check_in_id'),
+                CheckIn.date.label('check_in_date'),
+                CheckIn.notes.label('check_in_notes'),
+                CheckIn.created_at.label('check_in_created_at')
+            )
+            .outerjoin(CheckIn, CheckIn.habit_id == Habit.id)
+            .order_by(Habit.id, CheckIn.date)
+            .execution_options(yield_per=batch_size)
+        )
+        archived_ids = set(archive.habit_ids())
+        if not is_sharded():
+            yield from HabitRepository.with_archived(db.session.execute(stmt), archived_ids)
+            return
+        sessions = [Session(bind=engine) for engine in shard_set().engines]
+        try:
+            rows = heapq.merge(*(session.execute(stmt) for session in sessions), key=attrgetter('id'))
+            yield from HabitRepository.with_archived(rows, archived_ids)
+        finally:
+            for session in sessions:
+                session.close()
+    
+    @staticmethod
+    def with_archived(rows, archived_ids):
+        """Merge the archived check-ins of the habits in `archived_ids` into iter_history rows."""
+        if not archived_ids:
+            yield from rows
+            return
+        for habit_id, habit_rows in groupby(rows, key=attrgetter('id')):
+            if habit_id not in archived_ids:
+                yield from habit_rows
+                continue
+            habit_rows = list(habit_rows)
+            habit = habit_rows[0]
+            segment = archive.segment(habit_id)
+            archived = [
+                HistoryRow(*habit[:5], row['id'], row['date'], row['notes'], row['created_at'])
+                for row in (segment.rows() if segment is not None else [])
+            ]
+            hot_ids = {row.check_in_id for row in habit_rows}
+            merged = sorted(
+                [row for row in habit_rows if row.check_in_id is not None]
+                + [row for row in archived if row.check_in_id not in hot_ids],
+                key=attrgetter('check_in_date')
+            )
+            yield from merged or habit_rows
+    
     @staticmethod
     def create(habit_data):
-        """Create a new habit."""
-        habit = Habit(**habit_data)
+        """
+        Create a new habit. When sharded, its ID is allocated up front since it
+        decides the shard the habit is stored on.
+        """
+        habit_id, = allocate_ids(Habit)
+        habit = Habit(id=habit_id, **habit_data)
+        pin_shard(habit_id)
         db.session.add(habit)
         try:
             db.session.commit()
@@ -30,6 +222,7 @@ class HabitRepository:
     @staticmethod
     def update(habit_id, habit_data):
         """Update an existing habit."""
+        pin_shard(habit_id)
         habit = Habit.query.get(habit_id)
         if not habit:
             return None
@@ -47,6 +240,7 @@ class HabitRepository:
     @staticmethod
     def delete(habit_id):
         """Delete a habit."""
+        pin_shard(habit_id)
         habit = Habit.query.get(habit_id)
         if not habit:
             return False
@@ -54,6 +248,7 @@ class HabitRepository:
         db.session.delete(habit)
         try:
             db.session.commit()
+            archive.drop(habit_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -0,0 +1,252 @@
+from datetime import timedelta
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import archive, db
+from app.models.check_in import CheckIn
+from app.models.habit import Habit
+from app.models.streak import Streak
+from app.utils.db import day_offset
+
+class StreakRepository:
+    """
+    Repository for the persisted streak index.
+    
+    Streak segments are derived from check-ins. The incremental methods only
+    stage changes on the session, so they are committed together with the
+    check-in write that caused them.
+    """
+    
+    @staticmethod
+    def habit_statement(habit_id):
+        """Build the query for a habit's streak segments, oldest first."""
+        return select(Streak).where(Streak.habit_id == habit_id).order_by(Streak.first)
+    
+    @staticmethod
+    def get_by_habit_id(habit_id):
+        """Get all streak segments for a habit, oldest first."""
+        return db.session.execute(StreakRepository.habit_statement(habit_id)).scalars().all()
+    
+    @staticmethod
+    def add_day(habit_id, day):
+        """Add a checked-in day, extending or merging the neighbouring segments."""
+        one_day = timedelta(days=1)
+        before = Streak.query.filter_by(habit_id=habit_id, last=day - one_day).first()
+        after = Streak.query.filter_by(habit_id=habit_id, first=day + one_day).first()
+        
+        if before and after:
+            before.last = after.last
+            before.days += after.days + 1
+            db.session.delete(after)
+        elif before:
+            before.last = day
+            before.days += 1
+        elif after:
+            after.first = day
+            after.days += 1
+        else:
+            db.session.add(Streak(habit_id=habit_id, first=day, last=day, days=1))
+    
+    @staticmethod
+    def remove_day(habit_id, day):
+        """Remove a checked-in day, shrinking or splitting the segment containing it."""
+        streak = (
+            Streak.query
+            .filter(Streak.habit_id == habit_id, Streak.first <= day)
+            .order_by(Streak.first.desc())
+            .first()
+        )
+        if not streak or streak.last < day:
+            return
+        
+        one_day = timedelta(days=1)
+        if streak.first == streak.last:
+            db.session.delete(streak)
+        elif day == streak.first:
+            streak.first = day + one_day
+            streak.days -= 1
+        elif day == streak.last:
+            streak.last = day - one_day
+            streak.days -= 1
+        else:
+            tail = Streak(
+                habit_id=habit_id,
+                first=day + one_day,
+                last=streak.last,
+                days=(streak.last - day).days
+            )
+            streak.last = day - one_day
+            streak.days = (streak.last - streak.first).days + 1
+            db.session.add(tail)
+    
+    @staticmethod
+    def habits_statement(habit_ids=None):
+        """Build the query for the streak segments of many habits, or all of them."""
+        stmt = (
+            select(Habit.id.label('habit_id'), Streak.first, Streak.last, Streak.days)
+            .outerjoin(Streak, Streak.habit_id == Habit.id)
+            .order_by(Habit.id, Streak.first)
+        )
+        if habit_ids is not None:
+            stmt = stmt.where(Habit.id.in_(habit_ids))
+        return stmt
+    
+    @staticmethod
+    def group_by_habit(rows):
+        """
+        Group the rows of habits_statement into a dict mapping every habit ID to
+        its segments, oldest first; habits without streaks map to an empty list.
+        """
+        streaks = {}
+        for row in rows:
+            segments = streaks.setdefault(row.habit_id, [])
+            if row.first is not None:
+                segments.append({"first": row.first, "last": row.last, "days": row.days})
+        return streaks
+    
+    @staticmethod
+    def get_by_habit_ids(habit_ids=None):
+        """Get the streak segments of many habits (or all of them) in one query."""
+        return StreakRepository.group_by_habit(
+            db.session.execute(StreakRepository.habits_statement(habit_ids))
+        )
+    
+    @staticmethod
+    def refresh_summary(habit_id=None):
+        """
+        Recompute streak counters from the segments in one UPDATE,
+        for one habit or, when habit_id is None, for every habit.
+        """
+        db.session.flush()
+        latest = (
+            select(Streak)
+            .where(Streak.habit_id == Habit.id)
+            .order_by(Streak.last.desc())
+            .limit(1)
+        )
+        stmt = (
+            update(Habit)
+            .values(
+                longest_streak=select(func.coalesce(func.max(Streak.days), 0))
+                .where(Streak.habit_id == Habit.id)
+                .scalar_subquery(),
+                latest_streak_days=func.coalesce(latest.with_only_columns(Streak.days).scalar_subquery(), 0),
+                latest_streak_last=latest.with_only_columns(Streak.last).scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if habit_id is not None:
+            stmt = stmt.where(Habit.id == habit_id)
+        db.session.execute(stmt)
+    
+    @staticmethod
+    def compute(habit_id: int) -> list[dict]:
+        """
+        Compute streaks for a habit from its check-ins using window functions.
+        A streak is defined as consecutive days with check-ins.
+        Returns a list of dictionaries with 'first', 'last', and 'days' keys.
+        """
+        return StreakRepository.compute_many([habit_id]).get(habit_id, [])
+    
+    @staticmethod
+    def compute_many(habit_ids=None) -> dict[int, list[dict]]:
+        """
+        Compute streaks for many habits (or all of them) in a single query,
+        numbering each habit's check-ins in its own window partition.
+        Returns a dict mapping habit ID to its streaks; habits without
+        check-ins are absent. Habits with archived check-ins are recomputed
+        from the dates of both tiers afterwards.
+        """
+        ordered = select(
+            CheckIn.habit_id.label('habit_id'),
+            CheckIn.date.label('date'),
+            func.row_number().over(partition_by=CheckIn.habit_id, order_by=CheckIn.date).label('rn')
+        )
+        if habit_ids is not None:
+            ordered = ordered.where(CheckIn.habit_id.in_(habit_ids))
+        ordered = ordered.subquery('ordered')
+        groups = (
+            select(
+                ordered.c.habit_id,
+                ordered.c.date,
+                day_offset(ordered.c.date, ordered.c.rn).label('grp')
+            )
+            .subquery('groups')
+        )
+        first = func.min(groups.c.date)
+        stmt = (
+            select(
+                groups.c.habit_id,
+                first.label('first'),
+                func.max(groups.c.date).label('last'),
+                func.count().label('days')
+            )
+            .group_by(groups.c.habit_id, groups.c.grp)
+            .order_by(groups.c.habit_id, first)
+        )
+        streaks = {}
+        for row in db.session.execute(stmt):
+            streaks.setdefault(row.habit_id, []).append(
+                {"first": row.first, "last": row.last, "days": row.days}
+            )
+        
+        archived_ids = archive.habit_ids()
+        if habit_ids is not None:
+            archived_ids = set(archived_ids).intersection(habit_ids)
+        if archived_ids:
+            # Only habits stored in this database; with sharding the archive holds every shard's
+            archived_ids = db.session.execute(select(Habit.id).where(Habit.id.in_(archived_ids))).scalars().all()
+        for habit_id in archived_ids:
+            hot = db.session.execute(select(CheckIn.date).where(CheckIn.habit_id == habit_id)).scalars()
+            streaks[habit_id] = StreakRepository.segments_from_dates({*hot, *archive.dates(habit_id)})
+        return streaks
+    
+    @staticmethod
+    def segments_from_dates(dates) -> list[dict]:
+        """Group distinct dates into streak segments, oldest first."""
+        segments = []
+        for day in sorted(dates):
+            if segments and segments[-1]["last"] == day - timedelta(days=1):
+                segments[-1]["last"] = day
+                segments[-1]["days"] += 1
+            else:
+                segments.append({"first": day, "last": day, "days": 1})
+        return segments
+    
+    @staticmethod
+    def replace_for_habit(habit_id):
+        """
+        Stage a full recomputation of one habit's segments and counters.
+        Returns the number of segments written.
+        """
+        Streak.query.filter_by(habit_id=habit_id).delete(synchronize_session=False)
+        segments = StreakRepository.compute(habit_id)
+        db.session.add_all(Streak(habit_id=habit_id, **segment) for segment in segments)
+        StreakRepository.refresh_summary(habit_id)
+        return len(segments)
+    
+    @staticmethod
+    def rebuild(habit_id=None):
+        """
+        Recompute the streak index from check-ins, for one habit or all of them.
+        All habits are recomputed with a single partitioned query.
+        Returns the number of segments written.
+        """
+        try:
+            if habit_id is not None:
+                written = StreakRepository.replace_for_habit(habit_id)
+            else:
+                Streak.query.delete(synchronize_session=False)
+                computed = StreakRepository.compute_many()
+                db.session.add_all(
+                    Streak(habit_id=current_id, **segment)
+                    for current_id, segments in computed.items()
+                    for segment in segments
+                )
+                StreakRepository.refresh_summary()
+                written = sum(len(segments) for segments in computed.values())
+            db.session.commit()
+            return written
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
@@ -1,2 +1,3 @@
 from app.schemas.habit_schema import HabitSchema
-from app.schemas.check_in_schema import CheckInSchema
\ No newline at end of file
+from app.schemas.check_in_schema import CheckInSchema
+from app.schemas.stats_schema import HeatmapQuerySchema, PeriodStatsQuerySchema, RollingStatsQuerySchema
\ No newline at end of file
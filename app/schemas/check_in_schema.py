@@ -1,6 +1,8 @@
-from marshmallow import Schema, fields, validate, validates, ValidationError
+from marshmallow import Schema, fields, post_load, validate, validates, validates_schema, ValidationError
 from datetime import datetime
 
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
 class CheckInSchema(Schema):
     """Schema for validating and serializing check-in data."""
     
@@ -20,9 +22,54 @@ class CheckInSchema(Schema):
             raise ValidationError('Check-in date cannot be in the future.')
         return date
 
+class CheckInQuerySchema(Schema):
+    """Schema for validating check-in listing query parameters."""
+    
+    date_from = fields.Date(data_key='from', load_default=None)
+    date_to = fields.Date(data_key='to', load_default=None)
+    limit = fields.Integer(load_default=DEFAULT_PAGE_SIZE, validate=validate.Range(min=1, max=MAX_PAGE_SIZE))
+    cursor = fields.String(load_default=None)
+    
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        """Validate that the date range is not inverted."""
+        if data['date_from'] and data['date_to'] and data['date_from'] > data['date_to']:
+            raise ValidationError("'from' must not be after 'to'.", 'from')
+
 class StreakSchema(Schema):
     """Schema for serializing streak data."""
     
     first = fields.Date(required=True)
     last = fields.Date(required=True)
-    days = fields.Integer(required=True)
\ No newline at end of file
+    days = fields.Integer(required=True)
+
+class BatchStreakQuerySchema(Schema):
+    """Schema for validating the habit IDs of a batch streak request."""
+    
+    ids = fields.String(load_default=None)
+    
+    @validates('ids')
+    def validate_ids(self, value):
+        """Validate that IDs are a comma-separated list of at most MAX_PAGE_SIZE integers."""
+        if value is None:
+            return
+        parts = [part.strip() for part in value.split(',') if part.strip()]
+        if not parts or not all(part.isascii() and part.isdigit() for part in parts):
+            raise ValidationError('Must be a comma-separated list of habit IDs.')
+        if len(parts) > MAX_PAGE_SIZE:
+            raise ValidationError(f'At most {MAX_PAGE_SIZE} habit IDs can be requested at once.')
+    
+    @post_load
+    def split_ids(self, data, **kwargs):
+        """Turn the comma-separated IDs into a list of integers."""
+        if data['ids'] is not None:
+            data['ids'] = sorted({int(part) for part in data['ids'].split(',') if part.strip()})
+        return data
+
+class StreakSummarySchema(Schema):
+    """Schema for serializing a habit's precomputed streak counters."""
+    
+    habit_id = fields.Integer(attribute='id')
+    current_streak = fields.Integer()
+    longest_streak = fields.Integer()
+    last_check_in = fields.Date(attribute='latest_streak_last', allow_none=True)
\ No newline at end of file
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields, validate, ValidationError
+from marshmallow import Schema, fields, post_load, validate, validates, ValidationError
+
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 class HabitSchema(Schema):
     """Schema for validating and serializing habit data."""
@@ -8,6 +10,8 @@ class HabitSchema(Schema):
     description = fields.String(allow_none=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
+    current_streak = fields.Integer(dump_only=True)
+    longest_streak = fields.Integer(dump_only=True)
     
     # Nested fields
     check_ins = fields.List(fields.Nested('CheckInSchema', exclude=('habit',)), dump_only=True)
@@ -16,4 +20,44 @@ class HabitSchema(Schema):
         """Validate that habit name is not empty."""
         if not name.strip():
             raise ValidationError('Habit name cannot be empty.')
-        return name
\ No newline at end of file
+        return name
+
+class HabitQuerySchema(Schema):
+    """Schema for validating habit listing query parameters."""
+    
+    SELECTABLE_FIELDS = (
+        'id', 'name', 'description', 'created_at', 'updated_at', 'current_streak', 'longest_streak'
+    )
+    INCLUDABLE_RELATIONS = ('check_ins',)
+    
+    limit = fields.Integer(load_default=DEFAULT_PAGE_SIZE, validate=validate.Range(min=1, max=MAX_PAGE_SIZE))
+    cursor = fields.String(load_default=None)
+    field_names = fields.String(data_key='fields', load_default=None)
+    include = fields.String(load_default=None)
+    
+    @validates('field_names')
+    def validate_field_names(self, value):
+        """Validate that only known habit fields are requested."""
+        unknown = set(_split(value)) - set(self.SELECTABLE_FIELDS)
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    
+    @validates('include')
+    def validate_include(self, value):
+        """Validate that only known relationships are included."""
+        unknown = set(_split(value)) - set(self.INCLUDABLE_RELATIONS)
+        if unknown:
+            raise ValidationError(f"Unknown relationships: {', '.join(sorted(unknown))}.")
+    
+    @post_load
+    def split_lists(self, data, **kwargs):
+        """Turn the comma-separated parameters into tuples."""
+        data['field_names'] = tuple(sorted(set(_split(data['field_names'])))) or None
+        data['include'] = tuple(_split(data['include']))
+        return data
+
+def _split(value):
+    """Split a comma-separated query parameter, ignoring blanks."""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from marshmallow import Schema, fields, validate
+
+class RollingStatsQuerySchema(Schema):
+    """Schema for validating rolling completion rate query parameters."""
+    
+    window = fields.Integer(load_default=7, validate=validate.Range(min=1, max=365))
+    days = fields.Integer(load_default=90, validate=validate.Range(min=1, max=3660))
+
+class HeatmapQuerySchema(Schema):
+    """Schema for validating heatmap query parameters."""
+    
+    year = fields.Integer(load_default=None, validate=validate.Range(min=1970, max=9999))
+
+class PeriodStatsQuerySchema(Schema):
+    """Schema for validating weekly/monthly aggregate query parameters."""
+    
+    period = fields.String(load_default='week', validate=validate.OneOf(['week', 'month']))
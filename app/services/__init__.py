@@ -1,2 +1,5 @@
 from app.services.habit_service import HabitService
-from app.services.check_in_service import CheckInService
\ No newline at end of file
+from app.services.check_in_service import CheckInService
+from app.services.stats_service import StatsService
+from app.services.async_habit_service import AsyncHabitService
+from app.services.async_check_in_service import AsyncCheckInService
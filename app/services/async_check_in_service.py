@@ -0,0 +1,94 @@
+from datetime import date
+from typing import Any, Dict, Tuple
+
+from marshmallow import ValidationError
+
+from app import cache
+from app.repositories.async_check_in_repository import AsyncCheckInRepository
+from app.repositories.async_habit_repository import AsyncHabitRepository
+from app.services.cache_keys import check_ins_page_key, streak_summary_key, streaks_key
+from app.services.check_in_service import CheckInService
+
+class AsyncCheckInService(CheckInService):
+    """
+    Check-in and streak reads for the async deployment mode.
+
+    Validation, serialization and caching come from CheckInService; only the
+    database access is awaited, on the AsyncSession of the current request.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the service with the async repositories."""
+        super().__init__()
+        self.async_repository = AsyncCheckInRepository()
+        self.async_habit_repository = AsyncHabitRepository()
+
+    async def get_check_ins_by_habit(self, session, habit_id: int, params: Dict[str, Any]) -> Tuple[dict, int]:
+        """Get one page of check-ins for a habit; see CheckInService.get_check_ins_by_habit."""
+        query, error = self.load_page_query(params)
+        if error:
+            return error, 400
+
+        cached = cache.get(check_ins_page_key(habit_id, query))
+        if cached is not None:
+            return cached, 200
+
+        check_ins = await self.async_repository.get_page(
+            session, habit_id, query['limit'],
+            date_from=query['date_from'], date_to=query['date_to'], after=query['after']
+        )
+        if not check_ins and not await self.async_habit_repository.exists(session, habit_id):
+            return {'error': 'Habit not found'}, 404
+        return self.page_result(habit_id, query, check_ins), 200
+
+    async def get_streaks(self, session, habit_id: int) -> Tuple[list[dict], int]:
+        """Get streaks for a habit, served from the cache when possible."""
+        cached = cache.get(streaks_key(habit_id))
+        if cached is not None:
+            return cached, 200
+
+        streaks = await self.async_repository.get_streaks(session, habit_id)
+        if not streaks and not await self.async_habit_repository.exists(session, habit_id):
+            return {'error': 'Habit not found'}, 404
+        result = self.streak_schema.dump(streaks, many=True)
+        cache.set(streaks_key(habit_id), result)
+        return result, 200
+
+    async def get_streaks_for_habits(self, session, params: Dict[str, Any]) -> Tuple[list[dict], int]:
+        """Get streaks for the habits listed in `ids`, or for every habit, in one query."""
+        try:
+            query = self.batch_streak_query_schema.load(params)
+        except ValidationError as e:
+            return {'errors': e.messages}, 400
+
+        streaks = await self.async_repository.get_streaks_for_habits(session, query['ids'])
+        return [
+            {'habit_id': habit_id, 'streaks': self.streak_schema.dump(habit_streaks, many=True)}
+            for habit_id, habit_streaks in streaks.items()
+        ], 200
+
+    async def get_day(self, session, habit_id: int, day: str) -> Tuple[dict, int]:
+        """Check whether a habit has a check-in on the given day."""
+        try:
+            parsed = date.fromisoformat(day)
+        except ValueError:
+            return {'error': 'Invalid date format. Use YYYY-MM-DD.'}, 400
+
+        bitmap = await self.async_repository.get_bitmap(session, habit_id)
+        if not bitmap and not await self.async_habit_repository.exists(session, habit_id):
+            return {'error': 'Habit not found'}, 404
+        return {'date': parsed.isoformat(), 'checked_in': bitmap.contains(parsed)}, 200
+
+    async def get_streak_summary(self, session, habit_id: int) -> Tuple[dict, int]:
+        """Get the current and longest streak for a habit, served from the cache when possible."""
+        cached = cache.get(streak_summary_key(habit_id))
+        if cached is not None:
+            return cached, 200
+
+        habit = await self.async_habit_repository.get_by_id(session, habit_id)
+        if not habit:
+            return {'error': 'Habit not found'}, 404
+
+        result = self.streak_summary_schema.dump(habit)
+        cache.set(streak_summary_key(habit_id), result)
+        return result, 200
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from app import cache
+from app.repositories.async_habit_repository import AsyncHabitRepository
+from app.services.cache_keys import habit_key, habit_version_key
+from app.services.habit_service import HabitService
+
+class AsyncHabitService(HabitService):
+    """
+    Habit reads for the async deployment mode.
+    
+    Validation, serialization and caching come from HabitService; only the
+    database access is awaited, on the AsyncSession of the current request.
+    """
+    
+    def __init__(self):
+        """Initialize the service with the async repository."""
+        super().__init__()
+        self.async_repository = AsyncHabitRepository()
+    
+    async def get_all_habits(self, session, params):
+        """Get one page of habits; see HabitService.get_all_habits."""
+        query, error = self.load_list_query(params)
+        if error:
+            return error, 400
+        
+        habits = await self.async_repository.get_page(
+            session,
+            query['limit'],
+            after_id=query['after_id'],
+            field_names=query['field_names'],
+            include_check_ins=query['include_check_ins']
+        )
+        return self.list_result(query, habits), 200
+    
+    async def get_version(self, session, habit_id):
+        """Get the last modification time of a habit, or None if it does not exist."""
+        cached = cache.get(habit_version_key(habit_id))
+        if cached is not None:
+            return datetime.fromisoformat(cached)
+        
+        version = await self.async_repository.get_version(session, habit_id)
+        if version:
+            cache.set(habit_version_key(habit_id), version.isoformat())
+        return version
+    
+    async def get_collection_version(self, session):
+        """Get the values that change whenever any habit is created, changed or deleted."""
+        return await self.async_repository.get_collection_version(session)
+    
+    async def get_habit_by_id(self, session, habit_id):
+        """Get a habit by ID, served from the cache when possible."""
+        cached = cache.get(habit_key(habit_id))
+        if cached is not None:
+            return cached
+        
+        habit = await self.async_repository.get_detail(session, habit_id)
+        if not habit:
+            return None
+        result = self.dump_detail(habit)
+        cache.set(habit_key(habit_id), result)
+        return result
@@ -0,0 +1,44 @@
+from app import cache
+from app.utils.dates import utc_today
+
+# Serialized habits carry current_streak, which depends on the date, so their
+# keys are per day: entries cached on an earlier day are never read again.
+
+def habit_key(habit_id):
+    """Key of a single serialized habit, as of today."""
+    return f'habit:{habit_id}:{utc_today()}'
+
+def habit_version_key(habit_id):
+    """Key of a habit's last modification time, used for conditional requests."""
+    return f'habit:{habit_id}:version'
+
+def streaks_key(habit_id):
+    """Key of a habit's serialized streak list."""
+    return f'habit:{habit_id}:streaks'
+
+def streak_summary_key(habit_id):
+    """Key of a habit's serialized streak summary, as of today."""
+    return f'habit:{habit_id}:streaks:summary:{utc_today()}'
+
+def check_ins_tag(habit_id):
+    """Tag grouping every cached page of a habit's check-ins."""
+    return f'habit:{habit_id}:check_ins'
+
+def check_ins_page_key(habit_id, query):
+    """Key of one page of a habit's check-ins for the given listing parameters, as of today."""
+    # Each check-in embeds its habit
+    return (
+        f"{check_ins_tag(habit_id)}:{utc_today()}:{query['date_from']}:{query['date_to']}"
+        f":{query['limit']}:{query['cursor']}"
+    )
+
+def invalidate_check_in_reads(habit_id):
+    """Drop every cached read that depends on a habit's check-ins."""
+    # The habit itself carries the streak counters, so it goes too
+    cache.delete(
+        habit_key(habit_id),
+        habit_version_key(habit_id),
+        streaks_key(habit_id),
+        streak_summary_key(habit_id)
+    )
+    cache.invalidate_tag(check_ins_tag(habit_id))
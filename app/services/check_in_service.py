@@ -1,8 +1,22 @@
+from app import cache, events
 from app.repositories.check_in_repository import CheckInRepository
 from app.repositories.habit_repository import HabitRepository
-from app.schemas.check_in_schema import CheckInSchema, StreakSchema
+from app.schemas.check_in_schema import (
+    BatchStreakQuerySchema, CheckInSchema, CheckInQuerySchema, StreakSchema, StreakSummarySchema
+)
+from app.services.write_behind import check_in_writer
+from app.services.cache_keys import (
+    check_ins_page_key, check_ins_tag, invalidate_check_in_reads, streak_summary_key, streaks_key
+)
+from app.utils.db import is_foreign_key_violation
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.replicas import served_by_replica
+from app.utils.serializers import compile_many_dumper
 
-from typing import Any, Dict, Tuple
+from datetime import date, datetime
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, List, Tuple
 
 class CheckInService:
     """Service for check-in business logic."""
@@ -12,23 +26,69 @@ class CheckInService:
         self.repository = CheckInRepository()
         self.habit_repository = HabitRepository()
         self.schema = CheckInSchema()
+        self.bulk_schema = CheckInSchema(many=True)
+        self.dump_many = compile_many_dumper(self.schema)
+        self.query_schema = CheckInQuerySchema()
         self.streak_schema = StreakSchema()
+        self.streak_summary_schema = StreakSummarySchema()
+        self.batch_streak_query_schema = BatchStreakQuerySchema()
 
-    def get_check_ins_by_habit(self, habit_id: int) -> Tuple[list[dict], int]:
-        """Get all check-ins for a habit."""
-        habit = self.habit_repository.get_by_id(habit_id)
-        if not habit:
-            return {'error': 'Habit not found'}, 404
+    def get_check_ins_by_habit(self, habit_id: int, params: Dict[str, Any]) -> Tuple[dict, int]:
+        """
+        Get one page of check-ins for a habit, optionally restricted to a date range.
+        Returns the page items and the cursor of the next page, if any.
+        """
+        query, error = self.load_page_query(params)
+        if error:
+            return error, 400
 
-        check_ins = self.repository.get_by_habit_id(habit_id)
-        return self.schema.dump(check_ins, many=True), 200
+        cached = cache.get(check_ins_page_key(habit_id, query))
+        if cached is not None:
+            return cached, 200
 
-    def create_check_in(self, habit_id: int, check_in_data: Dict[str, Any]) -> Tuple[dict, int]:
-        """Create a new check-in for a habit."""
-        habit = self.habit_repository.get_by_id(habit_id)
-        if not habit:
+        check_ins = self.repository.get_page(
+            habit_id, query['limit'], date_from=query['date_from'], date_to=query['date_to'], after=query['after']
+        )
+        # An empty page is the only case where the habit might not exist
+        if not check_ins and not self.habit_repository.exists(habit_id):
             return {'error': 'Habit not found'}, 404
+        return self.page_result(habit_id, query, check_ins), 200
+
+    def load_page_query(self, params: Dict[str, Any]) -> Tuple[Any, Any]:
+        """
+        Validate check-in listing parameters and decode the cursor into `after`.
+        Returns the query and None, or None and an error payload.
+        """
+        try:
+            query = self.query_schema.load(params)
+        except ValidationError as e:
+            return None, {'errors': e.messages}
+
+        query['after'] = None
+        if query['cursor']:
+            try:
+                values = decode_cursor(query['cursor'])
+                query['after'] = (date.fromisoformat(values['date']), int(values['id']))
+            except (KeyError, TypeError, ValueError):
+                return None, {'error': 'Invalid cursor'}
+        return query, None
+
+    def page_result(self, habit_id: int, query: Dict[str, Any], check_ins: list) -> dict:
+        """Serialize and cache a fetched page of check-ins, with the cursor of the next page if any."""
+        limit = query['limit']
+        next_cursor = None
+        if len(check_ins) > limit:
+            check_ins = check_ins[:limit]
+            last = check_ins[-1]
+            next_cursor = encode_cursor({'date': last.date.isoformat(), 'id': last.id})
 
+        result = {'items': self.dump_many(check_ins), 'next_cursor': next_cursor}
+        if not served_by_replica():
+            cache.set(check_ins_page_key(habit_id, query), result, tags=(check_ins_tag(habit_id),))
+        return result
+
+    def create_check_in(self, habit_id: int, check_in_data: Dict[str, Any]) -> Tuple[dict, int]:
+        """Create a new check-in for a habit. A missing habit is reported by the FK constraint."""
         check_in_data['habit_id'] = habit_id
 
         errors = self.schema.validate(check_in_data)
@@ -42,32 +102,155 @@ class CheckInService:
             except ValueError:
                 return {'error': 'Invalid date format. Use YYYY-MM-DD.'}, 400
 
+        if check_in_writer.enabled:
+            check_in_data.setdefault('date', datetime.utcnow().date())
+            ticket = check_in_writer.submit(habit_id, check_in_data)
+            # A full queue falls back to writing synchronously
+            if ticket is not None:
+                return check_in_writer.get_status(ticket), 202
+
         try:
             check_in = self.repository.create(check_in_data)
-            return self.schema.dump(check_in), 201
+            if check_in is None:
+                return {'error': 'Check-in already exists for this date'}, 409
+            invalidate_check_in_reads(habit_id)
+            result = self.schema.dump(check_in)
+            events.publish('check_in.created', result)
+            return result, 201
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                return {'error': 'Habit not found'}, 404
+            return {'error': str(e)}, 500
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    def get_queued_check_in(self, habit_id: int, ticket: str) -> Tuple[dict, int]:
+        """Get the outcome of a check-in accepted by the write-behind queue."""
+        status = check_in_writer.get_status(ticket) if check_in_writer.enabled else None
+        if not status or status['habit_id'] != habit_id:
+            return {'error': 'Ticket not found'}, 404
+        return status, 200
+
+    def bulk_create_check_ins(self, habit_id: int, rows: List[Any]) -> Tuple[dict, int]:
+        """Create many check-ins for a habit, reporting a status for every row."""
+        for row in rows:
+            if isinstance(row, dict):
+                row['habit_id'] = habit_id
+
+        try:
+            loaded, errors = self.bulk_schema.load(rows), {}
+        except ValidationError as e:
+            loaded, errors = e.valid_data, e.messages
+
+        results = []
+        pending = []
+        seen_dates = set()
+        for index, row in enumerate(loaded):
+            if index in errors:
+                results.append({'index': index, 'status': 'error', 'errors': errors[index]})
+                continue
+            if 'date' not in row:
+                row['date'] = datetime.utcnow().date()
+            result = {'index': index, 'date': row['date'].isoformat()}
+            if row['date'] in seen_dates:
+                result['status'] = 'duplicate'
+            else:
+                seen_dates.add(row['date'])
+                pending.append((row, result))
+            results.append(result)
+
+        try:
+            inserted = self.repository.bulk_create(habit_id, [row for row, _ in pending])
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                return {'error': 'Habit not found'}, 404
+            return {'error': str(e)}, 500
         except Exception as e:
             return {'error': str(e)}, 500
+        if inserted:
+            invalidate_check_in_reads(habit_id)
+            # One event per import rather than per row, however large it is
+            events.publish('check_ins.imported', {'habit_id': habit_id, 'created': len(inserted)})
+        elif not self.habit_repository.exists(habit_id):
+            return {'error': 'Habit not found'}, 404
 
-    def delete_check_in(self, check_in_id: int) -> Tuple[dict, int]:
-        """Delete a check-in."""
-        check_in = self.repository.get_by_id(check_in_id)
-        if not check_in:
-            return {'error': 'Check-in not found'}, 404
+        for row, result in pending:
+            if row['date'] in inserted:
+                result.update(status='created', id=inserted[row['date']])
+            else:
+                result['status'] = 'duplicate'
+
+        summary = {status: 0 for status in ('created', 'duplicate', 'error')}
+        for result in results:
+            summary[result['status']] += 1
+        return {**summary, 'results': results}, 200
 
+    def delete_check_in(self, habit_id: int, check_in_id: int) -> Tuple[dict, int]:
+        """Delete one of a habit's check-ins."""
         try:
-            success = self.repository.delete(check_in_id)
+            success = self.repository.delete(habit_id, check_in_id)
             if success:
+                invalidate_check_in_reads(habit_id)
+                events.publish('check_in.deleted', {'id': check_in_id, 'habit_id': habit_id})
                 return {'message': 'Check-in deleted successfully'}, 200
             else:
-                return {'error': 'Failed to delete check-in'}, 500
+                return {'error': 'Check-in not found'}, 404
         except Exception as e:
             return {'error': str(e)}, 500
 
     def get_streaks(self, habit_id: int) -> Tuple[list[dict], int]:
-        """Get streaks for a habit."""
+        """Get streaks for a habit, served from the cache when possible."""
+        cached = cache.get(streaks_key(habit_id))
+        if cached is not None:
+            return cached, 200
+
+        streaks = self.repository.get_streaks(habit_id)
+        if not streaks and not self.habit_repository.exists(habit_id):
+            return {'error': 'Habit not found'}, 404
+        result = self.streak_schema.dump(streaks, many=True)
+        if not served_by_replica():
+            cache.set(streaks_key(habit_id), result)
+        return result, 200
+
+    def get_streaks_for_habits(self, params: Dict[str, Any]) -> Tuple[list[dict], int]:
+        """
+        Get streaks for the habits listed in `ids`, or for every habit, in one query.
+        Unknown habit IDs are left out of the result.
+        """
+        try:
+            query = self.batch_streak_query_schema.load(params)
+        except ValidationError as e:
+            return {'errors': e.messages}, 400
+
+        streaks = self.repository.get_streaks_for_habits(query['ids'])
+        return [
+            {'habit_id': habit_id, 'streaks': self.streak_schema.dump(habit_streaks, many=True)}
+            for habit_id, habit_streaks in streaks.items()
+        ], 200
+
+    def get_day(self, habit_id: int, day: str) -> Tuple[dict, int]:
+        """Check whether a habit has a check-in on the given day."""
+        try:
+            parsed = date.fromisoformat(day)
+        except ValueError:
+            return {'error': 'Invalid date format. Use YYYY-MM-DD.'}, 400
+
+        bitmap = self.repository.get_bitmap(habit_id)
+        if not bitmap and not self.habit_repository.exists(habit_id):
+            return {'error': 'Habit not found'}, 404
+        return {'date': parsed.isoformat(), 'checked_in': bitmap.contains(parsed)}, 200
+
+    def get_streak_summary(self, habit_id: int) -> Tuple[dict, int]:
+        """Get the current and longest streak for a habit, served from the cache when possible."""
+        cached = cache.get(streak_summary_key(habit_id))
+        if cached is not None:
+            return cached, 200
+
         habit = self.habit_repository.get_by_id(habit_id)
         if not habit:
             return {'error': 'Habit not found'}, 404
 
-        streaks = self.repository.get_streaks(habit_id)
-        return self.streak_schema.dump(streaks, many=True), 200
\ No newline at end of file
+        result = self.streak_summary_schema.dump(habit)
+        if not served_by_replica():
+            cache.set(streak_summary_key(habit_id), result)
+        return result, 200
\ No newline at end of file
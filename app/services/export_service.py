@@ -0,0 +1,92 @@
+import csv
+import io
+
+from app.repositories.habit_repository import HabitRepository
+from app.utils.json_provider import dumps
+
+class ExportService:
+    """Service for exporting the full habit and check-in history."""
+    
+    FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    
+    CSV_COLUMNS = (
+        'habit_id', 'habit_name', 'habit_description', 'habit_created_at', 'habit_updated_at',
+        'check_in_id', 'check_in_date', 'check_in_notes', 'check_in_created_at'
+    )
+    
+    def __init__(self):
+        """Initialize the service with repositories."""
+        self.repository = HabitRepository()
+    
+    def export_history(self, export_format, batch_size=1000):
+        """
+        Export all habits and check-ins in the requested format.
+        Returns a generator of text chunks and its mimetype, or an error payload.
+        """
+        if export_format not in self.FORMATS:
+            return {'error': f"Unsupported format. Use one of: {', '.join(self.FORMATS)}."}, 400
+        
+        rows = self.repository.iter_history(batch_size)
+        generate = self.generate_ndjson if export_format == 'ndjson' else self.generate_csv
+        return (generate(rows, batch_size), self.FORMATS[export_format]), 200
+    
+    def generate_ndjson(self, rows, batch_size):
+        """Yield one JSON line per habit, each followed by one line per check-in."""
+        lines = []
+        habit_id = None
+        for row in rows:
+            if row.id != habit_id:
+                habit_id = row.id
+                lines.append(dumps({
+                    'type': 'habit',
+                    'id': row.id,
+                    'name': row.name,
+                    'description': row.description,
+                    'created_at': _isoformat(row.created_at),
+                    'updated_at': _isoformat(row.updated_at)
+                }))
+            if row.check_in_id is not None:
+                lines.append(dumps({
+                    'type': 'check_in',
+                    'id': row.check_in_id,
+                    'habit_id': row.id,
+                    'date': _isoformat(row.check_in_date),
+                    'notes': row.check_in_notes,
+                    'created_at': _isoformat(row.check_in_created_at)
+                }))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+    
+    def generate_csv(self, rows, batch_size):
+        """Yield a header and one CSV record per check-in (or per habit without check-ins)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.CSV_COLUMNS)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([
+                row.id,
+                row.name,
+                row.description,
+                _isoformat(row.created_at),
+                _isoformat(row.updated_at),
+                row.check_in_id,
+                _isoformat(row.check_in_date),
+                row.check_in_notes,
+                _isoformat(row.check_in_created_at)
+            ])
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+def _isoformat(value):
+    """Format a date or datetime, passing None through."""
+    return value.isoformat() if value is not None else None
@@ -1,5 +1,15 @@
+from datetime import datetime
+from marshmallow import ValidationError
+
+from app import cache, events
+from app.repositories.check_in_repository import CheckInRepository
 from app.repositories.habit_repository import HabitRepository
-from app.schemas.habit_schema import HabitSchema
+from app.schemas.check_in_schema import CheckInSchema
+from app.schemas.habit_schema import HabitSchema, HabitQuerySchema
+from app.services.cache_keys import habit_key, habit_version_key, invalidate_check_in_reads
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.replicas import served_by_replica
+from app.utils.serializers import compile_dumper, compile_many_dumper
 
 class HabitService:
     """Service for habit business logic."""
@@ -8,18 +18,122 @@ class HabitService:
         """Initialize the service with repositories and schemas."""
         self.repository = HabitRepository()
         self.schema = HabitSchema()
+        self.query_schema = HabitQuerySchema()
+        self.dump = compile_dumper(self.schema)
+        self.dump_check_in = compile_dumper(CheckInSchema(exclude=('habit',)))
+        self.list_dumpers = {}
+    
+    def get_all_habits(self, params):
+        """
+        Get one page of habits, optionally projected to a subset of fields
+        and with their check-ins included.
+        Returns the page items and the cursor of the next page, if any.
+        """
+        query, error = self.load_list_query(params)
+        if error:
+            return error, 400
+        
+        habits = self.repository.get_page(
+            query['limit'],
+            after_id=query['after_id'],
+            field_names=query['field_names'],
+            include_check_ins=query['include_check_ins']
+        )
+        return self.list_result(query, habits), 200
+    
+    def load_list_query(self, params):
+        """
+        Validate listing parameters and decode the cursor into `after_id`.
+        Returns the query and None, or None and an error payload.
+        """
+        try:
+            query = self.query_schema.load(params)
+        except ValidationError as e:
+            return None, {'errors': e.messages}
+        
+        query['after_id'] = None
+        if query['cursor']:
+            try:
+                query['after_id'] = int(decode_cursor(query['cursor'])['id'])
+            except (KeyError, TypeError, ValueError):
+                return None, {'error': 'Invalid cursor'}
+        query['include_check_ins'] = 'check_ins' in query['include']
+        return query, None
+    
+    def list_result(self, query, habits):
+        """Serialize a fetched page of habits, with the cursor of the next page if there is one."""
+        limit = query['limit']
+        next_cursor = None
+        if len(habits) > limit:
+            habits = habits[:limit]
+            next_cursor = encode_cursor({'id': habits[-1].id})
+        
+        dump_many = self.get_list_dumper(query['field_names'], query['include_check_ins'])
+        items = dump_many(habits)
+        if query['include_check_ins']:
+            for habit, item in zip(habits, items):
+                self.add_archived_check_ins(habit.id, item)
+        return {'items': items, 'next_cursor': next_cursor}
+    
+    def dump_detail(self, habit):
+        """Serialize a habit with all of its check-ins, archived ones included."""
+        return self.add_archived_check_ins(habit.id, self.dump(habit))
     
-    def get_all_habits(self):
-        """Get all habits."""
-        habits = self.repository.get_all()
-        return self.schema.dump(habits, many=True)
+    def add_archived_check_ins(self, habit_id, result):
+        """
+        Add a habit's archived check-ins to its serialized `check_ins`, which the
+        relationship only loads from the table. Archived ones come first, oldest first.
+        """
+        archived = CheckInRepository.get_archived(habit_id)
+        if archived:
+            ids = {item['id'] for item in result['check_ins']}
+            result['check_ins'] = [
+                self.dump_check_in(check_in) for check_in in reversed(archived) if check_in.id not in ids
+            ] + result['check_ins']
+        return result
+    
+    def get_version(self, habit_id):
+        """
+        Get the last modification time of a habit, or None if it does not exist.
+        Check-in writes also touch the habit, so this versions its check-ins too.
+        """
+        cached = cache.get(habit_version_key(habit_id))
+        if cached is not None:
+            return datetime.fromisoformat(cached)
+        
+        version = self.repository.get_version(habit_id)
+        # Replicas may lag the primary, so only what the primary returned is cached
+        if version and not served_by_replica():
+            cache.set(habit_version_key(habit_id), version.isoformat())
+        return version
+    
+    def get_collection_version(self):
+        """Get the values that change whenever any habit is created, changed or deleted."""
+        return self.repository.get_collection_version()
+    
+    def get_list_dumper(self, field_names, include_check_ins):
+        """Get a compiled list dumper restricted to the requested fields and relationships."""
+        key = (field_names, include_check_ins)
+        if key not in self.list_dumpers:
+            only = field_names or HabitQuerySchema.SELECTABLE_FIELDS
+            if include_check_ins:
+                only = (*only, 'check_ins')
+            self.list_dumpers[key] = compile_many_dumper(HabitSchema(only=only))
+        return self.list_dumpers[key]
     
     def get_habit_by_id(self, habit_id):
-        """Get a habit by ID."""
-        habit = self.repository.get_by_id(habit_id)
+        """Get a habit by ID, served from the cache when possible."""
+        cached = cache.get(habit_key(habit_id))
+        if cached is not None:
+            return cached
+        
+        habit = self.repository.get_detail(habit_id)
         if not habit:
             return None
-        return self.schema.dump(habit)
+        result = self.dump_detail(habit)
+        if not served_by_replica():
+            cache.set(habit_key(habit_id), result)
+        return result
     
     def create_habit(self, habit_data):
         """Create a new habit."""
@@ -31,7 +145,9 @@ class HabitService:
         # Create habit
         try:
             habit = self.repository.create(habit_data)
-            return self.schema.dump(habit), 201
+            result = self.schema.dump(habit)
+            events.publish('habit.created', result)
+            return result, 201
         except Exception as e:
             return {'error': str(e)}, 500
     
@@ -50,7 +166,11 @@ class HabitService:
         # Update habit
         try:
             updated_habit = self.repository.update(habit_id, habit_data)
-            return self.schema.dump(updated_habit), 200
+            # Cached check-in pages embed the habit, so they go along with it
+            invalidate_check_in_reads(habit_id)
+            result = self.dump_detail(updated_habit)
+            events.publish('habit.updated', result)
+            return result, 200
         except Exception as e:
             return {'error': str(e)}, 500
     
@@ -65,6 +185,8 @@ class HabitService:
         try:
             success = self.repository.delete(habit_id)
             if success:
+                invalidate_check_in_reads(habit_id)
+                events.publish('habit.deleted', {'id': habit_id})
                 return {'message': 'Habit deleted successfully'}, 200
             else:
                 return {'error': 'Failed to delete habit'}, 500
@@ -0,0 +1,113 @@
+from app import cache
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.habit_repository import HabitRepository
+from app.schemas.stats_schema import HeatmapQuerySchema, PeriodStatsQuerySchema, RollingStatsQuerySchema
+from app.services.cache_keys import check_ins_tag
+from app.utils import analytics
+from app.utils.dates import utc_today
+from app.utils.replicas import served_by_replica
+
+from datetime import date
+from marshmallow import ValidationError
+from typing import Any, Dict, Tuple
+
+class StatsService:
+    """Service for habit analytics computed over the day ordinals of a habit's bitmap."""
+
+    def __init__(self) -> None:
+        """Initialize the service with repositories and schemas."""
+        self.repository = CheckInRepository()
+        self.habit_repository = HabitRepository()
+        self.rolling_query_schema = RollingStatsQuerySchema()
+        self.heatmap_query_schema = HeatmapQuerySchema()
+        self.period_query_schema = PeriodStatsQuerySchema()
+
+    def get_summary(self, habit_id: int) -> Tuple[dict, int]:
+        """Get totals, completion rate, streak statistics and the weekday distribution."""
+        return self._cached(habit_id, 'summary', {}, lambda ordinals, today: {
+            **analytics.summary(ordinals, today),
+            'day_of_week': analytics.day_of_week_counts(ordinals)
+        })
+
+    def get_rolling_completion(self, habit_id: int, params: Dict[str, Any]) -> Tuple[dict, int]:
+        """Get the rolling completion rate for each of the last `days` days."""
+        try:
+            query = self.rolling_query_schema.load(params)
+        except ValidationError as e:
+            return {'errors': e.messages}, 400
+
+        def compute(ordinals, today):
+            start = today - query['days'] + 1
+            rates = analytics.rolling_completion(ordinals, start, today, query['window'])
+            return {
+                'window': query['window'],
+                'start': analytics.to_date(start).isoformat(),
+                'end': analytics.to_date(today).isoformat(),
+                'rates': [round(rate, 4) for rate in rates.tolist()]
+            }
+        return self._cached(habit_id, 'rolling', query, compute)
+
+    def get_heatmap(self, habit_id: int, params: Dict[str, Any]) -> Tuple[dict, int]:
+        """Get a one-bit-per-day bitmap of a calendar year."""
+        try:
+            query = self.heatmap_query_schema.load(params)
+        except ValidationError as e:
+            return {'errors': e.messages}, 400
+
+        def compute(ordinals, today):
+            year = query['year'] or analytics.to_date(today).year
+            start = date(year, 1, 1).toordinal()
+            end = date(year, 12, 31).toordinal()
+            return {
+                'year': year,
+                'start': analytics.to_date(start).isoformat(),
+                'days': end - start + 1,
+                'check_ins': int(((ordinals >= start) & (ordinals <= end)).sum()),
+                'bitmap': analytics.heatmap_bitmap(ordinals, start, end)
+            }
+        return self._cached(habit_id, 'heatmap', query, compute)
+
+    def get_period_aggregates(self, habit_id: int, params: Dict[str, Any]) -> Tuple[dict, int]:
+        """Get check-in counts and completion rates per week or month."""
+        try:
+            query = self.period_query_schema.load(params)
+        except ValidationError as e:
+            return {'errors': e.messages}, 400
+
+        def compute(ordinals, today):
+            starts, lengths, counts = analytics.period_counts(ordinals, query['period'])
+            return {
+                'period': query['period'],
+                'periods': [
+                    {
+                        'start': analytics.to_date(start).isoformat(),
+                        'days': length,
+                        'check_ins': count,
+                        'completion_rate': round(count / length, 4)
+                    }
+                    for start, length, count in zip(starts.tolist(), lengths.tolist(), counts.tolist())
+                ]
+            }
+        return self._cached(habit_id, 'periods', query, compute)
+
+    def _cached(self, habit_id, name, query, compute):
+        """
+        Run `compute(ordinals, today)` over the days set in the habit's bitmap, caching the
+        result until the habit's check-ins change.
+        """
+        today = utc_today().toordinal()
+        params = ':'.join(f'{key}={value}' for key, value in sorted(query.items()))
+        key = f'{check_ins_tag(habit_id)}:stats:{name}:{today}:{params}'
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, 200
+
+        bitmap = self.repository.get_bitmap(habit_id)
+        if not bitmap and not self.habit_repository.exists(habit_id):
+            return {'error': 'Habit not found'}, 404
+
+        ordinals = bitmap.to_ordinals()
+        result = compute(ordinals, today)
+        if not served_by_replica():
+            cache.set(key, result, tags=(check_ins_tag(habit_id),))
+        return result, 200
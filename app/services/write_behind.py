@@ -0,0 +1,225 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import events
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.habit_repository import HabitRepository
+from app.services.cache_keys import invalidate_check_in_reads
+from app.utils.cache import LRUCache, create_store
+from app.utils.db import is_foreign_key_violation
+from app.utils.shards import PartialShardWriteError
+
+logger = logging.getLogger(__name__)
+
+# Queue item telling the writer thread to write what it has and exit
+_STOP = object()
+
+class WriteBehindQueue:
+    """
+    Accepts validated check-ins and writes them from a background thread.
+
+    The writer takes whatever is queued within `interval` seconds (up to
+    `max_batch` check-ins) and inserts it in one transaction, so a burst of
+    check-ins shares a single commit, and one fsync on SQLite. The outcome of
+    every check-in is recorded under its ticket ('created', 'duplicate',
+    'not_found' or 'error') in `tickets`, a cache backend that is shared by
+    every worker when it is Redis, and passed to the registered listeners.
+
+    Durability: an accepted check-in lives only in this process's memory
+    until its batch commits, at most `interval` seconds plus the time to
+    write the batches ahead of it. Stopping the queue, which happens at
+    interpreter exit, writes everything still queued; a crash loses it.
+    """
+
+    def __init__(self, app, interval=0.005, max_batch=500, max_pending=10000, ticket_ttl=3600, tickets=None):
+        self.app = app
+        self.interval = interval
+        self.max_batch = max_batch
+        self.tickets = tickets or LRUCache(max_entries=max(max_pending * 10, 1000), default_ttl=ticket_ttl)
+        self.listeners = []
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, habit_id, row):
+        """
+        Queue a validated check-in. Returns its ticket, or None when the queue
+        is full and the caller should write synchronously instead.
+        """
+        self._ensure_started()
+        ticket = uuid.uuid4().hex
+        status = {'ticket': ticket, 'habit_id': habit_id, 'date': row['date'].isoformat(), 'status': 'pending'}
+        self.tickets.set(ticket, status)
+        try:
+            self._queue.put_nowait((ticket, habit_id, row))
+        except queue.Full:
+            self.tickets.delete(ticket)
+            return None
+        return ticket
+
+    def get_status(self, ticket):
+        """Get the recorded outcome of a ticket, or None if it is unknown or expired."""
+        return self.tickets.get(ticket)
+
+    def add_listener(self, listener):
+        """Call `listener(status)` from the writer thread whenever a queued check-in is resolved."""
+        self.listeners.append(listener)
+
+    def flush(self):
+        """Block until every check-in queued so far has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self):
+        """Write everything still queued and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        # Started on first use so that pre-forking servers start it in each worker
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='check-in-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch, stopping = self._collect()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    logger.exception('Write-behind batch of %d check-ins failed', len(batch))
+                    self._resolve([(ticket, {'status': 'error', 'error': 'Write failed'}) for ticket, _, _ in batch])
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            if stopping:
+                self._queue.task_done()
+                return
+
+    def _collect(self):
+        """Wait for a check-in, then gather more until the interval ends or the batch is full."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        """Insert a batch in one transaction and record the outcome of every check-in."""
+        with self.app.app_context():
+            existing = HabitRepository.existing_ids({habit_id for _, habit_id, _ in batch})
+            outcomes = []
+            queued = defaultdict(dict)
+            for ticket, habit_id, row in batch:
+                if habit_id not in existing:
+                    outcomes.append((ticket, {'status': 'not_found'}))
+                elif row['date'] in queued[habit_id]:
+                    outcomes.append((ticket, {'status': 'duplicate'}))
+                else:
+                    queued[habit_id][row['date']] = (ticket, row)
+
+            rows_by_habit = {
+                habit_id: [row for _, row in rows.values()] for habit_id, rows in queued.items() if rows
+            }
+            try:
+                inserted = CheckInRepository.bulk_create_many(rows_by_habit)
+            except SQLAlchemyError as e:
+                # A habit deleted since the existence check fails the whole batch (or
+                # its shard's part of it); write the habits not yet committed one by one
+                inserted = e.committed if isinstance(e, PartialShardWriteError) else {}
+                for habit_id, rows in rows_by_habit.items():
+                    if habit_id in inserted:
+                        continue
+                    try:
+                        inserted[habit_id] = CheckInRepository.bulk_create(habit_id, rows)
+                    except SQLAlchemyError as e:
+                        status = 'not_found' if is_foreign_key_violation(e) else 'error'
+                        outcomes += [(ticket, {'status': status}) for ticket, _ in queued[habit_id].values()]
+
+            for habit_id, habit_inserted in inserted.items():
+                for day, (ticket, row) in queued[habit_id].items():
+                    if day in habit_inserted:
+                        outcomes.append((ticket, {'status': 'created', 'id': habit_inserted[day]}))
+                        events.publish('check_in.created', {
+                            'id': habit_inserted[day], 'habit_id': habit_id,
+                            'date': day.isoformat(), 'notes': row.get('notes')
+                        })
+                    else:
+                        outcomes.append((ticket, {'status': 'duplicate'}))
+                if habit_inserted:
+                    invalidate_check_in_reads(habit_id)
+        self._resolve(outcomes)
+
+    def _resolve(self, outcomes):
+        for ticket, outcome in outcomes:
+            status = self.tickets.get(ticket)
+            if status is None:
+                continue
+            status = {**status, **outcome}
+            self.tickets.set(ticket, status)
+            for listener in self.listeners:
+                try:
+                    listener(status)
+                except Exception:
+                    logger.exception('Write-behind listener failed')
+
+class CheckInWriter:
+    """Flask extension giving access to the write-behind queue of the current app, if enabled."""
+
+    def init_app(self, app):
+        if not app.config.get('CHECK_IN_WRITE_BEHIND'):
+            return
+        max_pending = app.config.get('CHECK_IN_WRITE_BEHIND_MAX_PENDING', 10000)
+        writer = app.extensions['check_in_writer'] = WriteBehindQueue(
+            app,
+            interval=app.config.get('CHECK_IN_WRITE_BEHIND_INTERVAL_MS', 5) / 1000,
+            max_batch=app.config.get('CHECK_IN_WRITE_BEHIND_MAX_BATCH', 500),
+            max_pending=max_pending,
+            # Any worker may be asked for a ticket, so share them through Redis when it is configured
+            tickets=create_store(app.config, 'tickets', max(max_pending * 10, 1000), 3600)
+        )
+        atexit.register(writer.stop)
+
+    @property
+    def enabled(self):
+        return 'check_in_writer' in current_app.extensions
+
+    @property
+    def queue(self):
+        return current_app.extensions['check_in_writer']
+
+    def submit(self, habit_id, row):
+        return self.queue.submit(habit_id, row)
+
+    def get_status(self, ticket):
+        return self.queue.get_status(ticket)
+
+    def add_listener(self, listener):
+        self.queue.add_listener(listener)
+
+    def flush(self):
+        self.queue.flush()
+
+check_in_writer = CheckInWriter()
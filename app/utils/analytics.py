@@ -0,0 +1,106 @@
+import base64
+from datetime import date
+
+import numpy as np
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Ordinal of the NumPy datetime64 epoch, to convert day ordinals to datetime64[D]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def to_ordinals(dates):
+    """Convert dates to a sorted array of unique proleptic Gregorian day ordinals."""
+    ordinals = np.fromiter((day.toordinal() for day in dates), dtype=np.int64)
+    return np.unique(ordinals)
+
+def to_date(ordinal):
+    """Convert a day ordinal back to a date."""
+    return date.fromordinal(int(ordinal))
+
+def streak_runs(ordinals):
+    """
+    Split sorted day ordinals into runs of consecutive days.
+    Returns the first ordinal and the length of every run, oldest first.
+    """
+    if not ordinals.size:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(ordinals) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [ordinals.size]))
+    return ordinals[starts], ends - starts
+
+def summary(ordinals, today):
+    """Totals, completion rate and streak statistics since the first check-in."""
+    if not ordinals.size:
+        return {
+            'total_check_ins': 0,
+            'first_check_in': None,
+            'last_check_in': None,
+            'tracked_days': 0,
+            'completion_rate': 0.0,
+            'current_streak': 0,
+            'longest_streak': 0,
+            'mean_streak': 0.0,
+            'streak_count': 0
+        }
+
+    first, last = int(ordinals[0]), int(ordinals[-1])
+    tracked_days = max(today, last) - first + 1
+    _, lengths = streak_runs(ordinals)
+    return {
+        'total_check_ins': int(ordinals.size),
+        'first_check_in': to_date(first).isoformat(),
+        'last_check_in': to_date(last).isoformat(),
+        'tracked_days': tracked_days,
+        'completion_rate': round(ordinals.size / tracked_days, 4),
+        'current_streak': int(lengths[-1]) if last >= today - 1 else 0,
+        'longest_streak': int(lengths.max()),
+        'mean_streak': round(float(lengths.mean()), 2),
+        'streak_count': int(lengths.size)
+    }
+
+def day_of_week_counts(ordinals):
+    """Number of check-ins on each weekday, Monday first."""
+    # Ordinal 1 (0001-01-01) was a Monday
+    counts = np.bincount((ordinals - 1) % 7, minlength=7)
+    return dict(zip(WEEKDAYS, counts.tolist()))
+
+def daily_series(ordinals, start, end):
+    """Dense 0/1 array with one entry per day from start to end inclusive."""
+    series = np.zeros(end - start + 1, dtype=np.uint8)
+    in_range = ordinals[(ordinals >= start) & (ordinals <= end)]
+    series[in_range - start] = 1
+    return series
+
+def rolling_completion(ordinals, start, end, window):
+    """Share of checked-in days in the `window` days ending on each day from start to end."""
+    series = daily_series(ordinals, start - window + 1, end)
+    totals = np.concatenate(([0], np.cumsum(series, dtype=np.int64)))
+    return (totals[window:] - totals[:-window]) / window
+
+def heatmap_bitmap(ordinals, start, end):
+    """
+    One bit per day from start to end, packed least significant bit first
+    and base64-encoded.
+    """
+    bits = np.packbits(daily_series(ordinals, start, end), bitorder='little')
+    return base64.b64encode(bits.tobytes()).decode()
+
+def period_counts(ordinals, period):
+    """
+    Check-in counts and completion rates per calendar week (Monday-based) or month.
+    Returns the start ordinal, length in days and check-in count of every
+    period that has at least one check-in.
+    """
+    if period == 'week':
+        period_starts = ordinals - (ordinals - 1) % 7
+        starts, counts = np.unique(period_starts, return_counts=True)
+        lengths = np.full(starts.size, 7)
+        return starts, lengths, counts
+
+    months = (ordinals - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]')
+    unique_months, counts = np.unique(months, return_counts=True)
+    month_starts = unique_months.astype('datetime64[D]')
+    lengths = ((unique_months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+    starts = month_starts.astype(np.int64) + EPOCH_ORDINAL
+    return starts, lengths, counts
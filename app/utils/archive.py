@@ -0,0 +1,279 @@
+import fcntl
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from flask import current_app
+
+# Segment layout: magic, row count, then the (offset, length) of each column.
+# IDs and dates are stored raw so they can be read straight from the mapped
+# file; creation times and notes are only needed for full rows, so they are
+# zlib-compressed.
+MAGIC = b'HTCKSEG1'
+HEADER = struct.Struct('<8sQ8Q')
+COLUMNS = ('ids', 'dates', 'created_at', 'notes')
+
+# Stored in place of a missing created_at
+NO_TIME = np.iinfo(np.int64).min
+EPOCH = datetime(1970, 1, 1)
+
+SEGMENT_NAME = re.compile(r'^check_ins-(\d+)\.seg$')
+
+class Segment:
+    """
+    Archived check-ins of one habit, sorted by (date, id), read from a memory-mapped file.
+
+    `ids` and `dates` (day ordinals) are numpy views of the mapped file, so filters and
+    binary searches over them read no more of the file than they touch.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, *spans = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f'Not a check-in segment: {path}')
+        self.count = count
+        self._spans = dict(zip(COLUMNS, zip(spans[::2], spans[1::2])))
+        self.ids = self._array('ids', '<i8')
+        self.dates = self._array('dates', '<i4')
+
+    def __len__(self):
+        return self.count
+
+    def _array(self, column, dtype):
+        offset, _ = self._spans[column]
+        return np.frombuffer(self._map, dtype=dtype, count=self.count, offset=offset)
+
+    def _compressed(self, column):
+        offset, length = self._spans[column]
+        return zlib.decompress(self._map[offset:offset + length])
+
+    def contains(self, day):
+        """Whether a check-in on `day` is archived, by binary search over the sorted dates."""
+        ordinal = day.toordinal()
+        index = np.searchsorted(self.dates, ordinal)
+        return index < self.count and self.dates[index] == ordinal
+
+    def find(self, check_in_id):
+        """The date of an archived check-in, or None if it is not in this segment."""
+        indexes = np.flatnonzero(self.ids == check_in_id)
+        return date.fromordinal(int(self.dates[indexes[0]])) if len(indexes) else None
+
+    def newest(self, limit=None, date_from=None, date_to=None, after=None):
+        """
+        Decode the rows within [date_from, date_to] that sort before the
+        (date, id) `after`, newest first, at most `limit` of them.
+        """
+        mask = np.ones(self.count, dtype=bool)
+        if date_from is not None:
+            mask &= self.dates >= date_from.toordinal()
+        if date_to is not None:
+            mask &= self.dates <= date_to.toordinal()
+        if after is not None:
+            after_date, after_id = after[0].toordinal(), after[1]
+            mask &= (self.dates < after_date) | ((self.dates == after_date) & (self.ids < after_id))
+        indexes = np.flatnonzero(mask)[::-1]
+        return self.rows(indexes[:limit] if limit is not None else indexes)
+
+    def rows(self, indexes=None):
+        """Decode the rows at `indexes` (all of them by default) into dicts, in index order."""
+        if indexes is None:
+            indexes = np.arange(self.count)
+        created_at = np.frombuffer(self._compressed('created_at'), dtype='<i8')
+        notes = json.loads(self._compressed('notes'))
+        return [
+            {
+                'id': int(self.ids[index]),
+                'date': date.fromordinal(int(self.dates[index])),
+                'notes': notes[index],
+                'created_at': None if created_at[index] == NO_TIME
+                else EPOCH + timedelta(microseconds=int(created_at[index]))
+            }
+            for index in indexes
+        ]
+
+def write_segment(path, rows):
+    """Write check-in dicts (id, date, notes, created_at) as a segment sorted by (date, id)."""
+    rows = sorted(rows, key=lambda row: (row['date'], row['id']))
+    columns = {
+        'ids': np.array([row['id'] for row in rows], dtype='<i8').tobytes(),
+        'dates': np.array([row['date'].toordinal() for row in rows], dtype='<i4').tobytes(),
+        'created_at': zlib.compress(np.array([
+            NO_TIME if row['created_at'] is None else (row['created_at'] - EPOCH) // timedelta(microseconds=1)
+            for row in rows
+        ], dtype='<i8').tobytes()),
+        'notes': zlib.compress(json.dumps([row['notes'] for row in rows]).encode()),
+    }
+    spans = []
+    offset = HEADER.size
+    for column in COLUMNS:
+        # Keep every column 8-byte aligned for the numpy views
+        offset += -offset % 8
+        spans += [offset, len(columns[column])]
+        offset += len(columns[column])
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(rows), *spans))
+        for column, start in zip(COLUMNS, spans[::2]):
+            f.write(bytes(start - f.tell()))
+            f.write(columns[column])
+        f.flush()
+        os.fsync(f.fileno())
+
+class PendingSegment:
+    """
+    A habit's rewritten segment, written aside under a unique name until
+    `publish` swaps it in. Hold the habit's `CheckInArchive.lock` from staging
+    until the database transaction commits or the segment is discarded.
+    """
+
+    def __init__(self, store, habit_id, rows, previous):
+        self.store = store
+        self.habit_id = habit_id
+        self.previous = previous
+        self.path = store.path(habit_id)
+        self.published = False
+        self._staged = None
+        if rows:
+            fd, self._staged = tempfile.mkstemp(prefix=f'check_ins-{habit_id}.', suffix='.tmp', dir=store.directory)
+            os.close(fd)
+            write_segment(self._staged, rows)
+
+    def publish(self):
+        """Atomically replace the habit's segment, or remove it when no rows are left."""
+        if self._staged is not None:
+            os.replace(self._staged, self.path)
+            self._staged = None
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self.published = True
+
+    def discard(self):
+        """Drop the staged segment, restoring the previous rows if it was already published."""
+        if self._staged is not None:
+            os.remove(self._staged)
+            self._staged = None
+        if self.published:
+            restored = PendingSegment(self.store, self.habit_id, self.previous, self.previous)
+            restored.publish()
+
+class CheckInArchive:
+    """
+    Directory of check-in segments, one file per habit holding all of its archived check-ins.
+
+    Archiving rewrites a habit's segment with the new rows merged in, so reads
+    only ever map one file per habit. Files are replaced atomically; readers
+    holding the old mapping keep reading the old file until they reopen it.
+    Rewrites of one habit's segment are serialized across threads and
+    processes by an exclusive lock on the habit's lock file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    def path(self, habit_id):
+        return os.path.join(self.directory, f'check_ins-{habit_id}.seg')
+
+    def lock_path(self, habit_id):
+        return os.path.join(self.directory, f'check_ins-{habit_id}.lock')
+
+    @contextmanager
+    def lock(self, habit_id):
+        """Hold the exclusive lock on rewriting a habit's segment."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path(habit_id), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def segment(self, habit_id):
+        """The habit's segment, or None if it has no archived check-ins."""
+        path = self.path(habit_id)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._segments.get(habit_id)
+            if cached is None or cached[0] != version:
+                cached = self._segments[habit_id] = (version, Segment(path))
+            return cached[1]
+
+    def habit_ids(self):
+        """IDs of every habit with archived check-ins."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(match.group(1)) for match in map(SEGMENT_NAME.match, os.listdir(self.directory)) if match)
+
+    def stage(self, habit_id, added=(), removed=()):
+        """
+        Write aside a habit's segment with the `added` rows merged in and the
+        rows whose ID is in `removed` left out; see PendingSegment. Call it
+        holding the habit's lock, since the new rows derive from the current ones.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        segment = self.segment(habit_id)
+        previous = segment.rows() if segment is not None else []
+        replaced = set(removed) | {row['id'] for row in added}
+        rows = [row for row in previous if row['id'] not in replaced] + list(added)
+        return PendingSegment(self, habit_id, rows, previous)
+
+    def drop(self, habit_id):
+        """Remove the segment and lock file of a deleted habit."""
+        with self._lock:
+            self._segments.pop(habit_id, None)
+        # The habit is gone, so nothing can stage for it after its lock file goes
+        for path in (self.path(habit_id), self.lock_path(habit_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class Archive:
+    """Flask extension giving access to the check-in archive of the current app."""
+
+    def init_app(self, app):
+        directory = app.config.get('CHECK_IN_ARCHIVE_DIR') or os.path.join(app.instance_path, 'archive')
+        app.extensions['archive'] = CheckInArchive(directory)
+
+    @property
+    def store(self):
+        return current_app.extensions['archive']
+
+    def segment(self, habit_id):
+        return self.store.segment(habit_id)
+
+    def habit_ids(self):
+        return self.store.habit_ids()
+
+    def lock(self, habit_id):
+        return self.store.lock(habit_id)
+
+    def stage(self, habit_id, added=(), removed=()):
+        return self.store.stage(habit_id, added, removed)
+
+    def drop(self, habit_id):
+        self.store.drop(habit_id)
+
+    def contains(self, habit_id, day):
+        """Whether the habit has an archived check-in on `day`."""
+        segment = self.store.segment(habit_id)
+        return segment is not None and segment.contains(day)
+
+    def dates(self, habit_id):
+        """The dates of a habit's archived check-ins, oldest first."""
+        segment = self.store.segment(habit_id)
+        return [date.fromordinal(int(ordinal)) for ordinal in segment.dates] if segment is not None else []
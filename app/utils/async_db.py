@@ -0,0 +1,38 @@
+from sqlalchemy.engine import make_url
+
+from app.utils.sqlite import apply_pragmas, is_memory_database
+
+# Async drivers used in place of each backend's default DBAPI
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def async_url(url):
+    """Return the async-driver equivalent of a database URL."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend} databases')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def create_async_engine(url, options=None, pragmas=None):
+    """
+    Create an AsyncEngine for the database at `url`, with the same engine
+    options and SQLite pragmas as the synchronous engine.
+    Requires aiosqlite for SQLite and asyncpg for PostgreSQL.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine as create_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    url = async_url(url)
+    options = dict(options or {})
+    if url.get_backend_name() == 'sqlite' and not is_memory_database(url):
+        # aiosqlite defaults to NullPool, which would open a connection thread per session
+        options.setdefault('poolclass', AsyncAdaptedQueuePool)
+    try:
+        engine = create_engine(url, **options)
+    except ImportError as e:
+        raise RuntimeError(f"The async mode needs the '{url.get_driver_name()}' package") from e
+    apply_pragmas(engine.sync_engine, pragmas)
+    return engine
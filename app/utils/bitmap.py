@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+class DayBitmap:
+    """
+    One bit per calendar day, starting at `origin`.
+    Bit i (least significant bit first within each byte) is set when there is
+    a check-in on origin + i days. Growing the bitmap into the past moves the
+    origin back by whole bytes so existing bits never need shifting.
+    """
+
+    def __init__(self, origin=None, bits=b''):
+        self.origin = origin
+        self.bits = bytearray(bits)
+
+    @classmethod
+    def from_dates(cls, dates):
+        """Build a bitmap holding the given dates."""
+        bitmap = cls()
+        dates = sorted(dates)
+        if dates:
+            bitmap.origin = dates[0]
+            bitmap.bits = bytearray((dates[-1] - dates[0]).days // 8 + 1)
+            for day in dates:
+                bitmap.add(day)
+        return bitmap
+
+    def __len__(self):
+        """Number of days covered by the bitmap."""
+        return len(self.bits) * 8
+
+    def add(self, day):
+        """Set the bit of a day, growing the bitmap as needed."""
+        if self.origin is None:
+            self.origin = day
+        offset = (day - self.origin).days
+        if offset < 0:
+            missing = (-offset + 7) // 8
+            self.bits[:0] = bytes(missing)
+            self.origin -= timedelta(days=missing * 8)
+            offset += missing * 8
+        if offset >= len(self):
+            self.bits.extend(bytes(offset // 8 - len(self.bits) + 1))
+        self.bits[offset // 8] |= 1 << (offset % 8)
+
+    def remove(self, day):
+        """Clear the bit of a day."""
+        offset = self._offset(day)
+        if offset is not None:
+            self.bits[offset // 8] &= ~(1 << (offset % 8)) & 0xFF
+
+    def contains(self, day):
+        """Check whether a day is set."""
+        offset = self._offset(day)
+        return offset is not None and bool(self.bits[offset // 8] & (1 << (offset % 8)))
+
+    def count(self, start, end):
+        """Number of set days from start to end inclusive, using a mask and popcount."""
+        if self.origin is None or end < start:
+            return 0
+        first = max((start - self.origin).days, 0)
+        last = min((end - self.origin).days, len(self) - 1)
+        if last < first:
+            return 0
+        value = int.from_bytes(self.bits, 'little') >> first
+        return (value & ((1 << (last - first + 1)) - 1)).bit_count()
+
+    def to_ordinals(self):
+        """Sorted day ordinals of every set day."""
+        if self.origin is None:
+            return np.empty(0, dtype=np.int64)
+        unpacked = np.unpackbits(np.frombuffer(bytes(self.bits), dtype=np.uint8), bitorder='little')
+        return np.flatnonzero(unpacked).astype(np.int64) + self.origin.toordinal()
+
+    def to_dates(self):
+        """Every set day as a date, oldest first."""
+        return [date.fromordinal(int(ordinal)) for ordinal in self.to_ordinals()]
+
+    def _offset(self, day):
+        """Bit offset of a day, or None when it lies outside the bitmap."""
+        if self.origin is None:
+            return None
+        offset = (day - self.origin).days
+        if offset < 0 or offset >= len(self):
+            return None
+        return offset
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from flask import current_app
+
+class NullCache:
+    """Cache backend that stores nothing, used to disable caching."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None, tags=()):
+        pass
+
+    def add(self, key, value, ttl=None):
+        return True
+
+    def delete(self, *keys):
+        pass
+
+    def invalidate_tag(self, tag):
+        pass
+
+    def clear(self):
+        pass
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with least-recently-used eviction and per-entry TTL.
+
+    Entries can be registered under tags so that a whole group of keys (for
+    example every cached page of one habit's check-ins) can be dropped at once.
+    """
+
+    def __init__(self, max_entries=4096, default_ttl=60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._tags = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, tags=()):
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value, tuple(tags))
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def add(self, key, value, ttl=None):
+        """Store a value only if the key is missing or expired. Returns whether it was stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + (ttl or self.default_ttl), value, ())
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def delete(self, *keys):
+        """Remove the given keys."""
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_tag(self, tag):
+        """Remove every key registered under a tag."""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        """Remove everything."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        """Remove a key and its tag registrations. Caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class RedisCache:
+    """
+    Cache backend for Redis or any server speaking its protocol.
+    Values are stored as JSON; tags are kept as Redis sets of member keys.
+    """
+
+    def __init__(self, client, default_ttl=60, prefix='habit-tracker:'):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Create a backend from a redis:// URL. Requires the optional `redis` package."""
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for CACHE_BACKEND='redis'") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = ttl or self.default_ttl
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipeline.sadd(tag_key, key)
+            pipeline.expire(tag_key, ttl)
+        pipeline.execute()
+
+    def add(self, key, value, ttl=None):
+        # SET NX is atomic, so only one worker gets True for a key
+        return bool(self.client.set(self.prefix + key, json.dumps(value), ex=ttl or self.default_ttl, nx=True))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def invalidate_tag(self, tag):
+        tag_key = self._tag_key(tag)
+        members = [member.decode() if isinstance(member, bytes) else member
+                   for member in self.client.smembers(tag_key)]
+        self.delete(*members)
+        self.client.delete(tag_key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}tag:{tag}'
+
+def create_backend(config):
+    """Build the cache backend selected by the CACHE_* settings."""
+    backend = config.get('CACHE_BACKEND', 'lru')
+    ttl = config.get('CACHE_DEFAULT_TTL', 60)
+    if backend == 'lru':
+        return LRUCache(max_entries=config.get('CACHE_MAX_ENTRIES', 4096), default_ttl=ttl)
+    if backend == 'redis':
+        return RedisCache.from_url(config['CACHE_REDIS_URL'], default_ttl=ttl)
+    if backend == 'null':
+        return NullCache()
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+def create_store(config, name, max_entries, default_ttl):
+    """
+    Build a backend for state that requests depend on rather than a cached
+    copy of the database. It uses Redis when CACHE_BACKEND is 'redis', under
+    its own prefix so clearing the cache keeps it, and an in-process LRU
+    otherwise, also when caching is disabled. Only the Redis store is shared
+    by several worker processes.
+    """
+    if config.get('CACHE_BACKEND', 'lru') == 'redis':
+        return RedisCache.from_url(config['CACHE_REDIS_URL'], default_ttl=default_ttl, prefix=f'habit-tracker-{name}:')
+    return LRUCache(max_entries=max_entries, default_ttl=default_ttl)
+
+class Cache:
+    """Flask extension giving access to the cache backend of the current app."""
+
+    def init_app(self, app):
+        app.extensions['cache'] = create_backend(app.config)
+
+    @property
+    def backend(self):
+        return current_app.extensions['cache']
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None, tags=()):
+        self.backend.set(key, value, ttl=ttl, tags=tags)
+
+    def add(self, key, value, ttl=None):
+        return self.backend.add(key, value, ttl=ttl)
+
+    def delete(self, *keys):
+        self.backend.delete(*keys)
+
+    def invalidate_tag(self, tag):
+        self.backend.invalidate_tag(tag)
+
+    def clear(self):
+        self.backend.clear()
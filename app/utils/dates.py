@@ -0,0 +1,14 @@
+from datetime import datetime, time
+
+def utc_today():
+    """The current UTC date, which live counters such as a habit's current_streak are relative to."""
+    return datetime.utcnow().date()
+
+def dated(last_modified, today):
+    """
+    The modification time of a representation that also changes with the date:
+    it is never earlier than the start of `today`.
+    """
+    if last_modified is None:
+        return None
+    return max(last_modified, datetime.combine(today, time()))
@@ -0,0 +1,56 @@
+from sqlalchemy import Integer
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app import db
+
+def is_foreign_key_violation(error):
+    """Check whether an IntegrityError was raised by a foreign key constraint."""
+    orig = getattr(error, 'orig', None)
+    # psycopg2 exposes pgcode, psycopg 3 sqlstate; 23503 is foreign_key_violation
+    if getattr(orig, 'pgcode', None) == '23503' or getattr(orig, 'sqlstate', None) == '23503':
+        return True
+    return 'FOREIGN KEY constraint failed' in str(orig)
+
+def dialect_insert(model, bind=None):
+    """
+    Return an INSERT construct for the dialect of `bind`, or of the current session.
+    The native PostgreSQL and SQLite constructs support ON CONFLICT clauses.
+    """
+    dialect = (bind or db.session.get_bind()).dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    raise NotImplementedError(f'Unsupported database dialect: {dialect}')
+
+
+class day_offset(FunctionElement):
+    """
+    `date - days` as an integer day number, counted from 1970-01-01 on
+    every dialect. Subtracting a row number from consecutive dates yields
+    the same value for every date in the run, which is what gaps-and-islands
+    queries group by.
+    """
+    type = Integer()
+    name = 'day_offset'
+    inherit_cache = True
+
+@compiles(day_offset)
+def compile_day_offset(element, compiler, **kw):
+    """SQLite: julianday() turns the ISO date string into a (fractional) day number."""
+    date, days = element.clauses
+    return (
+        f"CAST(julianday({compiler.process(date, **kw)}) - julianday('1970-01-01') AS INTEGER)"
+        f' - {compiler.process(days, **kw)}'
+    )
+
+@compiles(day_offset, 'postgresql')
+def compile_day_offset_postgresql(element, compiler, **kw):
+    """PostgreSQL: date - date is an integer number of days."""
+    date, days = element.clauses
+    return (
+        f"({compiler.process(date, **kw)} - DATE '1970-01-01')"
+        f' - CAST({compiler.process(days, **kw)} AS INTEGER)'
+    )
@@ -0,0 +1,265 @@
+import json
+import logging
+import threading
+from collections import deque
+from functools import cached_property
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Event data field holding the habit an event belongs to, by resource
+HABIT_ID_FIELDS = {'habit': 'id', 'check_in': 'habit_id', 'check_ins': 'habit_id'}
+
+class Event:
+    """
+    A change pushed to subscribers: a type such as 'habit.updated' and its JSON data.
+
+    Events of one habit share a coalescing key, ('habit', id) for the habit
+    itself and ('check_ins', id) for its check-ins, so a slow client can be sent
+    one event in place of several.
+    """
+
+    def __init__(self, type, data, id=None):
+        self.type = type
+        self.data = data
+        self.id = id
+        resource = type.split('.', 1)[0]
+        self.habit_id = data[HABIT_ID_FIELDS[resource]] if resource in HABIT_ID_FIELDS else None
+        self.key = ('habit' if resource == 'habit' else 'check_ins', self.habit_id) \
+            if resource in HABIT_ID_FIELDS else None
+
+    @cached_property
+    def payload(self):
+        """The data encoded once, however many subscribers receive it."""
+        return json.dumps(self.data, separators=(',', ':'))
+
+    def merge(self, newer):
+        """
+        The event sent instead of this one followed by `newer`, which has the same key.
+        A habit event carries the habit's latest state, so the newer one wins; check-ins
+        are separate rows, so they collapse into a 'check_ins.changed' notice.
+        """
+        if self.key[0] == 'habit':
+            return newer
+        return Event('check_ins.changed', {'habit_id': self.habit_id}, newer.id)
+
+    def to_message(self):
+        return json.dumps({'type': self.type, 'data': self.data, 'id': self.id})
+
+    @classmethod
+    def from_message(cls, raw):
+        message = json.loads(raw)
+        return cls(message['type'], message['data'], message['id'])
+
+class Subscription:
+    """
+    Bounded buffer of the events waiting to be sent to one client.
+
+    Publishing never blocks on a client. When `max_events` are pending, a new
+    event is merged into a pending one with the same key; failing that, the
+    oldest pending event is dropped and the client is sent a 'resync' event
+    telling it to refetch what it shows.
+    """
+
+    def __init__(self, max_events=100, habit_id=None):
+        self.max_events = max_events
+        self.habit_id = habit_id
+        self.overflowed = False
+        self.closed = False
+        self._events = deque()
+        self._ready = threading.Condition()
+
+    def put(self, event):
+        """Buffer an event for this client, unless it is filtered out."""
+        if self.habit_id is not None and event.habit_id != self.habit_id:
+            return
+        with self._ready:
+            if len(self._events) >= self.max_events:
+                for index, pending in enumerate(self._events):
+                    if pending.key == event.key:
+                        del self._events[index]
+                        event = pending.merge(event)
+                        break
+                else:
+                    self._events.popleft()
+                    self.overflowed = True
+            self._events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait up to `timeout` seconds for events and return all pending ones,
+        or an empty list on timeout. A 'resync' event comes first after an overflow.
+        """
+        with self._ready:
+            self._ready.wait_for(lambda: self._events or self.overflowed or self.closed, timeout)
+            events = list(self._events)
+            self._events.clear()
+            if self.overflowed:
+                self.overflowed = False
+                events.insert(0, Event('resync', {}))
+            return events
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+class LocalBroker:
+    """In-process pub/sub: events published by a worker reach that worker's subscribers."""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def publish(self, event):
+        with self._lock:
+            if not self._subscriptions:
+                return
+            self._next_id += 1
+            event.id = self._next_id
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+class RedisBroker:
+    """
+    Pub/sub through a Redis channel, for deployments with several workers.
+    Every worker relays the channel's events to its own subscribers from a
+    listener thread, started when its first client subscribes.
+    """
+
+    def __init__(self, client, channel='habit-tracker:events'):
+        self.client = client
+        self.channel = channel
+        self.local = LocalBroker()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Create a broker from a redis:// URL. Requires the optional `redis` package."""
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for EVENTS_BACKEND='redis'") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def publish(self, event):
+        self.client.publish(self.channel, event.to_message())
+
+    def subscribe(self, subscription):
+        self._ensure_listening()
+        self.local.subscribe(subscription)
+
+    def unsubscribe(self, subscription):
+        self.local.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self):
+        return self.local.subscriber_count
+
+    def _ensure_listening(self):
+        # Started on first use so that pre-forking servers start it in each worker
+        with self._lock:
+            if self._thread is None:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._thread = threading.Thread(target=self._listen, args=(pubsub,), name='events', daemon=True)
+                self._thread.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            try:
+                self.local.publish(Event.from_message(message['data']))
+            except Exception:
+                logger.exception('Dropped malformed event from %s', self.channel)
+
+class NullBroker:
+    """Broker that discards events, used to disable the event stream."""
+
+    subscriber_count = 0
+
+    def publish(self, event):
+        pass
+
+    def subscribe(self, subscription):
+        pass
+
+    def unsubscribe(self, subscription):
+        pass
+
+def create_broker(config):
+    """Build the event broker selected by the EVENTS_* settings."""
+    backend = config.get('EVENTS_BACKEND', 'local')
+    if backend == 'local':
+        return LocalBroker()
+    if backend == 'redis':
+        return RedisBroker.from_url(config['EVENTS_REDIS_URL'])
+    if backend == 'null':
+        return NullBroker()
+    raise ValueError(f'Unknown EVENTS_BACKEND: {backend}')
+
+def format_event(event):
+    """Encode an event as a Server-Sent Events message."""
+    lines = f'event: {event.type}\ndata: {event.payload}\n\n'
+    return f'id: {event.id}\n{lines}' if event.id is not None else lines
+
+class Events:
+    """Flask extension publishing habit and check-in changes to Server-Sent Events clients."""
+
+    def init_app(self, app):
+        app.extensions['events'] = create_broker(app.config)
+
+    @property
+    def broker(self):
+        return current_app.extensions['events']
+
+    def publish(self, type, data):
+        """Publish a change to every subscriber. Failures are logged, never raised to the writer."""
+        try:
+            self.broker.publish(Event(type, data))
+        except Exception:
+            logger.exception('Failed to publish %s event', type)
+
+    def subscribe(self, habit_id=None):
+        """
+        Register a client, optionally only for one habit's events. Returns its
+        Subscription, or None when EVENTS_MAX_SUBSCRIBERS clients are connected.
+        """
+        if self.broker.subscriber_count >= current_app.config.get('EVENTS_MAX_SUBSCRIBERS', 100):
+            return None
+        subscription = Subscription(current_app.config.get('EVENTS_BUFFER_SIZE', 100), habit_id)
+        self.broker.subscribe(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        self.broker.unsubscribe(subscription)
+
+    def stream(self, subscription, heartbeat):
+        """
+        Yield SSE messages for a subscription until the client goes away,
+        with a comment line every `heartbeat` seconds to keep proxies from closing it.
+        """
+        yield ': connected\n\n'
+        while not subscription.closed:
+            events = subscription.get(timeout=heartbeat)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            yield ''.join(format_event(event) for event in events)
@@ -0,0 +1,28 @@
+import hashlib
+from datetime import timezone
+
+from flask import request
+from werkzeug.http import http_date, quote_etag
+
+def make_etag(*parts):
+    """Build an entity tag from the values a representation depends on."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def conditional_headers(etag, last_modified=None):
+    """Headers advertising the validators of a representation."""
+    headers = {'ETag': quote_etag(etag)}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    return headers
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Check the request's If-None-Match / If-Modified-Since headers against
+    the current validators. If-None-Match takes precedence when both are sent.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return last_modified <= request.if_modified_since
+    return False
@@ -0,0 +1,104 @@
+import hashlib
+from functools import wraps
+
+from flask import Response, current_app, jsonify, request
+
+from app.utils.cache import create_store
+
+# Longest Idempotency-Key accepted
+MAX_KEY_LENGTH = 255
+
+# Response headers stored with a response and sent again on replay
+REPLAYED_HEADERS = ('Content-Type', 'Location')
+
+class IdempotencyStore:
+    """
+    Responses stored by idempotency key in a cache backend, evicted after
+    the backend's TTL (and, in-process, by LRU eviction). A request
+    claims its key with an atomic add before running, so a concurrent retry
+    is rejected instead of running twice; with a Redis backend this holds
+    across worker processes.
+    """
+
+    def __init__(self, backend, claim_ttl=60):
+        self.backend = backend
+        # Bounds how long the key of a request whose worker died stays claimed
+        self.claim_ttl = claim_ttl
+
+    def begin(self, key, fingerprint):
+        """
+        Claim a key for a request whose body hashes to `fingerprint`.
+        Returns the stored (fingerprint, body, status, headers) of an earlier
+        request with the key, 'in_progress' if one is being handled, or None
+        once the key is claimed.
+        """
+        while not self.backend.add(key, {'in_progress': True}, ttl=self.claim_ttl):
+            stored = self.backend.get(key)
+            if stored is None:
+                # Expired or released since the add; try to claim it again
+                continue
+            if stored.get('in_progress'):
+                return 'in_progress'
+            return stored['fingerprint'], stored['body'], stored['status'], stored['headers']
+        return None
+
+    def complete(self, key, fingerprint, body, status, headers):
+        """Store the response of a claimed key and release it."""
+        self.backend.set(key, {'fingerprint': fingerprint, 'body': body, 'status': status, 'headers': headers})
+
+    def release(self, key):
+        """Release a claimed key without storing a response, so it can be retried."""
+        self.backend.delete(key)
+
+class Idempotency:
+    """Flask extension holding the app's idempotency store."""
+
+    def init_app(self, app):
+        app.extensions['idempotency'] = IdempotencyStore(create_store(
+            app.config, 'idempotency',
+            max_entries=app.config.get('IDEMPOTENCY_MAX_KEYS', 10000),
+            default_ttl=app.config.get('IDEMPOTENCY_TTL', 86400)
+        ))
+
+def idempotent(view):
+    """
+    Make a view replayable with an `Idempotency-Key` request header.
+
+    The first response for a key (other than a server error) is stored and
+    returned again, with `Idempotent-Replayed: true`, for every retry with the
+    same key and body, without calling the view. Reusing a key with another
+    body is rejected with 422, and a retry arriving while the first request is
+    still being handled with 409.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'}), 400
+
+        store = current_app.extensions['idempotency']
+        scoped_key = f'{request.method} {request.path} {key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        stored = store.begin(scoped_key, fingerprint)
+        if stored == 'in_progress':
+            return jsonify({'error': 'A request with this Idempotency-Key is still being processed'}), 409
+        if stored is not None:
+            stored_fingerprint, body, status, headers = stored
+            if stored_fingerprint != fingerprint:
+                return jsonify({'error': 'Idempotency-Key was already used with a different request body'}), 422
+            return Response(body, status, {**headers, 'Idempotent-Replayed': 'true'})
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(scoped_key)
+            raise
+        if response.status_code >= 500:
+            store.release(scoped_key)
+        else:
+            headers = {name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers}
+            store.complete(scoped_key, fingerprint, response.get_data(as_text=True), response.status_code, headers)
+        return response
+    return wrapper
@@ -0,0 +1,47 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(obj):
+    """Encode an object to a compact JSON string, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default).decode()
+    return json.dumps(obj, default=DefaultJSONProvider.default)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes and decodes with orjson.
+
+    Dates and datetimes are passed through to Flask's default handler so
+    responses look exactly as they do with the standard provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+def create_json_provider(app):
+    """
+    Build the app's JSON provider, preferring orjson when it is installed.
+    JSON_SORT_KEYS is honoured so keys are not sorted on every response unless asked for.
+    """
+    if orjson is not None and app.config.get('JSON_USE_ORJSON', True):
+        provider = OrjsonProvider(app)
+    else:
+        provider = DefaultJSONProvider(app)
+    provider.sort_keys = app.config.get('JSON_SORT_KEYS', True)
+    return provider
@@ -0,0 +1,34 @@
+import base64
+import json
+
+from flask import request, url_for
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values):
+    """Encode keyset values into an opaque, URL-safe cursor string."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, dict):
+        raise ValueError('Invalid cursor')
+    return values
+
+def next_page_headers(next_cursor):
+    """Build headers advertising the next page of the current request, if there is one."""
+    if not next_cursor:
+        return {}
+    args = {**request.args, 'cursor': next_cursor}
+    next_url = url_for(request.endpoint, **request.view_args, **args)
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': f'<{next_url}>; rel="next"'
+    }
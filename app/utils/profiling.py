@@ -0,0 +1,198 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class RequestStats:
+    """Timings collected while one request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.profile = None
+
+class MetricsRegistry:
+    """Thread-safe per-process request metrics, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self._duration_sums = defaultdict(float)
+        self._queries = defaultdict(int)
+        self._query_seconds = defaultdict(float)
+        self._serialize_seconds = defaultdict(float)
+
+    def observe(self, endpoint, method, status, duration, stats):
+        """Record one finished request."""
+        labels = (endpoint, method, str(status))
+        route = (endpoint, method)
+        with self._lock:
+            self._requests[labels] += 1
+            buckets = self._durations[route]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+            buckets[-1] += 1
+            self._duration_sums[route] += duration
+            self._queries[route] += stats.query_count
+            self._query_seconds[route] += stats.query_seconds
+            self._serialize_seconds[route] += stats.serialize_seconds
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total Requests handled, by endpoint, method and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{_labels(endpoint, method, status=status)} {count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Request wall time.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (endpoint, method), buckets in sorted(self._durations.items()):
+                for bound, count in zip((*DURATION_BUCKETS, '+Inf'), buckets):
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{_labels(endpoint, method, le=bound)} {count}'
+                    )
+                lines.append(
+                    f'http_request_duration_seconds_sum{_labels(endpoint, method)} '
+                    f'{self._duration_sums[(endpoint, method)]:.6f}'
+                )
+                lines.append(f'http_request_duration_seconds_count{_labels(endpoint, method)} {buckets[-1]}')
+
+            for name, kind, help_text, values, fmt in (
+                ('db_queries_total', 'counter', 'SQL statements executed.', self._queries, '{}'),
+                ('db_query_seconds_total', 'counter', 'Time spent executing SQL.', self._query_seconds, '{:.6f}'),
+                ('serialization_seconds_total', 'counter', 'Time spent encoding JSON responses.',
+                 self._serialize_seconds, '{:.6f}'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for (endpoint, method), value in sorted(values.items()):
+                    lines.append(f'{name}{_labels(endpoint, method)} {fmt.format(value)}')
+        return '\n'.join(lines) + '\n'
+
+class Profiler:
+    """
+    Opt-in Flask extension recording per-request wall time, SQL statement
+    count and duration, and JSON serialization time.
+
+    Timings are sent back in a `Server-Timing` header and aggregated for the
+    `/metrics` endpoint. A sample of requests (PROFILING_SAMPLE_RATE) runs
+    under cProfile, and the profile is written to PROFILING_DIR when the
+    request takes longer than PROFILING_SLOW_MS.
+    """
+
+    def init_app(self, app, db):
+        if not app.config.get('PROFILING_ENABLED'):
+            return
+
+        state = app.extensions['profiler'] = RequestProfiler(
+            sample_rate=app.config.get('PROFILING_SAMPLE_RATE', 0.0),
+            slow_seconds=app.config.get('PROFILING_SLOW_MS', 500) / 1000,
+            profile_dir=app.config.get('PROFILING_DIR') or os.path.join(app.instance_path, 'profiles')
+        )
+        with app.app_context():
+            shard_engines = app.extensions['shards'].engines[1:] if 'shards' in app.extensions else ()
+            for engine in (*db.engines.values(), *app.extensions.get('replicas', ()), *shard_engines):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+                event.listen(engine, 'handle_error', _handle_error)
+        app.json.dumps = _timed(app.json.dumps)
+        app.before_request(state.before_request)
+        app.after_request(state.after_request)
+        app.add_url_rule('/metrics', 'metrics', state.metrics_view)
+
+class RequestProfiler:
+    """Request hooks and collected metrics of one app."""
+
+    def __init__(self, sample_rate, slow_seconds, profile_dir):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.profile_dir = profile_dir
+        self.metrics = MetricsRegistry()
+
+    def before_request(self):
+        g.request_stats = stats = RequestStats()
+        if self.sample_rate and random.random() < self.sample_rate:
+            stats.profile = cProfile.Profile()
+            stats.profile.enable()
+
+    def after_request(self, response):
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        duration = time.perf_counter() - stats.started
+        if stats.profile is not None:
+            stats.profile.disable()
+            if duration >= self.slow_seconds:
+                self.dump_profile(stats.profile, duration)
+
+        endpoint = request.endpoint or 'unmatched'
+        if endpoint != 'metrics':
+            self.metrics.observe(endpoint, request.method, response.status_code, duration, stats)
+        response.headers.add('Server-Timing', ', '.join((
+            f'app;dur={duration * 1000:.2f}',
+            f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.query_count} queries"',
+            f'serialize;dur={stats.serialize_seconds * 1000:.2f}',
+        )))
+        return response
+
+    def dump_profile(self, profile, duration):
+        """Write a request's cProfile stats, named after the endpoint, time and duration."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{request.endpoint or 'unmatched'}-{time.strftime('%Y%m%dT%H%M%S')}-{int(duration * 1000)}ms.prof"
+        profile.dump_stats(os.path.join(self.profile_dir, name))
+
+    def metrics_view(self):
+        return Response(self.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def _current_stats():
+    """The stats of the request being handled, if it is profiled."""
+    return g.get('request_stats') if has_request_context() else None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    stats = _current_stats()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_seconds += time.perf_counter() - started
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+def _timed(dumps):
+    """Wrap a JSON provider's dumps so encoding time is added to the request stats."""
+    def timed_dumps(obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return dumps(obj, **kwargs)
+        finally:
+            stats = _current_stats()
+            if stats is not None:
+                stats.serialize_seconds += time.perf_counter() - started
+    return timed_dumps
+
+def _labels(endpoint, method, **extra):
+    """Format Prometheus labels."""
+    labels = {'endpoint': endpoint, 'method': method, **extra}
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
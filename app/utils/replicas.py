@@ -0,0 +1,111 @@
+import random
+import time
+from functools import wraps
+
+from flask import current_app, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+
+from app.utils.sqlite import apply_pragmas, engine_options
+
+# Cookie holding the time until which a client that wrote reads from the primary
+PRIMARY_UNTIL_COOKIE = 'primary_until'
+
+class Replicas:
+    """
+    Flask extension creating one engine per read replica in
+    SQLALCHEMY_REPLICA_URIS, with the same engine options and SQLite pragmas
+    as the primary. Replicas are not Flask-SQLAlchemy binds, so only
+    RoutingSession ever sends queries to them.
+
+    A response to a request that wrote sets a cookie sending the client's
+    requests to the primary for the next REPLICA_STICKY_SECONDS, long enough
+    for the replicas to catch up, so the client keeps reading its own writes.
+    """
+
+    def init_app(self, app):
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        engines = []
+        for uri in app.config.get('SQLALCHEMY_REPLICA_URIS') or []:
+            engine = create_engine(uri, **engine_options(uri, options))
+            apply_pragmas(engine, app.config.get('SQLITE_PRAGMAS', {}))
+            engines.append(engine)
+        app.extensions['replicas'] = engines
+        if engines:
+            app.before_request(self._stick_to_primary)
+            app.after_request(self._remember_write)
+
+    @staticmethod
+    def _stick_to_primary():
+        try:
+            until = float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0))
+        except ValueError:
+            return
+        if until > time.time():
+            current_app.extensions['sqlalchemy'].session().info['primary'] = True
+
+    @staticmethod
+    def _remember_write(response):
+        session = current_app.extensions['sqlalchemy'].session()
+        window = current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+        if session.info.get('wrote') and window > 0:
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE, f'{time.time() + window:.3f}',
+                max_age=window, httponly=True, samesite='Lax'
+            )
+        return response
+
+class RoutingSession(Session):
+    """
+    Session sending reads made inside `replica_read` methods to a replica and
+    everything else to the primary, or to the shard the session is pinned to.
+
+    Each session (one per request) picks one replica for all of its reads, so
+    a request sees a single consistent snapshot. Once the session writes,
+    by flushing or by executing an INSERT, UPDATE or DELETE, every later read
+    of that session goes to the primary so the request reads its own writes;
+    so do all reads of a session marked 'primary' by the Replicas extension.
+    Replicas mirror the primary, so reads pinned to another shard skip them.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['wrote'] = True
+        elif bind is None and self.info.get('replica_read') and not self.info.get('wrote') \
+                and not self.info.get('primary') and not self.info.get('shard'):
+            replica = self._replica_engine()
+            if replica is not None:
+                self.info['replica_served'] = True
+                return replica
+        # Pinned to a shard other than the primary by app.utils.shards.pin_shard
+        if bind is None and self.info.get('shard'):
+            return current_app.extensions['shards'].engines[self.info['shard']]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_engine(self):
+        engines = current_app.extensions.get('replicas')
+        if not engines:
+            return None
+        if 'replica' not in self.info:
+            self.info['replica'] = random.choice(engines)
+        return self.info['replica']
+
+def served_by_replica():
+    """
+    Whether a read of the current request was served by a replica. Replicas may
+    lag the primary, so what they return must not be put in the shared cache.
+    """
+    return current_app.extensions['sqlalchemy'].session().info.get('replica_served', False)
+
+def replica_read(method):
+    """Let the queries of a repository read method be served by a read replica."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        session = current_app.extensions['sqlalchemy'].session()
+        previous = session.info.get('replica_read', False)
+        session.info['replica_read'] = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            session.info['replica_read'] = previous
+    return wrapper
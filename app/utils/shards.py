@@ -0,0 +1,177 @@
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.id_block import IdBlock
+from app.utils.db import dialect_insert
+from app.utils.sqlite import apply_pragmas, engine_options
+
+class PartialShardWriteError(SQLAlchemyError):
+    """
+    A write spanning several shards failed on one of them after others had
+    already committed. `committed` holds what the committed shards wrote.
+    """
+
+    def __init__(self, committed, error):
+        super().__init__(str(error))
+        self.committed = committed
+        self.error = error
+
+class IdAllocator:
+    """
+    Hands out IDs that are unique across every shard with the hi/lo scheme.
+
+    Each process reserves blocks of `block_size` IDs per table by bumping the
+    table's counter in `id_blocks` on shard 0, then serves IDs from its current
+    block in memory, so only one ID in `block_size` costs a round trip. The
+    first reservation of a table starts past the highest ID already stored on
+    any shard.
+    """
+
+    def __init__(self, engines, block_size):
+        self.engines = engines
+        self.block_size = block_size
+        self._ranges = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, model, count=1):
+        """
+        Allocate `count` IDs for a model's table.
+
+        On SQLite the reservation needs the write lock of shard 0, so call this
+        before the transaction it is for starts writing.
+        """
+        name = model.__tablename__
+        ids = []
+        with self._lock:
+            while len(ids) < count:
+                start, end = self._ranges.get(name, (0, 0))
+                if start >= end:
+                    start, end = self._reserve(model)
+                taken = min(count - len(ids), end - start)
+                ids.extend(range(start, start + taken))
+                self._ranges[name] = (start + taken, end)
+        return ids
+
+    def _reserve(self, model):
+        """Reserve the next block of a table, returning its [start, end) ID range."""
+        name = model.__tablename__
+        with self.engines[0].begin() as connection:
+            if connection.execute(select(IdBlock.next_block).where(IdBlock.name == name)).scalar() is None:
+                highest = max(self._highest_id(engine, model) for engine in self.engines)
+                connection.execute(
+                    dialect_insert(IdBlock, bind=connection)
+                    .values(name=name, next_block=highest // self.block_size + 1)
+                    .on_conflict_do_nothing(index_elements=['name'])
+                )
+            block = connection.execute(
+                update(IdBlock)
+                .where(IdBlock.name == name)
+                .values(next_block=IdBlock.next_block + 1)
+                .returning(IdBlock.next_block)
+            ).scalar_one() - 1
+        return block * self.block_size, (block + 1) * self.block_size
+
+    @staticmethod
+    def _highest_id(engine, model):
+        with engine.connect() as connection:
+            return connection.execute(select(func.max(model.id))).scalar() or 0
+
+class ShardSet:
+    """The shard engines of one app, its ID allocator and the pool that fans queries out."""
+
+    def __init__(self, engines, block_size):
+        self.engines = engines
+        self.allocator = IdAllocator(engines, block_size)
+        self.executor = ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix='shard') \
+            if len(engines) > 1 else None
+
+    @property
+    def count(self):
+        return len(self.engines)
+
+    def shard_for(self, habit_id):
+        """The index of the shard holding a habit and everything that belongs to it."""
+        return habit_id % len(self.engines)
+
+class Shards:
+    """
+    Flask extension spreading habits across the primary database (shard 0)
+    and the databases in SQLALCHEMY_SHARD_URIS (shards 1..N-1).
+
+    A habit, its check-ins, streaks and bitmap live on shard `habit_id % N`.
+    Repositories select the shard with `pin_shard` and merge results of
+    queries that span every shard with `fan_out`. With no extra shards
+    configured, nothing changes: IDs come from the database and every query
+    goes to the primary.
+    """
+
+    def init_app(self, app):
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        with app.app_context():
+            engines = [db.engine]
+        for uri in app.config.get('SQLALCHEMY_SHARD_URIS') or []:
+            engine = create_engine(uri, **engine_options(uri, options))
+            apply_pragmas(engine, app.config.get('SQLITE_PRAGMAS', {}))
+            engines.append(engine)
+        app.extensions['shards'] = ShardSet(engines, app.config.get('SHARD_ID_BLOCK_SIZE', 1000))
+
+shards = Shards()
+
+def shard_set():
+    """The shards of the current app."""
+    return current_app.extensions['shards']
+
+def is_sharded():
+    """Whether the current app has more than one shard."""
+    return shard_set().count > 1
+
+def shard_for(habit_id):
+    """The index of the shard holding a habit."""
+    return shard_set().shard_for(habit_id)
+
+def pin_shard(habit_id=None, index=None):
+    """
+    Send the rest of the session's queries to the shard of `habit_id` (or
+    shard `index`), until it is pinned elsewhere. Sessions last one request,
+    so lazy loads and refreshes of the habit's objects keep reaching its
+    shard. Does nothing when the app is not sharded.
+    """
+    if is_sharded():
+        db.session().info['shard'] = shard_for(habit_id) if habit_id is not None else index
+
+def allocate_ids(model, count=1):
+    """
+    Allocate globally unique IDs for new rows of a sharded table. Without
+    sharding the database assigns them, and this returns a list of None.
+    """
+    if not is_sharded():
+        return [None] * count
+    return shard_set().allocator.allocate(model, count)
+
+def fan_out(query):
+    """
+    Run `query(session)` on every shard concurrently and return the results
+    in shard order. Each shard gets its own short-lived session, so the
+    returned objects are detached and only their loaded attributes can be
+    read. Without sharding the query runs once on the request's session.
+    """
+    shards = shard_set()
+    if shards.count == 1:
+        return [query(db.session)]
+    futures = [shards.executor.submit(_run_on, engine, query) for engine in shards.engines]
+    return [future.result() for future in futures]
+
+def merge_sorted(results, key):
+    """Merge per-shard results that are each sorted by `key` into one sorted list."""
+    return list(heapq.merge(*results, key=key))
+
+def _run_on(engine, query):
+    with Session(bind=engine, expire_on_commit=False) as session:
+        return query(session)
@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Pool arguments only understood by QueuePool; in-memory SQLite uses a StaticPool
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+def is_memory_database(uri):
+    """Check whether a database URI points at an in-memory SQLite database."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(uri, options):
+    """Return the engine options that apply to the given database URI."""
+    if is_memory_database(uri):
+        return {key: value for key, value in options.items() if key not in QUEUE_POOL_OPTIONS}
+    return dict(options)
+
+def apply_pragmas(engine, pragmas):
+    """
+    Run the given PRAGMA statements on every new connection of a SQLite engine.
+    Foreign keys are always enforced: check-in writes rely on the habit foreign
+    key to detect missing habits instead of looking them up first.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('PRAGMA foreign_keys=ON')
+            for name, value in (pragmas or {}).items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
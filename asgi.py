@@ -0,0 +1,5 @@
+import os
+from app.asgi import create_asgi_app
+
+# Async deployment mode: uvicorn asgi:app
+app = create_asgi_app(os.getenv('FLASK_CONFIG') or 'default')
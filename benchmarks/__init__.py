@@ -0,0 +1 @@
+# Benchmarks for the habit tracker API
@@ -0,0 +1,117 @@
+"""
+Compare how the sync (gunicorn) and async (uvicorn) deployment modes scale
+with the number of concurrent clients on the habit and check-in read
+endpoints.
+
+Both servers run a single process against the same seeded database with
+caching disabled, so every request reaches the database. The sync mode gets
+`--threads` gunicorn threads; the async mode serves every client from one
+event loop.
+
+A local SQLite database answers in microseconds, so requests are CPU-bound
+and neither mode can overlap much. Each `--query-latency-ms` value other than
+0 adds that delay to every statement (see benchmarks.latency), like the round
+trip to a database server: requests then mostly wait on I/O, which the async
+mode overlaps across clients while each sync thread waits for its own. To
+measure a real server instead, pass an empty PostgreSQL database as
+`--database-url` (the async mode needs asyncpg).
+
+Usage:
+    python -m benchmarks.async_reads --habits 50 --years 2 --concurrency 1 8 32 64
+    python -m benchmarks.async_reads --query-latency-ms 0 5 --threads 4
+    python -m benchmarks.async_reads --database-url postgresql://localhost/habits_bench --query-latency-ms 0
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.http_api import ServerTarget, endpoints, git_commit, make_app, seed, summarize
+
+# Read endpoints served by the async views
+READ_ENDPOINTS = (
+    'habit_detail', 'check_ins_page', 'check_ins_range', 'day_lookup',
+    'streaks', 'streaks_batch', 'streak_summary',
+)
+
+# Each mode's server command and its app, plain or with injected query latency
+SERVERS = {
+    'sync': (
+        lambda workers, threads, app: lambda port: [
+            sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+            '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', app
+        ],
+        'run:app', 'benchmarks.latency:app',
+    ),
+    'async': (
+        lambda workers, threads, app: lambda port: [
+            sys.executable, '-m', 'uvicorn', '--workers', str(workers), '--port', str(port),
+            '--log-level', 'warning', app
+        ],
+        'asgi:app', 'benchmarks.latency:asgi_app',
+    ),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--habits', type=int, default=50, help='Habits in the dataset.')
+    parser.add_argument('--years', type=int, default=2, help='Years of check-ins per habit.')
+    parser.add_argument('--requests', type=int, default=500, help='Measured requests per concurrency level.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64],
+                        help='Concurrent client counts to measure.')
+    parser.add_argument('--workers', type=int, default=1, help='Server processes in both modes.')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker in the sync mode.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the dataset and request mix.')
+    parser.add_argument('--query-latency-ms', type=float, nargs='+',
+                        help='Delays added to every SQLite statement, one run each; 0 for none. '
+                             'Defaults to 0 and 5, or 0 with --database-url.')
+    parser.add_argument('--database-url', help='Empty database to seed instead of a temporary SQLite file.')
+    args = parser.parse_args()
+    if args.query_latency_ms is None:
+        args.query_latency_ms = [0] if args.database_url else [0, 5]
+    if args.database_url and not args.database_url.startswith('sqlite') and any(args.query_latency_ms):
+        parser.error('--query-latency-ms can only delay SQLite statements')
+
+    if args.database_url:
+        database_uri = args.database_url
+    else:
+        directory = tempfile.mkdtemp(prefix='habit-bench-')
+        database_uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    dataset = seed(make_app(database_uri, 'null'), args.habits, args.years, args.seed)
+    builders = [build for name, _, build in endpoints(dataset) if name in READ_ENDPOINTS]
+
+    results = []
+    for latency in args.query_latency_ms:
+        # Read by benchmarks.latency in the server processes
+        os.environ['BENCH_QUERY_LATENCY_MS'] = str(latency)
+        for mode, (command, plain_app, delayed_app) in SERVERS.items():
+            app = delayed_app if latency else plain_app
+            target = ServerTarget(mode, command(args.workers, args.threads, app), database_uri, 'null')
+            try:
+                for concurrency in args.concurrency:
+                    rng = random.Random(args.seed)
+                    batch = [rng.choice(builders)(rng) for _ in range(args.requests)]
+                    target.run(batch[:concurrency * 2], concurrency)
+                    began = time.perf_counter()
+                    outcomes = target.run(batch, concurrency)
+                    elapsed = time.perf_counter() - began
+                    results.append({
+                        'mode': mode, 'query_latency_ms': latency, 'concurrency': concurrency,
+                        **summarize(outcomes, elapsed)
+                    })
+            finally:
+                target.close()
+
+    print(json.dumps({
+        'commit': git_commit(),
+        'dataset': {'habits': args.habits, 'years': args.years, 'seed': args.seed,
+                    'database': database_uri.split(':', 1)[0]},
+        'settings': {'workers': args.workers, 'sync_threads': args.threads, 'endpoints': READ_ENDPOINTS},
+        'results': results,
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+Measure latency and throughput of every HTTP API endpoint against a seeded
+synthetic dataset, through the Flask test client and a local gunicorn.
+
+The dataset has `--habits` habits with `--years` years of check-ins each
+(about 70% of days checked in, generated from a fixed seed). Each endpoint
+is hit `--requests` times with randomly chosen habits and reported with
+p50/p95/p99 latency and requests per second, as JSON that can be saved
+with `--output` and compared across commits.
+
+Usage:
+    python -m benchmarks.http_api --habits 50 --years 2 --requests 200
+    python -m benchmarks.http_api --target gunicorn --workers 4 --concurrency 8
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import ProductionConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Share of days with a check-in in the synthetic dataset
+DENSITY = 0.7
+
+def make_app(database_uri, cache_backend):
+    """Create an app bound to the benchmark database."""
+    from app import create_app
+
+    return create_app(type('BenchmarkConfig', (ProductionConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'CACHE_BACKEND': cache_backend,
+    }))
+
+def seed(app, habits, years, seed_value=42):
+    """
+    Create the synthetic dataset and return what the endpoints need to
+    build requests: habit IDs, the covered date range and a scratch habit
+    that receives the benchmarked writes.
+    """
+    from app import db
+    from app.repositories.check_in_repository import CheckInRepository
+    from app.repositories.habit_repository import HabitRepository
+
+    rng = random.Random(seed_value)
+    last_day = date.today() - timedelta(days=1)
+    first_day = last_day - timedelta(days=365 * years - 1)
+    days = [first_day + timedelta(days=offset) for offset in range(365 * years)]
+
+    with app.app_context():
+        db.create_all()
+        habit_ids = []
+        for number in range(habits):
+            habit = HabitRepository.create({'name': f'Habit {number}', 'description': 'Benchmark habit'})
+            rows = [{'date': day} for day in days if rng.random() < DENSITY]
+            CheckInRepository.bulk_create(habit.id, rows)
+            habit_ids.append(habit.id)
+        scratch_id = HabitRepository.create({'name': 'Benchmark writes'}).id
+
+    return {
+        'habit_ids': habit_ids,
+        'first_day': first_day,
+        'last_day': last_day,
+        'scratch_id': scratch_id,
+        # Writes go to distinct days before the dataset so every POST creates a row
+        'write_days': (first_day - timedelta(days=offset) for offset in itertools.count(1)),
+    }
+
+def endpoints(dataset):
+    """
+    Every benchmarked endpoint as (name, share of --requests, request builder).
+    Builders take a random generator and return (method, path, JSON body).
+    """
+    ids = dataset['habit_ids']
+    first_day, last_day = dataset['first_day'], dataset['last_day']
+
+    def habit(rng):
+        return rng.choice(ids)
+
+    def day(rng):
+        return first_day + timedelta(days=rng.randrange((last_day - first_day).days + 1))
+
+    def check_in_range(rng):
+        start = day(rng)
+        return f'/habits/{habit(rng)}/check-ins?from={start}&to={min(start + timedelta(days=30), last_day)}'
+
+    return [
+        ('habits_list', 1, lambda rng: ('GET', '/habits?limit=100', None)),
+        ('habits_list_with_check_ins', 1, lambda rng: ('GET', '/habits?limit=10&include=check_ins', None)),
+        ('habit_detail', 1, lambda rng: ('GET', f'/habits/{habit(rng)}', None)),
+        ('check_ins_page', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/check-ins?limit=100', None)),
+        ('check_ins_range', 1, lambda rng: ('GET', check_in_range(rng), None)),
+        ('day_lookup', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/days/{day(rng)}', None)),
+        ('streaks', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/streaks', None)),
+        ('streaks_batch', 1, lambda rng: (
+            'GET', '/habits/streaks?ids=' + ','.join(str(i) for i in rng.sample(ids, min(10, len(ids)))), None
+        )),
+        ('streak_summary', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/streaks/summary', None)),
+        ('stats_summary', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/stats', None)),
+        ('stats_rolling', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/stats/rolling?window=7&days=90', None)),
+        ('stats_heatmap', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/stats/heatmap', None)),
+        ('stats_periods', 1, lambda rng: ('GET', f'/habits/{habit(rng)}/stats/periods?period=month', None)),
+        ('create_check_in', 1, lambda rng: (
+            'POST', f"/habits/{dataset['scratch_id']}/check-ins",
+            {'date': next(dataset['write_days']).isoformat()}
+        )),
+        # Exports stream the whole dataset, so they run far less often
+        ('export_ndjson', 0.05, lambda rng: ('GET', '/habits/export?format=ndjson', None)),
+    ]
+
+class TestClientTarget:
+    """Sends requests in-process through the Flask test client, one at a time."""
+
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def run(self, requests, concurrency):
+        return [_timed(self.send, *request) for request in requests]
+
+    def close(self):
+        pass
+
+class ServerTarget:
+    """
+    Sends requests over HTTP to a local server process started on a free port.
+    `command(port)` returns the server's command line; the app is configured
+    through the environment to use the benchmark database.
+    """
+
+    def __init__(self, name, command, database_uri, cache_backend):
+        self.name = name
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.base_url = f'http://127.0.0.1:{port}'
+        env = {
+            **os.environ,
+            'FLASK_CONFIG': 'production',
+            'DATABASE_URL': database_uri,
+            'CACHE_BACKEND': cache_backend,
+        }
+        self.process = subprocess.Popen(command(port), cwd=ROOT, env=env)
+        self._wait_until_ready()
+
+    def _wait_until_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'{self.name} exited during startup')
+            try:
+                urllib.request.urlopen(f'{self.base_url}/health', timeout=1).read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f'{self.name} did not start in time')
+
+    def send(self, method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        http_request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(http_request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def run(self, requests, concurrency):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda request: _timed(self.send, *request), requests))
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+class GunicornTarget(ServerTarget):
+    """Runs the WSGI app under gunicorn sync workers."""
+
+    def __init__(self, database_uri, cache_backend, workers):
+        super().__init__('gunicorn', lambda port: [
+            sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+            '--log-level', 'warning', 'run:app'
+        ], database_uri, cache_backend)
+
+def _timed(send, method, path, body):
+    """Send one request and return its status code and latency in seconds."""
+    began = time.perf_counter()
+    status = send(method, path, body)
+    return status, time.perf_counter() - began
+
+def measure(target, dataset, requests, concurrency, warmup, rng, names=None):
+    """
+    Drive every endpoint (or only those in `names`) through a target and
+    summarize latency and throughput.
+    """
+    results = []
+    for name, share, build in endpoints(dataset):
+        if names is not None and name not in names:
+            continue
+        count = max(1, int(requests * share))
+        target.run([build(rng) for _ in range(min(warmup, count))], concurrency)
+        batch = [build(rng) for _ in range(count)]
+
+        began = time.perf_counter()
+        outcomes = target.run(batch, concurrency)
+        elapsed = time.perf_counter() - began
+        results.append({'target': target.name, 'endpoint': name, **summarize(outcomes, elapsed)})
+    return results
+
+def summarize(outcomes, elapsed):
+    """Request count, errors, throughput and latency percentiles of (status, latency) outcomes."""
+    latencies = np.array([latency for _, latency in outcomes]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'requests': len(outcomes),
+        'errors': sum(1 for status, _ in outcomes if status >= 400),
+        'requests_per_second': round(len(outcomes) / elapsed, 1),
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+    }
+
+def git_commit():
+    """Short hash of the checked-out commit, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--habits', type=int, default=50, help='Habits in the dataset.')
+    parser.add_argument('--years', type=int, default=2, help='Years of check-ins per habit.')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint.')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint.')
+    parser.add_argument('--target', choices=('test_client', 'gunicorn', 'all'), default='all')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients against gunicorn.')
+    parser.add_argument('--cache', choices=('lru', 'redis', 'null'), default='lru', help='CACHE_BACKEND to run with.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the dataset and request mix.')
+    parser.add_argument('--output', help='Also write the JSON report to this file.')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='habit-bench-')
+    database_uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    app = make_app(database_uri, args.cache)
+    seeded = time.perf_counter()
+    dataset = seed(app, args.habits, args.years, args.seed)
+    seed_seconds = time.perf_counter() - seeded
+
+    rng = random.Random(args.seed)
+    results = []
+    names = ('test_client', 'gunicorn') if args.target == 'all' else (args.target,)
+    for name in names:
+        if name == 'test_client':
+            target = TestClientTarget(app)
+        else:
+            target = GunicornTarget(database_uri, args.cache, args.workers)
+        try:
+            results += measure(target, dataset, args.requests, args.concurrency, args.warmup, rng)
+        finally:
+            target.close()
+
+    report = {
+        'commit': git_commit(),
+        'dataset': {
+            'habits': args.habits,
+            'years': args.years,
+            'seed': args.seed,
+            'seed_seconds': round(seed_seconds, 2),
+        },
+        'settings': {
+            'cache': args.cache,
+            'gunicorn_workers': args.workers,
+            'concurrency': args.concurrency,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Server entry points for benchmarks.async_reads that delay every SQLite
+statement by BENCH_QUERY_LATENCY_MS, standing in for the round trip to a
+database server so that requests spend their time waiting on I/O.
+
+The delay is a sqlite3 trace callback, so it runs in the thread executing the
+statement: the request thread in the sync mode, and aiosqlite's connection
+thread in the async mode, which leaves the event loop free meanwhile.
+
+Usage:
+    BENCH_QUERY_LATENCY_MS=5 gunicorn benchmarks.latency:app
+    BENCH_QUERY_LATENCY_MS=5 uvicorn benchmarks.latency:asgi_app
+"""
+import os
+import time
+
+from sqlalchemy import event
+
+LATENCY = float(os.environ.get('BENCH_QUERY_LATENCY_MS', 0)) / 1000
+CONFIG = os.getenv('FLASK_CONFIG') or 'default'
+
+def delay(statement):
+    time.sleep(LATENCY)
+
+def delay_sync(flask_app):
+    """Delay the statements of every engine of a Flask app."""
+    from app import db
+
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'connect', lambda dbapi_connection, record: dbapi_connection.set_trace_callback(delay))
+
+def delay_async(engine):
+    """Delay the statements of an aiosqlite AsyncEngine."""
+    from sqlalchemy.util import await_only
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_trace_callback(dbapi_connection, record):
+        # Pool events run in SQLAlchemy's greenlet, so the aiosqlite call can be awaited
+        await_only(record.driver_connection.set_trace_callback(delay))
+
+def __getattr__(name):
+    # Build only the app the server asks for
+    if name == 'app':
+        from app import create_app
+
+        flask_app = create_app(CONFIG)
+        delay_sync(flask_app)
+        return flask_app
+    if name == 'asgi_app':
+        from app.asgi import create_asgi_app
+
+        asgi_app = create_asgi_app(CONFIG)
+        delay_sync(asgi_app.flask_app)
+        delay_async(asgi_app.engine)
+        return asgi_app
+    raise AttributeError(name)
@@ -0,0 +1,97 @@
+"""
+Compare serializing habit listings with marshmallow and the stdlib JSON
+encoder against the compiled dumpers and the orjson provider.
+
+Habits and check-ins are built in memory, so only serialization is measured.
+
+Usage:
+    python -m benchmarks.serialization --habits 1000 --check-ins 30 --repeat 5
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from app.models.check_in import CheckIn
+from app.models.habit import Habit
+from app.schemas.habit_schema import HabitQuerySchema, HabitSchema
+from app.utils.json_provider import orjson
+from app.utils.serializers import compile_many_dumper
+
+def build_habits(habits, check_ins):
+    """Build transient habits, each with `check_ins` consecutive check-ins."""
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    first_day = date(2025, 1, 1)
+    return [
+        Habit(
+            id=habit_id,
+            name=f'Habit {habit_id}',
+            description='Benchmark habit',
+            created_at=now,
+            updated_at=now,
+            longest_streak=check_ins,
+            latest_streak_days=check_ins,
+            latest_streak_last=first_day + timedelta(days=check_ins - 1),
+            check_ins=[
+                CheckIn(
+                    id=habit_id * check_ins + offset,
+                    habit_id=habit_id,
+                    date=first_day + timedelta(days=offset),
+                    notes=None,
+                    created_at=now
+                )
+                for offset in range(check_ins)
+            ]
+        )
+        for habit_id in range(1, habits + 1)
+    ]
+
+def best_of(repeat, function):
+    """Fastest wall time of `repeat` runs of function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - began)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--habits', type=int, default=1000, help='Habits in the listing.')
+    parser.add_argument('--check-ins', type=int, default=30, help='Check-ins included per habit.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per variant; the fastest is reported.')
+    args = parser.parse_args()
+
+    habits = build_habits(args.habits, args.check_ins)
+    only = (*HabitQuerySchema.SELECTABLE_FIELDS, 'check_ins')
+    schema = HabitSchema(only=only, many=True)
+    dump_many = compile_many_dumper(HabitSchema(only=only))
+    assert dump_many(habits) == schema.dump(habits)
+
+    variants = {
+        'marshmallow_dump': lambda: schema.dump(habits),
+        'compiled_dump': lambda: dump_many(habits),
+        'marshmallow_dump_json': lambda: json.dumps(schema.dump(habits)),
+        'compiled_dump_json': lambda: json.dumps(dump_many(habits)),
+    }
+    if orjson is not None:
+        variants['compiled_dump_orjson'] = lambda: orjson.dumps(dump_many(habits))
+
+    timings = {name: best_of(args.repeat, function) for name, function in variants.items()}
+    baseline = timings['marshmallow_dump_json']
+    report = {
+        'habits': args.habits,
+        'check_ins_per_habit': args.check_ins,
+        'results': [
+            {
+                'variant': name,
+                'seconds': round(seconds, 4),
+                'speedup': round(baseline / seconds, 2),
+            }
+            for name, seconds in timings.items()
+        ],
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
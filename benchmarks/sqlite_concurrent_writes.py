@@ -0,0 +1,113 @@
+"""
+Measure concurrent check-in write throughput against a SQLite file with the
+default SQLite settings and with the tuned SQLITE_PRAGMAS profile.
+
+Each worker process builds its own app (like a gunicorn worker) and posts
+check-ins through the Flask test client, so the measured path includes
+validation and streak index maintenance.
+
+Usage:
+    python -m benchmarks.sqlite_concurrent_writes --workers 4 --writes 200
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from config import ProductionConfig
+
+# Both profiles enforce foreign keys, which every app connection turns on
+PROFILES = {
+    # busy_timeout matches the 5 second default of Python's sqlite3 module
+    'default': {'busy_timeout': 5000},
+    'tuned': ProductionConfig.SQLITE_PRAGMAS,
+}
+
+def make_app(database_uri, pragmas):
+    """Create an app bound to the benchmark database with the given pragmas."""
+    from app import create_app
+
+    return create_app(type('BenchmarkConfig', (ProductionConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLITE_PRAGMAS': pragmas,
+        'CACHE_BACKEND': 'null',
+    }))
+
+def run_worker(database_uri, pragmas, habit_id, writes, start, results):
+    """Post `writes` check-ins for one habit and report successes and failures."""
+    app = make_app(database_uri, pragmas)
+    client = app.test_client()
+    first_day = date(2000, 1, 1)
+    ok = failed = 0
+    start.wait()
+    for offset in range(writes):
+        day = first_day + timedelta(days=offset)
+        response = client.post(f'/habits/{habit_id}/check-ins', json={'date': day.isoformat()})
+        if response.status_code == 201:
+            ok += 1
+        else:
+            failed += 1
+    results.put((ok, failed))
+
+def run_profile(profile, workers, writes):
+    """Run all workers against a fresh database and return throughput figures."""
+    from app import db
+
+    directory = tempfile.mkdtemp(prefix='habit-bench-')
+    database_uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    pragmas = PROFILES[profile]
+
+    app = make_app(database_uri, pragmas)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    habit_ids = [
+        client.post('/habits', json={'name': f'Habit {n}'}).get_json()['id']
+        for n in range(workers)
+    ]
+
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(database_uri, pragmas, habit_id, writes, start, results)
+        )
+        for habit_id in habit_ids
+    ]
+    for process in processes:
+        process.start()
+    # Give every worker time to build its app before releasing them together
+    time.sleep(2)
+    began = time.perf_counter()
+    start.set()
+    totals = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+
+    succeeded = sum(ok for ok, _ in totals)
+    return {
+        'profile': profile,
+        'pragmas': pragmas,
+        'workers': workers,
+        'writes_per_worker': writes,
+        'succeeded': succeeded,
+        'failed': sum(failed for _, failed in totals),
+        'seconds': round(elapsed, 3),
+        'writes_per_second': round(succeeded / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent writer processes.')
+    parser.add_argument('--writes', type=int, default=200, help='Check-ins posted by each worker.')
+    args = parser.parse_args()
+
+    report = [run_profile(profile, args.workers, args.writes) for profile in PROFILES]
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
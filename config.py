@@ -6,6 +6,83 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-muy-secreta'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_SORT_KEYS = False
+    # Encode responses with orjson when it is installed
+    JSON_USE_ORJSON = os.environ.get('JSON_USE_ORJSON', 'true').lower() == 'true'
+    CHECK_IN_BULK_MAX_ROWS = int(os.environ.get('CHECK_IN_BULK_MAX_ROWS', 10000))
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
+    # Read-through cache: 'lru' (per process), 'redis' (shared between workers) or 'null'
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'lru')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 4096))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Responses to POST /habits/<id>/check-ins sent with an Idempotency-Key header
+    # are kept this long (seconds) so retries get them back without a new write
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 10000))
+    
+    # Write-behind mode: POST /habits/<id>/check-ins answers 202 with a ticket and a
+    # background thread group-commits queued check-ins every INTERVAL_MS
+    CHECK_IN_WRITE_BEHIND = os.environ.get('CHECK_IN_WRITE_BEHIND', 'false').lower() == 'true'
+    CHECK_IN_WRITE_BEHIND_INTERVAL_MS = int(os.environ.get('CHECK_IN_WRITE_BEHIND_INTERVAL_MS', 5))
+    CHECK_IN_WRITE_BEHIND_MAX_BATCH = int(os.environ.get('CHECK_IN_WRITE_BEHIND_MAX_BATCH', 500))
+    CHECK_IN_WRITE_BEHIND_MAX_PENDING = int(os.environ.get('CHECK_IN_WRITE_BEHIND_MAX_PENDING', 10000))
+    
+    # `flask check-ins archive` moves check-ins older than CHECK_IN_ARCHIVE_AFTER_DAYS out
+    # of the database into per-habit columnar segment files in CHECK_IN_ARCHIVE_DIR
+    # (default instance/archive); reads merge them back in
+    CHECK_IN_ARCHIVE_DIR = os.environ.get('CHECK_IN_ARCHIVE_DIR')
+    CHECK_IN_ARCHIVE_AFTER_DAYS = int(os.environ.get('CHECK_IN_ARCHIVE_AFTER_DAYS', 365))
+    
+    # Opt-in request profiling: Server-Timing headers, /metrics, and cProfile dumps
+    # of sampled requests slower than PROFILING_SLOW_MS (written to PROFILING_DIR)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_SLOW_MS = int(os.environ.get('PROFILING_SLOW_MS', 500))
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')
+    
+    # Server-Sent Events stream of habit and check-in changes at GET /habits/events:
+    # 'local' (per process), 'redis' (shared between workers) or 'null'. Each client
+    # buffers up to EVENTS_BUFFER_SIZE events before they are coalesced or dropped
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'local')
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+    EVENTS_BUFFER_SIZE = int(os.environ.get('EVENTS_BUFFER_SIZE', 100))
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 100))
+    EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+    
+    # Read replicas (comma-separated URIs) that mirror the primary database. Repository
+    # read methods are served by one of them unless the request has already written
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    # Seconds a client keeps reading from the primary after a write, to cover replication lag
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Extra shard databases (comma-separated URIs); the primary is shard 0 and each habit
+    # lives with its check-ins on shard `habit_id % N`. IDs of sharded tables are then
+    # reserved in blocks of SHARD_ID_BLOCK_SIZE from the id_blocks table on the primary
+    SQLALCHEMY_SHARD_URIS = [uri for uri in os.environ.get('DATABASE_SHARD_URLS', '').split(',') if uri]
+    SHARD_ID_BLOCK_SIZE = int(os.environ.get('SHARD_ID_BLOCK_SIZE', 1000))
+    
+    # Connection pool settings (pool size/overflow/timeout are skipped for in-memory SQLite)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    }
+    
+    # Pragmas run on every new SQLite connection; set to {} to keep SQLite defaults.
+    # WAL lets readers run alongside the single writer, synchronous=NORMAL fsyncs on
+    # checkpoints instead of every commit, and busy_timeout makes writers wait for the
+    # lock instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    }
 
 class DevelopmentConfig(Config):
     """Configuración para entorno de desarrollo."""
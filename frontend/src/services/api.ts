@@ -1,4 +1,5 @@
 import axios from 'axios';
+import type { AxiosResponse } from 'axios';
 import type { Habit, CheckIn, Streak } from '../types';
 
 const API_URL = 'http://localhost:5000';
@@ -10,10 +11,25 @@ const api = axios.create({
   },
 });
 
+const nextPageUrl = (link: string | undefined): string | null => {
+  const match = link?.match(/<([^>]+)>;\s*rel="next"/);
+  return match ? match[1] : null;
+};
+
 export const habitService = {
   getAll: async (): Promise<Habit[]> => {
-    const response = await api.get('/habits');
-    return response.data;
+    // The list is paginated: follow the Link rel="next" header until the last page
+    const habits: Habit[] = [];
+    let url: string | null = '/habits';
+    let params: Record<string, string> | undefined = { include: 'check_ins' };
+    while (url) {
+      const response: AxiosResponse<Habit[]> = await api.get<Habit[]>(url, { params });
+      habits.push(...response.data);
+      url = nextPageUrl(response.headers['link'] as string | undefined);
+      // The next link already carries the query string
+      params = undefined;
+    }
+    return habits;
   },
 
   getById: async (id: number): Promise<Habit> => {
@@ -4,6 +4,8 @@ export interface Habit {
   description: string | null;
   created_at: string;
   updated_at: string;
+  current_streak: number;
+  longest_streak: number;
   check_ins?: CheckIn[];
 }
 
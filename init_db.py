@@ -1,3 +1,5 @@
+from flask_migrate import stamp
+
 from app import create_app, db
 from app.models.habit import Habit
 from app.models.check_in import CheckIn
@@ -11,6 +13,8 @@ with app.app_context():
     db.drop_all()
     # Create all tables
     db.create_all()
+    # Record the schema as fully migrated so later `flask db upgrade` runs only new migrations
+    stamp()
     print("Database tables created successfully!")
     
     # Verify tables were created
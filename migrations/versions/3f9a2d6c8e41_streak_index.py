@@ -0,0 +1,93 @@
+"""streak index
+
+Revision ID: 3f9a2d6c8e41
+Revises: 0127db206ac9
+Create Date: 2026-10-18 15:02:31.284906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app import archive
+from app.repositories.streak_repository import StreakRepository
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2d6c8e41'
+down_revision = '0127db206ac9'
+branch_labels = None
+depends_on = None
+
+habits = sa.table('habits',
+    sa.column('id', sa.Integer()),
+    sa.column('longest_streak', sa.Integer()),
+    sa.column('latest_streak_days', sa.Integer()),
+    sa.column('latest_streak_last', sa.Date())
+)
+check_ins = sa.table('check_ins',
+    sa.column('habit_id', sa.Integer()),
+    sa.column('date', sa.Date())
+)
+streaks = sa.table('streaks',
+    sa.column('habit_id', sa.Integer()),
+    sa.column('first', sa.Date()),
+    sa.column('last', sa.Date()),
+    sa.column('days', sa.Integer())
+)
+
+
+def upgrade():
+    # Existing rows start at zero; the backfill below sets the real counters
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('longest_streak', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('latest_streak_days', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('latest_streak_last', sa.Date(), nullable=True))
+
+    op.create_table('streaks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('first', sa.Date(), nullable=False),
+    sa.Column('last', sa.Date(), nullable=False),
+    sa.Column('days', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('habit_id', 'first', name='uix_streak_habit_first')
+    )
+    with op.batch_alter_table('streaks', schema=None) as batch_op:
+        batch_op.create_index('ix_streaks_habit_last', ['habit_id', 'last'], unique=False)
+
+    backfill()
+
+
+def backfill():
+    """Same result as `flask streaks rebuild`, on the migration's connection."""
+    bind = op.get_bind()
+    dates = {}
+    for habit_id, day in bind.execute(sa.select(check_ins.c.habit_id, check_ins.c.date)):
+        dates.setdefault(habit_id, set()).add(day)
+    for habit_id in bind.execute(sa.select(habits.c.id)).scalars().all():
+        segments = StreakRepository.segments_from_dates({*dates.get(habit_id, ()), *archive.dates(habit_id)})
+        if not segments:
+            continue
+        bind.execute(streaks.insert(), [dict(segment, habit_id=habit_id) for segment in segments])
+        bind.execute(
+            habits.update()
+            .where(habits.c.id == habit_id)
+            .values(
+                longest_streak=max(segment['days'] for segment in segments),
+                latest_streak_days=segments[-1]['days'],
+                latest_streak_last=segments[-1]['last']
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('streaks', schema=None) as batch_op:
+        batch_op.drop_index('ix_streaks_habit_last')
+
+    op.drop_table('streaks')
+    # Plain ALTER TABLE ... DROP COLUMN: a batch copy of habits would have to drop a
+    # table the check-ins still reference
+    op.drop_column('habits', 'latest_streak_last')
+    op.drop_column('habits', 'latest_streak_days')
+    op.drop_column('habits', 'longest_streak')
@@ -0,0 +1,36 @@
+"""query indexes
+
+Revision ID: 5c1e9a7d3b24
+Revises: 8e3c5a1f7b62
+Create Date: 2026-10-18 15:10:02.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e9a7d3b24'
+down_revision = '8e3c5a1f7b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Check-in reads and writes are already served by uix_habit_date (habit_id, date)
+    # and habits by their primary key; see tests/test_query_plans.py
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        # count() and max(updated_at) of the collection ETag, read from the index alone
+        batch_op.create_index('ix_habits_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('streaks', schema=None) as batch_op:
+        # max(days) per habit when refreshing the streak counters on every check-in write
+        batch_op.create_index('ix_streaks_habit_days', ['habit_id', 'days'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('streaks', schema=None) as batch_op:
+        batch_op.drop_index('ix_streaks_habit_days')
+
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.drop_index('ix_habits_updated_at')
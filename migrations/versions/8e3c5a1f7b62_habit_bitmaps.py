@@ -0,0 +1,62 @@
+"""habit bitmaps
+
+Revision ID: 8e3c5a1f7b62
+Revises: 3f9a2d6c8e41
+Create Date: 2026-10-18 15:06:12.907154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app import archive
+from app.utils.bitmap import DayBitmap
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3c5a1f7b62'
+down_revision = '3f9a2d6c8e41'
+branch_labels = None
+depends_on = None
+
+habits = sa.table('habits',
+    sa.column('id', sa.Integer())
+)
+check_ins = sa.table('check_ins',
+    sa.column('habit_id', sa.Integer()),
+    sa.column('date', sa.Date())
+)
+habit_bitmaps = sa.table('habit_bitmaps',
+    sa.column('habit_id', sa.Integer()),
+    sa.column('origin', sa.Date()),
+    sa.column('bits', sa.LargeBinary())
+)
+
+
+def upgrade():
+    op.create_table('habit_bitmaps',
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('origin', sa.Date(), nullable=True),
+    sa.Column('bits', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ),
+    sa.PrimaryKeyConstraint('habit_id')
+    )
+
+    backfill()
+
+
+def backfill():
+    """Same result as `flask bitmaps rebuild`, on the migration's connection."""
+    bind = op.get_bind()
+    dates = {}
+    for habit_id, day in bind.execute(sa.select(check_ins.c.habit_id, check_ins.c.date)):
+        dates.setdefault(habit_id, []).append(day)
+    rows = []
+    for habit_id in bind.execute(sa.select(habits.c.id)).scalars().all():
+        bitmap = DayBitmap.from_dates(dates.get(habit_id, []) + archive.dates(habit_id))
+        rows.append({'habit_id': habit_id, 'origin': bitmap.origin, 'bits': bytes(bitmap.bits)})
+    if rows:
+        bind.execute(habit_bitmaps.insert(), rows)
+
+
+def downgrade():
+    op.drop_table('habit_bitmaps')
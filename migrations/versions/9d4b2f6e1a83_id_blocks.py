@@ -0,0 +1,29 @@
+"""id blocks
+
+Revision ID: 9d4b2f6e1a83
+Revises: 5c1e9a7d3b24
+Create Date: 2026-10-18 15:42:17.503961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4b2f6e1a83'
+down_revision = '5c1e9a7d3b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # hi/lo ID block counters of the sharded tables, only used on the primary (shard 0)
+    op.create_table('id_blocks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_block', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('id_blocks')
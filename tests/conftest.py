@@ -0,0 +1,15 @@
+import pytest
+
+from app import create_app
+from config import TestingConfig
+
+@pytest.fixture
+def make_app():
+    """
+    Build an app from TestingConfig with some settings overridden. The config
+    class stays local to the test rather than being registered in `config`.
+    Pass `factory=create_asgi_app` to build the async app instead.
+    """
+    def make(factory=create_app, **overrides):
+        return factory(type('TestConfig', (TestingConfig,), overrides))
+    return make
@@ -0,0 +1,64 @@
+import base64
+import unittest
+from datetime import date
+
+import numpy as np
+
+from app.utils import analytics
+
+def ordinals(*days):
+    return analytics.to_ordinals([date(2025, 6, day) for day in days])
+
+class AnalyticsTestCase(unittest.TestCase):
+    """Test case for the vectorized analytics helpers."""
+    
+    def test_streak_runs(self):
+        """Test that runs of consecutive days are found in order."""
+        firsts, lengths = analytics.streak_runs(ordinals(1, 2, 3, 5, 8, 9))
+        self.assertEqual([analytics.to_date(first).day for first in firsts], [1, 5, 8])
+        self.assertEqual(lengths.tolist(), [3, 1, 2])
+    
+    def test_summary(self):
+        """Test totals and streak statistics relative to today."""
+        today = date(2025, 6, 10).toordinal()
+        result = analytics.summary(ordinals(1, 2, 3, 9, 10), today)
+        self.assertEqual(result['total_check_ins'], 5)
+        self.assertEqual(result['tracked_days'], 10)
+        self.assertEqual(result['completion_rate'], 0.5)
+        self.assertEqual(result['current_streak'], 2)
+        self.assertEqual(result['longest_streak'], 3)
+        self.assertEqual(analytics.summary(np.empty(0, dtype=np.int64), today)['total_check_ins'], 0)
+    
+    def test_day_of_week_counts(self):
+        """Test the weekday distribution (2025-06-02 was a Monday)."""
+        counts = analytics.day_of_week_counts(ordinals(2, 9, 3, 8))
+        self.assertEqual(counts['Monday'], 2)
+        self.assertEqual(counts['Tuesday'], 1)
+        self.assertEqual(counts['Sunday'], 1)
+    
+    def test_rolling_completion(self):
+        """Test that each rate covers the window ending on that day."""
+        start = date(2025, 6, 3).toordinal()
+        rates = analytics.rolling_completion(ordinals(1, 2, 3, 4), start, start + 2, window=2)
+        self.assertEqual(rates.tolist(), [1.0, 1.0, 0.5])
+    
+    def test_heatmap_bitmap(self):
+        """Test that days map to bits least significant first."""
+        start = date(2025, 6, 1).toordinal()
+        bitmap = analytics.heatmap_bitmap(ordinals(1, 3, 9), start, start + 9)
+        self.assertEqual(base64.b64decode(bitmap), bytes([0b00000101, 0b00000001]))
+    
+    def test_period_counts(self):
+        """Test weekly and monthly aggregation."""
+        days = analytics.to_ordinals([date(2025, 1, 31), date(2025, 2, 1), date(2025, 2, 2)])
+        starts, lengths, counts = analytics.period_counts(days, 'month')
+        self.assertEqual([analytics.to_date(start) for start in starts], [date(2025, 1, 1), date(2025, 2, 1)])
+        self.assertEqual(lengths.tolist(), [31, 28])
+        self.assertEqual(counts.tolist(), [1, 2])
+        
+        starts, lengths, counts = analytics.period_counts(days, 'week')
+        self.assertEqual([analytics.to_date(start) for start in starts], [date(2025, 1, 27)])
+        self.assertEqual(counts.tolist(), [3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import pytest
 from run import app
-from app import db
+from app import cache, db
 from flask import json
 
 @pytest.fixture
@@ -13,6 +13,7 @@ def client():
         yield client
         with app.app_context():
             db.drop_all()
+            cache.clear()
 
 def test_create_habit(client):
     # Valid habit
@@ -61,4 +62,525 @@ def test_check_in_not_found(client):
 
     # Delete non-existent check-in
     response = client.delete(f'/habits/{habit_id}/check-ins/999')
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_duplicate_check_in_conflicts(client):
+    response = client.post('/habits', json={'name': 'Stretch'})
+    habit_id = response.get_json()['id']
+
+    assert client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'}).status_code == 201
+    response = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'})
+    assert response.status_code == 409
+    assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 1
+
+def test_check_in_idempotency_key(client):
+    from sqlalchemy import event
+    from app import db
+
+    response = client.post('/habits', json={'name': 'Walk'})
+    habit_id = response.get_json()['id']
+    url = f'/habits/{habit_id}/check-ins'
+
+    first = client.post(url, json={'date': '2025-06-10'}, headers={'Idempotency-Key': 'retry-1'})
+    assert first.status_code == 201
+
+    # A retry gets the stored response back without running any SQL
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with client.application.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        retry = client.post(url, json={'date': '2025-06-10'}, headers={'Idempotency-Key': 'retry-1'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert statements == []
+    assert retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+
+    # The same key with another body, or on another habit's URL
+    response = client.post(url, json={'date': '2025-06-11'}, headers={'Idempotency-Key': 'retry-1'})
+    assert response.status_code == 422
+    response = client.post('/habits/999/check-ins', json={'date': '2025-06-10'}, headers={'Idempotency-Key': 'retry-1'})
+    assert response.status_code == 404
+
+    assert client.post(url, json={'date': '2025-06-12'}, headers={'Idempotency-Key': ''}).status_code == 400
+
+def test_idempotency_claims_are_shared():
+    from app.utils.cache import LRUCache
+    from app.utils.idempotency import IdempotencyStore
+
+    # Two workers' stores on one backend, as with CACHE_BACKEND=redis
+    backend = LRUCache()
+    first, second = IdempotencyStore(backend), IdempotencyStore(backend)
+    assert first.begin('key', 'abc') is None
+    assert second.begin('key', 'abc') == 'in_progress'
+    first.complete('key', 'abc', '{"id": 1}', 201, {'Content-Type': 'application/json'})
+    assert second.begin('key', 'abc') == ('abc', '{"id": 1}', 201, {'Content-Type': 'application/json'})
+
+    # A released claim can be taken by the retry
+    assert first.begin('other', 'abc') is None
+    first.release('other')
+    assert second.begin('other', 'abc') is None
+
+def test_streak_index_merges_and_splits(client):
+    # Create habit
+    response = client.post('/habits', json={'name': 'Meditate'})
+    habit_id = response.get_json()['id']
+
+    # Two separate days form two streaks
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'})
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-12'})
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+    assert [s['days'] for s in streaks] == [1, 1]
+
+    # Filling the gap merges them
+    response = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-11'})
+    middle_id = response.get_json()['id']
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+    assert streaks == [{'first': '2025-06-10', 'last': '2025-06-12', 'days': 3}]
+
+    # Removing the middle day splits them again
+    response = client.delete(f'/habits/{habit_id}/check-ins/{middle_id}')
+    assert response.status_code == 200
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+    assert streaks == [
+        {'first': '2025-06-10', 'last': '2025-06-10', 'days': 1},
+        {'first': '2025-06-12', 'last': '2025-06-12', 'days': 1},
+    ]
+
+def test_rebuild_streaks_command(client):
+    from datetime import date
+    from app.models.check_in import CheckIn
+
+    # Create habit and insert check-ins without maintaining the index
+    response = client.post('/habits', json={'name': 'Stretch'})
+    habit_id = response.get_json()['id']
+    with app.app_context():
+        db.session.add_all([
+            CheckIn(habit_id=habit_id, date=date(2025, 6, day)) for day in (1, 2, 3, 5)
+        ])
+        db.session.commit()
+    assert client.get(f'/habits/{habit_id}/streaks').get_json() == []
+
+    # Backfill the index
+    result = app.test_cli_runner().invoke(args=['streaks', 'rebuild'])
+    assert result.exit_code == 0
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+    assert [s['days'] for s in streaks] == [3, 1]
+
+def test_streak_summary(client):
+    from datetime import datetime, timedelta
+
+    # Create habit
+    response = client.post('/habits', json={'name': 'Journal'})
+    habit_id = response.get_json()['id']
+    assert response.get_json()['current_streak'] == 0
+
+    # An old three-day streak and a live two-day streak
+    today = datetime.utcnow().date()
+    days = [today - timedelta(days=n) for n in (10, 9, 8, 1, 0)]
+    for day in days:
+        client.post(f'/habits/{habit_id}/check-ins', json={'date': day.isoformat()})
+
+    response = client.get(f'/habits/{habit_id}/streaks/summary')
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['current_streak'] == 2
+    assert summary['longest_streak'] == 3
+    assert summary['last_check_in'] == today.isoformat()
+
+    # Same counters are exposed on the habit itself
+    habit = client.get(f'/habits/{habit_id}').get_json()
+    assert habit['current_streak'] == 2
+    assert habit['longest_streak'] == 3
+
+    # Non-existent habit
+    response = client.get('/habits/999/streaks/summary')
+    assert response.status_code == 404
+
+def test_bulk_create_check_ins(client):
+    # Create habit with one existing check-in
+    response = client.post('/habits', json={'name': 'Walk'})
+    habit_id = response.get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-02'})
+
+    response = client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': '2025-06-01', 'notes': 'first'},
+        {'date': '2025-06-02'},
+        {'date': '2025-06-03'},
+        {'date': '2025-06-03'},
+        {'date': '2999-01-01'},
+    ])
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r['status'] for r in data['results']] == [
+        'created', 'duplicate', 'created', 'duplicate', 'error'
+    ]
+    assert (data['created'], data['duplicate'], data['error']) == (2, 2, 1)
+
+    # Streak index reflects the imported days
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+    assert streaks == [{'first': '2025-06-01', 'last': '2025-06-03', 'days': 3}]
+
+def test_bulk_create_check_ins_ndjson(client):
+    response = client.post('/habits', json={'name': 'Swim'})
+    habit_id = response.get_json()['id']
+
+    body = '{"date": "2025-05-01"}\n\n{"date": "2025-05-02"}\n'
+    response = client.post(f'/habits/{habit_id}/check-ins/bulk', data=body,
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 2
+
+    # Malformed line
+    response = client.post(f'/habits/{habit_id}/check-ins/bulk', data='{"date": ',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 400
+
+    # Non-existent habit
+    response = client.post('/habits/999/check-ins/bulk', json=[{'date': '2025-05-01'}])
+    assert response.status_code == 404
+
+def test_bulk_create_keeps_streaks_in_sync(client):
+    habit_id = client.post('/habits', json={'name': 'Journal'}).get_json()['id']
+
+    # A few rows are applied to the streak index one day at a time
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': f'2025-01-{day:02d}'} for day in (1, 2, 4)
+    ])
+    summary = client.get(f'/habits/{habit_id}/streaks/summary').get_json()
+    assert summary['longest_streak'] == 2
+
+    # Larger imports rebuild it, here bridging the gap on the 3rd
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': f'2025-01-{day:02d}'} for day in range(3, 25)
+    ])
+    summary = client.get(f'/habits/{habit_id}/streaks/summary').get_json()
+    assert summary['longest_streak'] == 24
+    assert client.get(f'/habits/{habit_id}/days/2025-01-03').get_json()['checked_in'] is True
+
+def test_check_ins_pagination(client):
+    response = client.post('/habits', json={'name': 'Floss'})
+    habit_id = response.get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': f'2025-03-{day:02d}'} for day in range(1, 11)
+    ])
+
+    # Walk the pages following the cursor
+    dates = []
+    response = client.get(f'/habits/{habit_id}/check-ins?limit=4&from=2025-03-02&to=2025-03-09')
+    while True:
+        assert response.status_code == 200
+        dates.extend(check_in['date'] for check_in in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers['Link']
+        response = client.get(f'/habits/{habit_id}/check-ins?limit=4&from=2025-03-02&to=2025-03-09&cursor={cursor}')
+    assert dates == [f'2025-03-{day:02d}' for day in range(9, 1, -1)]
+
+    # Invalid parameters
+    assert client.get(f'/habits/{habit_id}/check-ins?cursor=garbage').status_code == 400
+    assert client.get(f'/habits/{habit_id}/check-ins?limit=0').status_code == 400
+    assert client.get(f'/habits/{habit_id}/check-ins?from=2025-03-05&to=2025-03-01').status_code == 400
+
+def test_habits_listing_pagination_and_projection(client):
+    from sqlalchemy import event
+
+    for name in ('A', 'B', 'C'):
+        habit_id = client.post('/habits', json={'name': name}).get_json()['id']
+        client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'})
+
+    # Pages follow the cursor
+    response = client.get('/habits?limit=2')
+    assert [h['name'] for h in response.get_json()] == ['A', 'B']
+    cursor = response.headers['X-Next-Cursor']
+    response = client.get(f'/habits?limit=2&cursor={cursor}')
+    assert [h['name'] for h in response.get_json()] == ['C']
+    assert 'X-Next-Cursor' not in response.headers
+
+    # Sparse fields and no relationships by default
+    habits = client.get('/habits?fields=name').get_json()
+    assert habits[0] == {'name': 'A'}
+
+    # Check-ins are eager-loaded in one extra query rather than one per habit
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        habits = client.get('/habits?include=check_ins').get_json()
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert all(len(habit['check_ins']) == 1 for habit in habits)
+    assert len(statements) == 3  # ETag validators, habits page, check-ins
+
+    # Invalid parameters
+    assert client.get('/habits?fields=secret').status_code == 400
+    assert client.get('/habits?include=owner').status_code == 400
+    assert client.get('/habits?cursor=garbage').status_code == 400
+
+def test_export_history(client):
+    import csv
+    import io
+
+    habit_id = client.post('/habits', json={'name': 'Read'}).get_json()['id']
+    client.post('/habits', json={'name': 'Nap'})
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': '2025-06-01', 'notes': 'chapter 1, part "a"'},
+        {'date': '2025-06-02'},
+    ])
+
+    # NDJSON: a habit line followed by its check-in lines
+    response = client.get('/habits/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['type'] for line in lines] == ['habit', 'check_in', 'check_in', 'habit']
+    assert lines[1]['notes'] == 'chapter 1, part "a"'
+
+    # CSV: one record per check-in, or per habit without check-ins
+    response = client.get('/habits/export?format=csv')
+    assert response.mimetype == 'text/csv'
+    records = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['habit_name'] for r in records] == ['Read', 'Read', 'Nap']
+    assert records[2]['check_in_id'] == ''
+
+    # Unknown format
+    assert client.get('/habits/export?format=xml').status_code == 400
+
+
+def test_reads_are_cached_and_invalidated_on_writes(client):
+    habit_id = client.post('/habits', json={'name': 'Cook'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'})
+
+    # Warm the cache
+    client.get(f'/habits/{habit_id}')
+    client.get(f'/habits/{habit_id}/check-ins')
+    client.get(f'/habits/{habit_id}/streaks')
+
+    # Cached reads do not touch the database
+    from sqlalchemy import event
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get(f'/habits/{habit_id}').get_json()['name'] == 'Cook'
+        assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 1
+        assert client.get(f'/habits/{habit_id}/streaks').get_json()[0]['days'] == 1
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert statements == []
+
+    # Writes invalidate the affected entries
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-11'})
+    assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 2
+    assert client.get(f'/habits/{habit_id}/streaks').get_json()[0]['days'] == 2
+    client.put(f'/habits/{habit_id}', json={'name': 'Bake'})
+    assert client.get(f'/habits/{habit_id}').get_json()['name'] == 'Bake'
+    assert client.get(f'/habits/{habit_id}/check-ins').get_json()[0]['habit']['name'] == 'Bake'
+    client.delete(f'/habits/{habit_id}')
+    assert client.get(f'/habits/{habit_id}').status_code == 404
+    assert client.get(f'/habits/{habit_id}/streaks').status_code == 404
+
+def test_conditional_requests(client):
+    habit_id = client.post('/habits', json={'name': 'Run'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'})
+
+    for url in ('/habits', f'/habits/{habit_id}', f'/habits/{habit_id}/check-ins'):
+        response = client.get(url)
+        etag = response.headers['ETag']
+
+        # Unchanged resources answer 304 with an empty body
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.get_data() == b''
+
+    for url in (f'/habits/{habit_id}', f'/habits/{habit_id}/check-ins'):
+        last_modified = client.get(url).headers['Last-Modified']
+        assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    # A check-in write changes the validators of the habit and its check-ins
+    etags = {url: client.get(url).headers['ETag']
+             for url in ('/habits', f'/habits/{habit_id}', f'/habits/{habit_id}/check-ins')}
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-11'})
+    for url, etag in etags.items():
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    # Different query parameters are different representations
+    etag = client.get('/habits').headers['ETag']
+    assert client.get('/habits?fields=name', headers={'If-None-Match': etag}).status_code == 200
+
+    # Deleting a habit leaves max(updated_at) where it was, so the collection only has an ETag
+    other_id = client.post('/habits', json={'name': 'Swim'}).get_json()['id']
+    response = client.get('/habits')
+    assert 'Last-Modified' not in response.headers
+    client.delete(f'/habits/{other_id}')
+    assert client.get('/habits', headers={'If-None-Match': response.headers['ETag']}).status_code == 200
+def test_batch_streaks(client):
+    first_id = client.post('/habits', json={'name': 'A'}).get_json()['id']
+    second_id = client.post('/habits', json={'name': 'B'}).get_json()['id']
+    third_id = client.post('/habits', json={'name': 'C'}).get_json()['id']
+    client.post(f'/habits/{first_id}/check-ins/bulk', json=[
+        {'date': '2025-06-01'}, {'date': '2025-06-02'}, {'date': '2025-06-04'}
+    ])
+    client.post(f'/habits/{third_id}/check-ins', json={'date': '2025-06-01'})
+
+    # Requested habits only, unknown IDs left out, one query
+    from sqlalchemy import event
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        response = client.get(f'/habits/streaks?ids={first_id},{second_id},999')
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    assert response.status_code == 200
+    assert len(statements) == 1
+    result = response.get_json()
+    assert [entry['habit_id'] for entry in result] == [first_id, second_id]
+    assert [s['days'] for s in result[0]['streaks']] == [2, 1]
+    assert result[1]['streaks'] == []
+
+    # All habits
+    result = client.get('/habits/streaks').get_json()
+    assert [entry['habit_id'] for entry in result] == [first_id, second_id, third_id]
+
+    # Invalid IDs
+    assert client.get('/habits/streaks?ids=1,abc').status_code == 400
+    assert client.get('/habits/streaks?ids=1,²').status_code == 400
+
+
+def test_validators_change_with_the_date(client, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.utils import dates
+
+    def freeze(day):
+        monkeypatch.setattr(dates, 'datetime', type('FrozenDatetime', (datetime,), {
+            'utcnow': classmethod(lambda cls: datetime.combine(day, datetime.min.time()))
+        }))
+
+    today = datetime.utcnow().date()
+    freeze(today)
+    habit_id = client.post('/habits', json={'name': 'Run'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': today.isoformat()})
+    urls = ('/habits', f'/habits/{habit_id}', f'/habits/{habit_id}/check-ins')
+    before = {url: client.get(url) for url in urls}
+    assert before[f'/habits/{habit_id}'].get_json()['current_streak'] == 1
+
+    # Nothing was written, but the streak has lapsed since
+    freeze(today + timedelta(days=2))
+    for url, response in before.items():
+        assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 200
+        if url != '/habits':
+            assert client.get(url, headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 200
+    assert client.get('/habits').get_json()[0]['current_streak'] == 0
+    assert client.get(f'/habits/{habit_id}').get_json()['current_streak'] == 0
+    assert client.get(f'/habits/{habit_id}/check-ins').get_json()[0]['habit']['current_streak'] == 0
+
+def test_habit_stats(client):
+    habit_id = client.post('/habits', json={'name': 'Piano'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[
+        {'date': '2025-06-02'}, {'date': '2025-06-03'}, {'date': '2025-06-09'}
+    ])
+
+    stats = client.get(f'/habits/{habit_id}/stats').get_json()
+    assert stats['total_check_ins'] == 3
+    assert stats['longest_streak'] == 2
+    assert stats['day_of_week']['Monday'] == 2
+
+    heatmap = client.get(f'/habits/{habit_id}/stats/heatmap?year=2025').get_json()
+    assert (heatmap['days'], heatmap['check_ins']) == (365, 3)
+
+    periods = client.get(f'/habits/{habit_id}/stats/periods?period=week').get_json()['periods']
+    assert [(p['start'], p['check_ins']) for p in periods] == [('2025-06-02', 2), ('2025-06-09', 1)]
+
+    rolling = client.get(f'/habits/{habit_id}/stats/rolling?window=7&days=30').get_json()
+    assert len(rolling['rates']) == 30
+
+    # New check-ins invalidate cached stats
+    client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-04'})
+    assert client.get(f'/habits/{habit_id}/stats').get_json()['longest_streak'] == 3
+
+    assert client.get(f'/habits/{habit_id}/stats/periods?period=day').status_code == 400
+    assert client.get('/habits/999/stats').status_code == 404
+
+def test_day_lookup_uses_bitmap(client):
+    habit_id = client.post('/habits', json={'name': 'Yoga'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[{'date': '2025-06-01'}, {'date': '2025-06-03'}])
+    check_in_id = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-05-01'}).get_json()['id']
+
+    assert client.get(f'/habits/{habit_id}/days/2025-06-03').get_json()['checked_in'] is True
+    assert client.get(f'/habits/{habit_id}/days/2025-06-02').get_json()['checked_in'] is False
+    assert client.get(f'/habits/{habit_id}/days/2025-05-01').get_json()['checked_in'] is True
+
+    client.delete(f'/habits/{habit_id}/check-ins/{check_in_id}')
+    assert client.get(f'/habits/{habit_id}/days/2025-05-01').get_json()['checked_in'] is False
+
+    assert client.get(f'/habits/{habit_id}/days/yesterday').status_code == 400
+    assert client.get('/habits/999/days/2025-06-01').status_code == 404
+
+def test_check_in_paths_skip_habit_lookups(client):
+    from sqlalchemy import event
+
+    habit_id = client.post('/habits', json={'name': 'Stretch'}).get_json()['id']
+    other_id = client.post('/habits', json={'name': 'Walk'}).get_json()['id']
+    with app.app_context():
+        engine = db.engine
+
+    def run(request):
+        statements = []
+        listener = lambda *args: statements.append(args[2].lstrip().split()[0].upper())
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            response = request()
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        return response, statements
+
+    # The insert itself is the first statement; nothing loads the habit beforehand
+    response, statements = run(lambda: client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-10'}))
+    assert response.status_code == 201
+    assert statements[0] == 'INSERT'
+    check_in_id = response.get_json()['id']
+
+    # A missing habit is reported by the foreign key constraint
+    response, statements = run(lambda: client.post('/habits/999/check-ins', json={'date': '2025-06-10'}))
+    assert response.status_code == 404
+    assert statements == ['INSERT']
+
+    # Non-empty reads run a single query
+    client.get(f'/habits/{habit_id}/check-ins')
+    cache.clear()
+    response, statements = run(lambda: client.get(f'/habits/{habit_id}/streaks'))
+    assert response.status_code == 200
+    assert statements == ['SELECT']
+
+    # Deleting through the wrong habit is one DELETE that matches nothing
+    response, statements = run(lambda: client.delete(f'/habits/{other_id}/check-ins/{check_in_id}'))
+    assert response.status_code == 404
+    assert statements == ['DELETE']
+
+    response, statements = run(lambda: client.delete(f'/habits/{habit_id}/check-ins/{check_in_id}'))
+    assert response.status_code == 200
+    assert statements[0] == 'DELETE'
+    assert client.delete(f'/habits/{habit_id}/check-ins/{check_in_id}').status_code == 404
+
+    # Bulk imports into a missing habit fail on the constraint as well
+    assert client.post('/habits/999/check-ins/bulk', json=[{'date': '2025-06-01'}]).status_code == 404
+    assert client.get('/habits/999/streaks').status_code == 404
+    assert client.get(f'/habits/{other_id}/streaks').get_json() == []
+
+def test_foreign_keys_are_enforced_whatever_the_pragmas(make_app):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://', SQLITE_PRAGMAS={}, CACHE_BACKEND='null')
+    with app.app_context():
+        db.create_all()
+    assert app.test_client().post('/habits/999/check-ins', json={'date': '2025-06-01'}).status_code == 404
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from app import db
+from app.models.check_in import CheckIn
+from app.repositories.check_in_repository import CheckInRepository
+from app.utils.archive import CheckInArchive, Segment, write_segment
+
+@pytest.fixture
+def directory():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+@pytest.fixture
+def app(make_app, directory):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://', CHECK_IN_ARCHIVE_DIR=directory, CACHE_BACKEND='null')
+    with app.app_context():
+        db.create_all()
+    yield app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def make_habit(client, days):
+    habit_id = client.post('/habits', json={'name': 'Read'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[{'date': day, 'notes': f'on {day}'} for day in days])
+    return habit_id
+
+def archive_before(app, day):
+    with app.app_context():
+        archived = CheckInRepository.archive_older_than(day)
+        assert CheckIn.query.filter(CheckIn.date < day).count() == 0
+        return archived
+
+def test_segment_round_trip(directory):
+    path = os.path.join(directory, 'segment.seg')
+    rows = [
+        {'id': 7, 'date': date(2024, 1, 2), 'notes': None, 'created_at': datetime(2024, 1, 2, 8, 30, 0, 15)},
+        {'id': 3, 'date': date(2024, 1, 1), 'notes': 'día ☀', 'created_at': None},
+    ]
+    write_segment(path, rows)
+
+    segment = Segment(path)
+    assert segment.ids.tolist() == [3, 7]
+    assert segment.rows() == rows[::-1]
+    assert segment.contains(date(2024, 1, 2)) and not segment.contains(date(2024, 1, 3))
+    assert segment.find(7) == date(2024, 1, 2) and segment.find(8) is None
+    assert [row['id'] for row in segment.newest(limit=1)] == [7]
+    assert [row['id'] for row in segment.newest(after=(date(2024, 1, 2), 7))] == [3]
+
+def test_segment_rewrites_of_a_habit_are_serialized(directory):
+    store = CheckInArchive(directory)
+
+    def archive_row(check_in_id):
+        with store.lock(1):
+            store.stage(1, added=[{'id': check_in_id, 'date': date(2024, 1, check_in_id), 'notes': None,
+                                   'created_at': None}]).publish()
+
+    with store.lock(1):
+        writer = threading.Thread(target=archive_row, args=(2,))
+        writer.start()
+        writer.join(timeout=0.1)
+        assert writer.is_alive()
+        pending = store.stage(1, added=[{'id': 1, 'date': date(2024, 1, 1), 'notes': None, 'created_at': None}])
+        pending.publish()
+    writer.join()
+
+    assert store.segment(1).ids.tolist() == [1, 2]
+    assert not [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+def test_reads_merge_the_table_and_the_archive(app, client):
+    days = ['2023-12-30', '2023-12-31', '2024-01-01', '2024-01-02', '2024-01-04']
+    habit_id = make_habit(client, days)
+    streaks = client.get(f'/habits/{habit_id}/streaks').get_json()
+
+    assert archive_before(app, date(2024, 1, 1)) == 2
+    with app.app_context():
+        assert [check_in.date.isoformat() for check_in in CheckInRepository.get_by_habit_id(habit_id)] == days[::-1]
+
+    # Pages walk from the table into the archive in the same order
+    seen = []
+    url = f'/habits/{habit_id}/check-ins?limit=2'
+    while url:
+        response = client.get(url)
+        seen += [(item['date'], item['notes'], item['habit']['id']) for item in response.get_json()]
+        url = response.headers.get('Link', '').partition('<')[2].partition('>')[0]
+    assert seen == [(day, f'on {day}', habit_id) for day in days[::-1]]
+    assert [item['date'] for item in client.get(f'/habits/{habit_id}/check-ins?to=2023-12-30').get_json()] == [days[0]]
+
+    # The streak index keeps covering archived days, also when rebuilt
+    assert client.get(f'/habits/{habit_id}/streaks').get_json() == streaks
+    assert app.test_cli_runner().invoke(args=['streaks', 'rebuild']).exit_code == 0
+    assert app.test_cli_runner().invoke(args=['bitmaps', 'rebuild']).exit_code == 0
+    assert client.get(f'/habits/{habit_id}/streaks').get_json() == streaks
+    assert client.get(f'/habits/{habit_id}/days/2023-12-31').get_json()['checked_in'] is True
+
+    lines = [json.loads(line) for line in client.get('/habits/export').get_data(as_text=True).splitlines()]
+    assert [line['date'] for line in lines if line['type'] == 'check_in'] == days
+
+    # Embedded check-ins include the archived ones
+    assert sorted(item['date'] for item in client.get(f'/habits/{habit_id}').get_json()['check_ins']) == days
+    listed = client.get('/habits?include=check_ins&fields=name').get_json()[0]
+    assert sorted(item['date'] for item in listed['check_ins']) == days
+
+def test_archived_dates_are_duplicates_and_can_be_deleted(app, client, directory):
+    habit_id = make_habit(client, ['2023-06-01', '2023-06-02', '2023-06-03'])
+    archive_before(app, date(2024, 1, 1))
+
+    assert client.post(f'/habits/{habit_id}/check-ins', json={'date': '2023-06-02'}).status_code == 409
+    result = client.post(f'/habits/{habit_id}/check-ins/bulk', json=[{'date': '2023-06-03'}, {'date': '2023-06-04'}])
+    assert [row['status'] for row in result.get_json()['results']] == ['duplicate', 'created']
+
+    archived_id = client.get(f'/habits/{habit_id}/check-ins?to=2023-06-02&limit=1').get_json()[0]['id']
+    assert client.delete(f'/habits/{habit_id}/check-ins/{archived_id}').status_code == 200
+    assert client.delete(f'/habits/{habit_id}/check-ins/{archived_id}').status_code == 404
+    assert [(s['first'], s['days']) for s in client.get(f'/habits/{habit_id}/streaks').get_json()] == [
+        ('2023-06-01', 1), ('2023-06-03', 2)
+    ]
+
+    client.delete(f'/habits/{habit_id}')
+    assert os.listdir(directory) == []
+
+def test_archive_command(app, client):
+    habit_id = make_habit(client, ['2020-01-01', date.today().isoformat()])
+
+    result = app.test_cli_runner().invoke(args=['check-ins', 'archive', '--older-than-days', '30'])
+    assert result.exit_code == 0
+    assert 'Archived 1 check-ins' in result.output
+    assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 2
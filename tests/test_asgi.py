@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('asgiref')
+
+from app import db
+from app.asgi import create_asgi_app
+
+@pytest.fixture
+def asgi_app(make_app):
+    # The async engine opens its own connections, so the database must be a file
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(
+            factory=create_asgi_app,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(directory, 'asgi.db')}"
+        )
+        with app.flask_app.app_context():
+            db.create_all()
+        yield app
+        asyncio.run(app.engine.dispose())
+        with app.flask_app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+async def call(app, method, path, body=None, headers=()):
+    """Send one request through the ASGI interface and collect the response."""
+    path, _, query = path.partition('?')
+    payload = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+            *headers
+        ],
+        'server': ('testserver', 80),
+    }
+    received = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    messages = []
+
+    async def receive():
+        return received.pop() if received else {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    response_headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, json.loads(body) if body else None
+
+def request(app, *args, **kwargs):
+    return asyncio.run(call(app, *args, **kwargs))
+
+def test_reads_are_served_by_async_views(asgi_app):
+    # Writes go through the Flask app
+    status, _, habit = request(asgi_app, 'POST', '/habits', {'name': 'Meditate'})
+    assert status == 201
+    habit_id = habit['id']
+    for day in ('2025-06-01', '2025-06-02', '2025-06-04'):
+        assert request(asgi_app, 'POST', f'/habits/{habit_id}/check-ins', {'date': day})[0] == 201
+
+    assert asgi_app.match('/habits')[0] is not None
+    assert asgi_app.match('/habits/export')[0] is None
+
+    status, headers, habits = request(asgi_app, 'GET', '/habits')
+    assert status == 200 and habits[0]['name'] == 'Meditate'
+    status, _, _ = request(asgi_app, 'GET', '/habits', headers=[(b'if-none-match', headers['etag'].encode())])
+    assert status == 304
+
+    status, _, detail = request(asgi_app, 'GET', f'/habits/{habit_id}')
+    assert status == 200 and len(detail['check_ins']) == 3
+
+    status, headers, page = request(asgi_app, 'GET', f'/habits/{habit_id}/check-ins?limit=2')
+    assert [check_in['date'] for check_in in page] == ['2025-06-04', '2025-06-02']
+    assert page[0]['habit']['id'] == habit_id
+    status, _, page = request(asgi_app, 'GET', f"/habits/{habit_id}/check-ins?limit=2&cursor={headers['x-next-cursor']}")
+    assert [check_in['date'] for check_in in page] == ['2025-06-01']
+
+    assert request(asgi_app, 'GET', f'/habits/{habit_id}/streaks')[2] == [
+        {'first': '2025-06-01', 'last': '2025-06-02', 'days': 2},
+        {'first': '2025-06-04', 'last': '2025-06-04', 'days': 1}
+    ]
+    assert request(asgi_app, 'GET', f'/habits/streaks?ids={habit_id}')[2][0]['habit_id'] == habit_id
+    assert request(asgi_app, 'GET', f'/habits/{habit_id}/streaks/summary')[2]['longest_streak'] == 2
+    assert request(asgi_app, 'GET', f'/habits/{habit_id}/days/2025-06-02')[2]['checked_in'] is True
+
+    assert request(asgi_app, 'GET', '/habits/999')[0] == 404
+    assert request(asgi_app, 'GET', '/habits/999/streaks')[0] == 404
+    assert request(asgi_app, 'GET', f'/habits/{habit_id}/check-ins?limit=0')[0] == 400
+
+def test_writes_invalidate_async_reads(asgi_app):
+    habit_id = request(asgi_app, 'POST', '/habits', {'name': 'Run'})[2]['id']
+    assert request(asgi_app, 'GET', f'/habits/{habit_id}/streaks')[2] == []
+
+    request(asgi_app, 'POST', f'/habits/{habit_id}/check-ins', {'date': '2025-06-01'})
+    assert len(request(asgi_app, 'GET', f'/habits/{habit_id}/streaks')[2]) == 1
+
+def test_concurrent_reads(asgi_app):
+    habit_id = request(asgi_app, 'POST', '/habits', {'name': 'Swim'})[2]['id']
+
+    async def read_many():
+        return await asyncio.gather(*(
+            call(asgi_app, 'GET', f'/habits/{habit_id}/check-ins?limit={limit}') for limit in range(1, 51)
+        ))
+
+    assert {status for status, _, _ in asyncio.run(read_many())} == {200}
@@ -0,0 +1,39 @@
+import unittest
+from datetime import date
+
+from app.utils.bitmap import DayBitmap
+
+class DayBitmapTestCase(unittest.TestCase):
+    """Test case for the per-habit day bitmap."""
+    
+    def test_add_and_contains(self):
+        """Test setting days after and before the origin."""
+        bitmap = DayBitmap()
+        bitmap.add(date(2025, 6, 10))
+        bitmap.add(date(2025, 6, 30))
+        bitmap.add(date(2025, 5, 20))
+        
+        self.assertLessEqual(bitmap.origin, date(2025, 5, 20))
+        self.assertTrue(bitmap.contains(date(2025, 6, 10)))
+        self.assertTrue(bitmap.contains(date(2025, 5, 20)))
+        self.assertFalse(bitmap.contains(date(2025, 6, 11)))
+        self.assertFalse(bitmap.contains(date(2024, 1, 1)))
+        self.assertEqual(bitmap.to_dates(), [date(2025, 5, 20), date(2025, 6, 10), date(2025, 6, 30)])
+    
+    def test_remove(self):
+        """Test clearing a day."""
+        bitmap = DayBitmap.from_dates([date(2025, 6, 1), date(2025, 6, 2)])
+        bitmap.remove(date(2025, 6, 1))
+        bitmap.remove(date(2030, 1, 1))
+        self.assertEqual(bitmap.to_dates(), [date(2025, 6, 2)])
+    
+    def test_count(self):
+        """Test counting days in a range, including ranges past either end."""
+        bitmap = DayBitmap.from_dates([date(2025, 6, day) for day in (1, 2, 5, 9, 20)])
+        self.assertEqual(bitmap.count(date(2025, 6, 2), date(2025, 6, 9)), 3)
+        self.assertEqual(bitmap.count(date(2025, 1, 1), date(2025, 12, 31)), 5)
+        self.assertEqual(bitmap.count(date(2025, 7, 1), date(2025, 7, 31)), 0)
+        self.assertEqual(DayBitmap().count(date(2025, 1, 1), date(2025, 12, 31)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+from app.utils.cache import LRUCache, RedisCache, create_store
+
+class LRUCacheTestCase(unittest.TestCase):
+    """Test case for the in-process cache backend."""
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first."""
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+    
+    def test_entries_expire(self):
+        """Test that entries are not returned after their TTL."""
+        cache = LRUCache(default_ttl=10)
+        with mock.patch('app.utils.cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=30)
+        with mock.patch('app.utils.cache.time.monotonic', return_value=115):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.get('b'), 2)
+    
+    def test_invalidate_tag(self):
+        """Test that invalidating a tag drops only the keys registered under it."""
+        cache = LRUCache()
+        cache.set('page:1', [1], tags=('pages',))
+        cache.set('page:2', [2], tags=('pages',))
+        cache.set('other', 0)
+        cache.invalidate_tag('pages')
+        
+        self.assertIsNone(cache.get('page:1'))
+        self.assertIsNone(cache.get('page:2'))
+        self.assertEqual(cache.get('other'), 0)
+    
+    def test_add_only_stores_missing_keys(self):
+        """Test that add keeps a live entry and replaces an expired one."""
+        cache = LRUCache(default_ttl=10)
+        with mock.patch('app.utils.cache.time.monotonic', return_value=100):
+            self.assertTrue(cache.add('a', 1))
+            self.assertFalse(cache.add('a', 2))
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('app.utils.cache.time.monotonic', return_value=115):
+            self.assertTrue(cache.add('a', 3))
+            self.assertEqual(cache.get('a'), 3)
+    
+    def test_store_is_shared_through_redis(self):
+        """Test that stores use Redis under their own prefix, and an LRU even with caching disabled."""
+        config = {'CACHE_BACKEND': 'redis', 'CACHE_REDIS_URL': 'redis://cache:6379/0'}
+        with mock.patch.object(RedisCache, 'from_url') as from_url:
+            store = create_store(config, 'tickets', 100, 3600)
+        self.assertIs(store, from_url.return_value)
+        from_url.assert_called_once_with('redis://cache:6379/0', default_ttl=3600, prefix='habit-tracker-tickets:')
+        
+        store = create_store({'CACHE_BACKEND': 'null'}, 'tickets', 100, 3600)
+        store.set('ticket', {'status': 'pending'})
+        self.assertEqual(store.get('ticket'), {'status': 'pending'})
+
+if __name__ == '__main__':
+    unittest.main()
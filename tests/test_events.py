@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from app import db
+from app.utils.events import Event, LocalBroker, Subscription
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://', EVENTS_HEARTBEAT_SECONDS=0.01, EVENTS_MAX_SUBSCRIBERS=2)
+    with app.app_context():
+        db.create_all()
+    yield app
+
+def read_events(chunks):
+    """Read SSE chunks up to the next one carrying events, returning (type, data) pairs."""
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode()
+        if chunk.startswith(':'):
+            continue
+        return [
+            (lines['event'], json.loads(lines['data']))
+            for lines in (dict(line.split(': ', 1) for line in message.splitlines())
+                          for message in chunk.strip().split('\n\n'))
+        ]
+
+def test_stream_pushes_habit_and_check_in_changes(app):
+    client = app.test_client()
+    response = client.get('/habits/events', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+
+    habit_id = client.post('/habits', json={'name': 'Read'}).get_json()['id']
+    assert read_events(chunks) == [('habit.created', client.get(f'/habits/{habit_id}').get_json())]
+
+    client.put(f'/habits/{habit_id}', json={'name': 'Read more'})
+    check_in_id = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-01'}).get_json()['id']
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[{'date': '2025-06-02'}, {'date': '2025-06-03'}])
+    client.delete(f'/habits/{habit_id}/check-ins/{check_in_id}')
+    client.delete(f'/habits/{habit_id}')
+    received = read_events(chunks)
+    assert [event_type for event_type, _ in received] == [
+        'habit.updated', 'check_in.created', 'check_ins.imported', 'check_in.deleted', 'habit.deleted'
+    ]
+    assert received[2][1] == {'habit_id': habit_id, 'created': 2}
+
+    response.close()
+    assert app.extensions['events'].subscriber_count == 0
+
+def test_stream_can_follow_one_habit_and_limits_clients(app):
+    client = app.test_client()
+    first = client.post('/habits', json={'name': 'Read'}).get_json()['id']
+    second = client.post('/habits', json={'name': 'Run'}).get_json()['id']
+
+    response = client.get(f'/habits/events?habit_id={second}', buffered=False)
+    chunks = iter(response.response)
+    client.put(f'/habits/{first}', json={'name': 'Ignored'})
+    client.put(f'/habits/{second}', json={'name': 'Followed'})
+    assert [data['name'] for _, data in read_events(chunks)] == ['Followed']
+
+    other = client.get('/habits/events', buffered=False)
+    assert client.get('/habits/events').status_code == 503
+    other.close()
+    response.close()
+
+def test_full_buffer_coalesces_events_of_the_same_habit():
+    subscription = Subscription(max_events=2)
+    subscription.put(Event('habit.updated', {'id': 1, 'name': 'a'}))
+    subscription.put(Event('check_in.created', {'id': 10, 'habit_id': 1}))
+    subscription.put(Event('habit.updated', {'id': 1, 'name': 'b'}))
+    subscription.put(Event('check_in.created', {'id': 11, 'habit_id': 1}))
+
+    events = subscription.get(timeout=0)
+    assert [(event.type, event.data) for event in events] == [
+        ('habit.updated', {'id': 1, 'name': 'b'}),
+        ('check_ins.changed', {'habit_id': 1}),
+    ]
+    assert subscription.get(timeout=0) == []
+
+def test_full_buffer_drops_the_oldest_event_and_asks_for_a_resync():
+    subscription = Subscription(max_events=2)
+    for habit_id in (1, 2, 3):
+        subscription.put(Event('habit.deleted', {'id': habit_id}))
+
+    events = subscription.get(timeout=0)
+    assert [event.type for event in events] == ['resync', 'habit.deleted', 'habit.deleted']
+    assert [event.habit_id for event in events[1:]] == [2, 3]
+
+def test_broker_numbers_events_and_skips_work_without_subscribers():
+    broker = LocalBroker()
+    unseen = Event('habit.deleted', {'id': 1})
+    broker.publish(unseen)
+    assert unseen.id is None
+
+    subscriptions = [Subscription(), Subscription()]
+    for subscription in subscriptions:
+        broker.subscribe(subscription)
+    broker.publish(Event('habit.deleted', {'id': 2}))
+    broker.publish(Event('habit.deleted', {'id': 3}))
+    assert [[event.id for event in subscription.get(timeout=0)] for subscription in subscriptions] == [[1, 2], [1, 2]]
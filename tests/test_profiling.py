@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+import pytest
+
+from app import db
+
+@pytest.fixture
+def profile_dir():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+@pytest.fixture
+def client(make_app, profile_dir):
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        CACHE_BACKEND='null',
+        PROFILING_ENABLED=True,
+        PROFILING_SAMPLE_RATE=1.0,
+        PROFILING_SLOW_MS=0,
+        PROFILING_DIR=profile_dir
+    )
+    with app.app_context():
+        db.create_all()
+    with app.test_client() as client:
+        yield client
+    with app.app_context():
+        db.drop_all()
+
+def test_server_timing_and_metrics(client, profile_dir):
+    habit_id = client.post('/habits', json={'name': 'Profiled'}).get_json()['id']
+    response = client.get(f'/habits/{habit_id}/streaks')
+
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db;dur=' in timing and 'queries"' in timing
+    assert 'serialize;dur=' in timing
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{endpoint="check_ins.get_streaks",method="GET",status="200"} 1' in metrics
+    assert 'http_request_duration_seconds_count{endpoint="habits.create_habit",method="POST"} 1' in metrics
+    assert 'db_queries_total{endpoint="check_ins.get_streaks",method="GET"}' in metrics
+    assert 'serialization_seconds_total' in metrics
+
+    # Every request is sampled and counts as slow, so each left a profile behind
+    assert any(name.startswith('check_ins.get_streaks-') for name in os.listdir(profile_dir))
+
+def test_profiling_is_opt_in():
+    from run import app
+    assert 'Server-Timing' not in app.test_client().get('/health').headers
+    assert app.test_client().get('/metrics').status_code == 404
@@ -0,0 +1,136 @@
+"""
+Query plan regression guard: builds the schema from the Alembic migrations,
+runs every repository query against it and fails when SQLite plans any of
+them as a full table scan.
+
+Whole-table reads by design (HabitRepository.get_all and iter_history,
+streaks of every habit, index rebuilds) are not covered.
+"""
+import os
+import re
+from datetime import date, timedelta
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+from sqlalchemy import event, text
+
+from app import db
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.habit_repository import HabitRepository
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Scans that are bounded anyway, by the repository call they come from
+ALLOWED_SCANS = {
+    # The first page walks the primary key in order and stops after LIMIT rows
+    'HabitRepository.get_page (first page)': 'SCAN habits',
+}
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://', CACHE_BACKEND='null')
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_migrations_match_models(app):
+    with db.engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+def test_upgrade_backfills_initial_schema(make_app):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://', CACHE_BACKEND='null')
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR, revision='0127db206ac9')
+        db.session.execute(text("INSERT INTO habits (id, name) VALUES (1, 'Read'), (2, 'Run')"))
+        db.session.execute(text(
+            "INSERT INTO check_ins (habit_id, date) VALUES "
+            "(1, '2024-01-01'), (1, '2024-01-02'), (1, '2024-01-03'), (1, '2024-01-10')"
+        ))
+        db.session.commit()
+        upgrade(directory=MIGRATIONS_DIR)
+
+        habits = {habit.id: habit for habit in HabitRepository.get_all()}
+        assert (habits[1].longest_streak, habits[1].latest_streak_days) == (3, 1)
+        assert habits[1].latest_streak_last == date(2024, 1, 10)
+        assert (habits[2].longest_streak, habits[2].latest_streak_last) == (0, None)
+        assert [streak['days'] for streak in CheckInRepository.get_streaks(1)] == [3, 1]
+        assert CheckInRepository.get_bitmap(1).count(date(2024, 1, 1), date(2024, 1, 10)) == 4
+        db.session.remove()
+        db.drop_all()
+
+def repository_calls(habit_ids):
+    """Every repository query not meant to read a whole table, as (name, call)."""
+    first, second = habit_ids
+    start = date(2024, 1, 1)
+    return [
+        ('HabitRepository.get_page (first page)', lambda: HabitRepository.get_page(10, include_check_ins=True)),
+        ('HabitRepository.get_page (next page)', lambda: HabitRepository.get_page(
+            10, after_id=first, field_names=['name', 'current_streak'])),
+        ('HabitRepository.get_by_id', lambda: HabitRepository.get_by_id(first)),
+        ('HabitRepository.get_detail', lambda: HabitRepository.get_detail(first)),
+        ('HabitRepository.exists', lambda: HabitRepository.exists(first)),
+        ('HabitRepository.existing_ids', lambda: HabitRepository.existing_ids([first, second])),
+        ('HabitRepository.get_version', lambda: HabitRepository.get_version(first)),
+        ('HabitRepository.get_collection_version', HabitRepository.get_collection_version),
+        ('HabitRepository.update', lambda: HabitRepository.update(first, {'name': 'Renamed'})),
+        ('CheckInRepository.get_by_habit_id', lambda: CheckInRepository.get_by_habit_id(first)),
+        ('CheckInRepository.get_page', lambda: CheckInRepository.get_page(
+            first, 10, date_from=start, date_to=start + timedelta(days=30), after=(start + timedelta(days=20), 10**6))),
+        ('CheckInRepository.get_bitmap', lambda: CheckInRepository.get_bitmap(first)),
+        ('CheckInRepository.get_streaks', lambda: CheckInRepository.get_streaks(first)),
+        ('CheckInRepository.get_streaks_for_habits', lambda: CheckInRepository.get_streaks_for_habits([first, second])),
+        ('CheckInRepository.create', lambda: CheckInRepository.create({'habit_id': first, 'date': date(2023, 6, 1)})),
+        ('CheckInRepository.bulk_create (incremental)', lambda: CheckInRepository.bulk_create(
+            first, [{'date': date(2023, 5, day)} for day in range(1, 4)])),
+        ('CheckInRepository.bulk_create (rebuild)', lambda: CheckInRepository.bulk_create(
+            second, [{'date': start + timedelta(days=offset)} for offset in range(40)])),
+        ('CheckInRepository.get_by_id', lambda: CheckInRepository.get_by_id(1)),
+        ('CheckInRepository.delete', lambda: CheckInRepository.delete(first, 1)),
+        ('HabitRepository.delete', lambda: HabitRepository.delete(second)),
+    ]
+
+def full_scans(statements):
+    """The full table scan steps in the plans of the given (statement, parameters)."""
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    scans = set()
+    for statement, parameters in statements:
+        for row in cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters):
+            step = row[-1].split()
+            # Scans of subqueries are fine as long as their own tables are searched, and
+            # SCAN ... USING [COVERING] INDEX reads an index rather than the table
+            if step[0] != 'SCAN' or 'INDEX' in step:
+                continue
+            if re.sub(r'_\d+$', '', step[1]) in db.metadata.tables:
+                scans.add(row[-1])
+    return scans
+
+def test_repository_queries_use_indexes(app):
+    habit_ids = [HabitRepository.create({'name': name}).id for name in ('Read', 'Run')]
+    CheckInRepository.bulk_create(habit_ids[0], [
+        {'date': date(2024, 1, 1) + timedelta(days=offset)} for offset in range(60) if offset % 7
+    ])
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Multi-row INSERT ... VALUES batches come through as one flat parameter tuple
+        if executemany and isinstance(parameters[0], (list, tuple)):
+            parameters = parameters[0]
+        statements.append((statement, tuple(parameters)))
+
+    failures = {}
+    for name, call in repository_calls(habit_ids):
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            call()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert statements, f'{name} ran no SQL'
+        scans = full_scans(statements) - {ALLOWED_SCANS.get(name)}
+        if scans:
+            failures[name] = sorted(scans)
+    assert failures == {}
@@ -0,0 +1,99 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import pytest
+
+from app import db
+from app.repositories.habit_repository import HabitRepository
+
+@pytest.fixture
+def paths():
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, 'primary.db'), os.path.join(directory, 'replica.db')
+
+# Not named `app`: pytest-flask would push a request context around the test,
+# and the test client's requests would then share one database session
+@pytest.fixture
+def replicated_app(make_app, paths):
+    primary, replica = paths
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+        SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{replica}'],
+        CACHE_BACKEND='lru',
+        # Keep everything in the database file so it can be copied as a replica
+        SQLITE_PRAGMAS={'journal_mode': 'DELETE'}
+    )
+    with app.app_context():
+        db.create_all()
+        HabitRepository.create({'name': 'Read'})
+        db.session.remove()
+        db.engine.dispose()
+    shutil.copyfile(primary, replica)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    for engine in app.extensions['replicas']:
+        engine.dispose()
+
+def rename_on(path, name):
+    with sqlite3.connect(path) as connection:
+        connection.execute('UPDATE habits SET name = ? WHERE id = 1', (name,))
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(replicated_app, paths):
+    primary, replica = paths
+    # Make the copies differ so responses show which database served them
+    rename_on(replica, 'From replica')
+    client = replicated_app.test_client()
+
+    assert client.get('/habits/1').get_json()['name'] == 'From replica'
+    assert [habit['name'] for habit in client.get('/habits').get_json()] == ['From replica']
+
+    habit_id = client.post('/habits', json={'name': 'Run'}).get_json()['id']
+    with sqlite3.connect(primary) as connection:
+        assert connection.execute('SELECT name FROM habits WHERE id = ?', (habit_id,)).fetchone() == ('Run',)
+    with sqlite3.connect(replica) as connection:
+        assert connection.execute('SELECT count(*) FROM habits').fetchone() == (1,)
+
+def test_reads_stick_to_the_primary_after_a_write(replicated_app, paths):
+    primary, replica = paths
+    rename_on(replica, 'From replica')
+
+    with replicated_app.app_context():
+        assert HabitRepository.get_by_id(1).name == 'From replica'
+        db.session.remove()
+
+        habit_id = HabitRepository.create({'name': 'Run'}).id
+        # The replica has not seen the new habit, so these reads must hit the primary
+        assert HabitRepository.get_by_id(habit_id) is not None
+        assert [h.name for h in HabitRepository.get_page(10)] == ['Read', 'Run']
+        db.session.remove()
+
+        # A new request starts reading from the replica again
+        assert HabitRepository.get_version(habit_id) is None
+
+def test_clients_read_their_writes_from_the_primary_in_later_requests(replicated_app):
+    writer, reader = replicated_app.test_client(), replicated_app.test_client()
+    names = lambda client: [habit['name'] for habit in client.get('/habits').get_json()]
+
+    # The replica has not applied the rename yet
+    assert writer.put('/habits/1', json={'name': 'Renamed'}).status_code == 200
+    assert reader.get('/habits/1').get_json()['name'] == 'Read'
+    # The writer keeps reading the primary, and what the replica returned was not cached
+    assert writer.get('/habits/1').get_json()['name'] == 'Renamed'
+    assert names(writer) == ['Renamed']
+    assert names(reader) == ['Read']
+
+    # Once the window is over, the writer reads from the replica again
+    writer.delete_cookie('primary_until')
+    assert names(writer) == ['Read']
+
+def test_without_replicas_everything_uses_the_primary(make_app):
+    app = make_app(SQLALCHEMY_DATABASE_URI='sqlite://')
+    with app.app_context():
+        db.create_all()
+        habit_id = HabitRepository.create({'name': 'Read'}).id
+        db.session.remove()
+        assert HabitRepository.get_by_id(habit_id).name == 'Read'
+        assert app.extensions['replicas'] == []
@@ -0,0 +1,53 @@
+import unittest
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from flask import Flask
+
+from app.models.check_in import CheckIn
+from app.models.habit import Habit
+from app.schemas.check_in_schema import CheckInSchema
+from app.schemas.habit_schema import HabitSchema
+from app.utils.json_provider import OrjsonProvider, orjson
+from app.utils.serializers import compile_dumper, compile_many_dumper
+
+class CompiledDumperTestCase(unittest.TestCase):
+    """Test case for the compiled schema dumpers."""
+    
+    def setUp(self):
+        """Build a habit with check-ins without touching the database."""
+        now = datetime(2025, 6, 1, 12, 30)
+        self.habit = Habit(
+            id=1, name='Read', description=None, created_at=now, updated_at=now,
+            longest_streak=2, latest_streak_days=2, latest_streak_last=date(2025, 6, 2),
+            check_ins=[
+                CheckIn(id=1, habit_id=1, date=date(2025, 6, 1), notes='first', created_at=now),
+                CheckIn(id=2, habit_id=1, date=date(2025, 6, 2), notes=None, created_at=None)
+            ]
+        )
+    
+    def test_matches_marshmallow(self):
+        """Test that compiled dumpers produce the same dicts as the schemas."""
+        self.assertEqual(compile_dumper(HabitSchema())(self.habit), HabitSchema().dump(self.habit))
+        check_in = self.habit.check_ins[0]
+        self.assertEqual(compile_dumper(CheckInSchema())(check_in), CheckInSchema().dump(check_in))
+    
+    def test_only_and_rows(self):
+        """Test field restriction and dumping plain result rows."""
+        dump_many = compile_many_dumper(CheckInSchema(only=('id', 'date')))
+        rows = [SimpleNamespace(id=3, date=date(2025, 6, 3))]
+        self.assertEqual(dump_many(rows), [{'id': 3, 'date': '2025-06-03'}])
+
+@unittest.skipIf(orjson is None, 'orjson is not installed')
+class OrjsonProviderTestCase(unittest.TestCase):
+    """Test case for the orjson JSON provider."""
+    
+    def test_matches_default_provider(self):
+        """Test that responses decode to the same values as with Flask's provider."""
+        app = Flask(__name__)
+        provider = OrjsonProvider(app)
+        payload = {'day': date(2025, 6, 1), 'at': datetime(2025, 6, 1, 8), 'text': 'ñ'}
+        self.assertEqual(provider.loads(provider.dumps(payload)), app.json.loads(app.json.dumps(payload)))
+
+if __name__ == '__main__':
+    unittest.main()
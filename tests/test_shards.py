@@ -0,0 +1,167 @@
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import date
+
+import pytest
+
+from app import db, events
+from app.models.habit import Habit
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.habit_repository import HabitRepository
+from app.utils.shards import allocate_ids
+
+@pytest.fixture
+def paths():
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, 'shard0.db'), os.path.join(directory, 'shard1.db')
+
+@pytest.fixture
+def app(make_app, paths):
+    primary, shard = paths
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+        SQLALCHEMY_SHARD_URIS=[f'sqlite:///{shard}'],
+        SHARD_ID_BLOCK_SIZE=10,
+        CACHE_BACKEND='null'
+    )
+    with app.app_context():
+        for engine in app.extensions['shards'].engines:
+            db.metadata.create_all(engine)
+    yield app
+    for engine in app.extensions['shards'].engines:
+        engine.dispose()
+
+def habit_ids_on(path):
+    with sqlite3.connect(path) as connection:
+        return [row[0] for row in connection.execute('SELECT id FROM habits ORDER BY id')]
+
+def test_habits_are_placed_by_id_and_listed_in_order(app, paths):
+    primary, shard = paths
+    client = app.test_client()
+
+    ids = [client.post('/habits', json={'name': f'Habit {n}'}).get_json()['id'] for n in range(5)]
+    assert len(set(ids)) == 5
+    assert habit_ids_on(primary) == [i for i in ids if i % 2 == 0]
+    assert habit_ids_on(shard) == [i for i in ids if i % 2 == 1]
+
+    assert [habit['id'] for habit in client.get('/habits').get_json()] == ids
+    first = client.get('/habits?limit=3')
+    assert [habit['id'] for habit in first.get_json()] == ids[:3]
+    second = client.get(f"/habits?limit=3&cursor={first.headers['X-Next-Cursor']}")
+    assert [habit['id'] for habit in second.get_json()] == ids[3:]
+
+    odd_id = next(i for i in ids if i % 2 == 1)
+    assert client.get(f'/habits/{odd_id}').get_json()['name'] == f'Habit {ids.index(odd_id)}'
+    assert client.put(f'/habits/{odd_id}', json={'name': 'Renamed'}).status_code == 200
+    assert client.get(f'/habits/{odd_id}').get_json()['name'] == 'Renamed'
+    assert client.delete(f'/habits/{odd_id}').status_code == 200
+    assert odd_id not in habit_ids_on(shard)
+
+def test_check_ins_and_streaks_live_on_the_habit_shard(app, paths):
+    _, shard = paths
+    client = app.test_client()
+    ids = [client.post('/habits', json={'name': name}).get_json()['id'] for name in ('Read', 'Run')]
+    habit_id = next(i for i in ids if i % 2 == 1)
+
+    check_in = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2025-06-01'}).get_json()
+    client.post(f'/habits/{habit_id}/check-ins/bulk', json=[{'date': '2025-06-02'}, {'date': '2025-06-03'}])
+    with sqlite3.connect(shard) as connection:
+        assert connection.execute('SELECT count(*) FROM check_ins WHERE habit_id = ?', (habit_id,)).fetchone() == (3,)
+
+    assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 3
+    assert client.get(f'/habits/{habit_id}/streaks').get_json()[0]['days'] == 3
+    assert client.get(f'/habits/{habit_id}/streaks/summary').get_json()['longest_streak'] == 3
+    assert client.get(f'/habits/{habit_id}/days/2025-06-02').get_json()['checked_in'] is True
+
+    batch = client.get('/habits/streaks').get_json()
+    assert [entry['habit_id'] for entry in batch] == ids
+
+    response = client.delete(f"/habits/{habit_id}/check-ins/{check_in['id']}")
+    assert response.status_code == 200
+    assert client.get(f'/habits/{habit_id}/streaks').get_json()[0]['days'] == 2
+
+def test_bulk_create_many_commits_on_each_shard(app):
+    with app.app_context():
+        ids = [HabitRepository.create({'name': name}).id for name in ('Read', 'Run', 'Swim')]
+        db.session.remove()
+
+        inserted = CheckInRepository.bulk_create_many({
+            habit_id: [{'date': date(2025, 6, 1)}, {'date': date(2025, 6, 2)}] for habit_id in ids
+        })
+        check_in_ids = [i for days in inserted.values() for i in days.values()]
+        assert len(set(check_in_ids)) == 6
+        db.session.remove()
+
+        assert [len(CheckInRepository.get_by_habit_id(habit_id)) for habit_id in ids] == [2, 2, 2]
+        assert CheckInRepository.get_by_id(check_in_ids[-1]).habit_id == ids[-1]
+
+def test_export_and_collection_etag_span_every_shard(app):
+    client = app.test_client()
+    ids = [client.post('/habits', json={'name': name}).get_json()['id'] for name in ('Read', 'Run', 'Swim')]
+    etag = client.get('/habits').headers['ETag']
+
+    lines = [json.loads(line) for line in client.get('/habits/export').get_data(as_text=True).splitlines()]
+    assert [line['id'] for line in lines] == ids
+
+    client.post('/habits', json={'name': 'Nap'})
+    assert client.get('/habits', headers={'If-None-Match': etag}).status_code == 200
+
+def test_ids_start_past_existing_rows(app, paths):
+    primary, _ = paths
+    with sqlite3.connect(primary) as connection:
+        connection.execute("INSERT INTO habits (id, name, longest_streak, latest_streak_days) VALUES (42, 'Old', 0, 0)")
+
+    with app.app_context():
+        first, second = allocate_ids(Habit, 2)
+    assert (first, second) == (50, 51)
+
+def test_async_path_rejects_sharding(make_app, paths):
+    from app.asgi import create_asgi_app
+
+    primary, shard = paths
+    with pytest.raises(RuntimeError):
+        make_app(
+            factory=create_asgi_app,
+            SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+            SQLALCHEMY_SHARD_URIS=[f'sqlite:///{shard}']
+        )
+
+def test_write_behind_keeps_what_earlier_shards_committed(make_app, paths, monkeypatch):
+    primary, shard = paths
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+        SQLALCHEMY_SHARD_URIS=[f'sqlite:///{shard}'],
+        CACHE_BACKEND='null',
+        CHECK_IN_WRITE_BEHIND=True,
+        CHECK_IN_WRITE_BEHIND_INTERVAL_MS=20
+    )
+    with app.app_context():
+        for engine in app.extensions['shards'].engines:
+            db.metadata.create_all(engine)
+    client = app.test_client()
+    ids = [client.post('/habits', json={'name': name}).get_json()['id'] for name in ('Read', 'Run')]
+    with app.app_context():
+        subscription = events.subscribe()
+    habit_id = next(i for i in ids if i % 2 == 0)
+    missing = max(ids) * 2 + 1
+
+    # The missing habit on shard 1 gets past the existence check, as if deleted right after it
+    monkeypatch.setattr(HabitRepository, 'existing_ids', staticmethod(lambda habit_ids: set(habit_ids)))
+    tickets = [
+        client.post(f'/habits/{i}/check-ins', json={'date': '2025-06-01'}).get_json()['ticket']
+        for i in (habit_id, missing)
+    ]
+    app.extensions['check_in_writer'].flush()
+    app.extensions['check_in_writer'].stop()
+
+    statuses = [client.get(f'/habits/{i}/check-ins/queued/{ticket}').get_json()
+                for i, ticket in zip((habit_id, missing), tickets)]
+    assert [status['status'] for status in statuses] == ['created', 'not_found']
+    assert [(event.type, event.data['id']) for event in subscription.get(timeout=0)] == [
+        ('check_in.created', statuses[0]['id'])
+    ]
+    assert len(client.get(f'/habits/{habit_id}/check-ins').get_json()) == 1
+    for engine in app.extensions['shards'].engines:
+        engine.dispose()
@@ -0,0 +1,84 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import Date, literal, select
+
+from app import db
+from app.repositories.check_in_repository import CheckInRepository
+from app.repositories.habit_repository import HabitRepository
+from app.repositories.streak_repository import StreakRepository
+from app.utils.db import day_offset
+
+# Every scenario runs against each configured dialect. PostgreSQL runs only
+# when TEST_POSTGRES_URL points at a disposable database.
+DIALECTS = {
+    'sqlite': 'sqlite://',
+    'postgresql': os.environ.get('TEST_POSTGRES_URL'),
+}
+
+START = date(2024, 2, 26)
+
+SCENARIOS = {
+    'empty': ([], []),
+    'single day': ([0], [(0, 0, 1)]),
+    'one run': ([0, 1, 2], [(0, 2, 3)]),
+    'gaps': ([0, 1, 3, 5, 6, 7], [(0, 1, 2), (3, 3, 1), (5, 7, 3)]),
+    'leap day and month end': ([2, 3, 4, 5], [(2, 5, 4)]),
+    'year boundary': ([308, 309, 310, 311], [(308, 311, 4)]),
+    'unordered input': ([6, 0, 5, 1], [(0, 1, 2), (5, 6, 2)]),
+}
+
+@pytest.fixture(params=list(DIALECTS))
+def app(request, make_app):
+    uri = DIALECTS[request.param]
+    if not uri:
+        pytest.skip(f'No {request.param} database configured')
+    app = make_app(SQLALCHEMY_DATABASE_URI=uri, CACHE_BACKEND='null')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def day(offset):
+    return START + timedelta(days=offset)
+
+@pytest.mark.parametrize('offsets,expected', SCENARIOS.values(), ids=list(SCENARIOS))
+def test_compute_streaks(app, offsets, expected):
+    habit = HabitRepository.create({'name': 'Parity'})
+    CheckInRepository.bulk_create(habit.id, [{'date': day(offset)} for offset in offsets])
+
+    streaks = StreakRepository.compute(habit.id)
+    assert streaks == [
+        {'first': day(first), 'last': day(last), 'days': days} for first, last, days in expected
+    ]
+    # Dates come back as native date objects on every dialect
+    assert all(isinstance(streak['first'], date) for streak in streaks)
+
+@pytest.mark.parametrize('offsets,expected', SCENARIOS.values(), ids=list(SCENARIOS))
+def test_incremental_index_matches_computed(app, offsets, expected):
+    habit = HabitRepository.create({'name': 'Parity'})
+    for offset in offsets:
+        CheckInRepository.create({'habit_id': habit.id, 'date': day(offset)})
+
+    assert CheckInRepository.get_streaks(habit.id) == StreakRepository.compute(habit.id)
+
+def test_compute_many_partitions_by_habit(app):
+    first = HabitRepository.create({'name': 'First'})
+    second = HabitRepository.create({'name': 'Second'})
+    CheckInRepository.bulk_create(first.id, [{'date': day(offset)} for offset in (0, 1, 3)])
+    CheckInRepository.bulk_create(second.id, [{'date': day(offset)} for offset in (1, 2)])
+
+    streaks = StreakRepository.compute_many()
+    assert streaks == {
+        first.id: StreakRepository.compute(first.id),
+        second.id: [{'first': day(1), 'last': day(2), 'days': 2}],
+    }
+    assert [s['days'] for s in streaks[first.id]] == [2, 1]
+
+def test_day_offset_is_the_same_integer(app):
+    for when, days, expected in ((date(1970, 1, 11), 3, 7), (date(1969, 12, 31), 0, -1), (START, 1, 19778)):
+        value = db.session.execute(select(day_offset(literal(when, Date), literal(days)))).scalar()
+        assert value == expected
+        assert isinstance(value, int)
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import pytest
+
+from app import db, events
+
+@pytest.fixture
+def app(make_app):
+    # The writer thread uses its own connection, so the database must be a file
+    directory = tempfile.TemporaryDirectory()
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(directory.name, 'test.db')}",
+        CHECK_IN_WRITE_BEHIND=True,
+        CHECK_IN_WRITE_BEHIND_INTERVAL_MS=20
+    )
+    with app.app_context():
+        db.create_all()
+    yield app
+    app.extensions['check_in_writer'].stop()
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+    directory.cleanup()
+
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
+
+def flush(app):
+    app.extensions['check_in_writer'].flush()
+
+def test_check_in_is_accepted_then_written(app, client):
+    habit_id = client.post('/habits', json={'name': 'Queued'}).get_json()['id']
+    with app.app_context():
+        subscription = events.subscribe()
+
+    response = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2024-03-01', 'notes': 'later'})
+    assert response.status_code == 202
+    accepted = response.get_json()
+    assert accepted['status'] == 'pending'
+    assert accepted['date'] == '2024-03-01'
+    assert response.headers['Location'].endswith(f"/habits/{habit_id}/check-ins/queued/{accepted['ticket']}")
+
+    flush(app)
+    status = client.get(response.headers['Location']).get_json()
+    assert status['status'] == 'created'
+
+    check_ins = client.get(f'/habits/{habit_id}/check-ins').get_json()
+    assert [(item['id'], item['notes']) for item in check_ins] == [(status['id'], 'later')]
+    # The event is published once the check-in is written, not when it is accepted
+    assert [(event.type, event.data) for event in subscription.get(timeout=0)] == [
+        ('check_in.created', {'id': status['id'], 'habit_id': habit_id, 'date': '2024-03-01', 'notes': 'later'})
+    ]
+
+def test_batch_outcomes_and_streaks(app, client):
+    habit_id = client.post('/habits', json={'name': 'Burst'}).get_json()['id']
+    resolved = []
+    app.extensions['check_in_writer'].add_listener(resolved.append)
+
+    tickets = [
+        client.post(f'/habits/{habit_id}/check-ins', json={'date': day}).get_json()['ticket']
+        for day in ('2024-03-01', '2024-03-02', '2024-03-03', '2024-03-02')
+    ]
+    missing = client.post('/habits/999/check-ins', json={'date': '2024-03-01'}).get_json()['ticket']
+    flush(app)
+
+    statuses = [client.get(f'/habits/{habit_id}/check-ins/queued/{ticket}').get_json()['status']
+                for ticket in tickets]
+    assert statuses == ['created', 'created', 'created', 'duplicate']
+    assert client.get(f'/habits/999/check-ins/queued/{missing}').get_json()['status'] == 'not_found'
+    assert sorted(status['ticket'] for status in resolved) == sorted(tickets + [missing])
+
+    # Already stored days are reported as duplicates too
+    again = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2024-03-03'}).get_json()['ticket']
+    flush(app)
+    assert client.get(f'/habits/{habit_id}/check-ins/queued/{again}').get_json()['status'] == 'duplicate'
+
+    streaks = client.get(f'/habits/{habit_id}/streaks/summary').get_json()
+    assert streaks['longest_streak'] == 3
+
+def test_unknown_ticket(client):
+    habit_id = client.post('/habits', json={'name': 'Queued'}).get_json()['id']
+    ticket = client.post(f'/habits/{habit_id}/check-ins', json={'date': '2024-03-01'}).get_json()['ticket']
+
+    assert client.get(f'/habits/{habit_id}/check-ins/queued/unknown').status_code == 404
+    assert client.get(f'/habits/{habit_id + 1}/check-ins/queued/{ticket}').status_code == 404